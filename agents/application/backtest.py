@@ -0,0 +1,594 @@
+"""
+Replay recorded market snapshots through the forecasting pipeline.
+
+A ``SnapshotArchive`` holds one JSON file per recorded snapshot (the raw
+Gamma markets plus the order books of their outcome tokens) and a
+``resolutions.json`` mapping market ids to the winning outcome. The
+``Backtester`` walks the snapshots in time order. For each one it selects
+candidate markets and forecasts them with ``Executor.try_forecast_market``
+in a ``Pipeline``, then buys the outcomes with enough edge by walking the
+recorded asks. The LLM is whatever the executor holds, normally the offline
+``ScriptedChatModel`` (LLM_PROVIDER=local) or a provider behind the response
+cache (LLM_CACHE_PATH), so replays are cheap and repeatable.
+
+Fills, prices and resolutions are then laid out as arrays and PnL, the
+equity curve, drawdown, Brier score and calibration come out of a few numpy
+operations rather than a loop per market-day.
+
+A model may know how a market resolved from its training data, so results
+on markets that closed before the model's cutoff overstate its skill.
+"""
+
+import ast
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from agents.application.executor import Executor as Agent
+from agents.application.pipeline import Stage
+from agents.application.snapshot import MarketSnapshot
+from agents.connectors.chroma import (
+    gamma_market_to_document,
+    iter_gamma_market_documents,
+)
+from agents.utils.objects import TradeForecast
+from agents.utils.tracing import span, traced
+
+
+def _list(value) -> List:
+    if isinstance(value, str):
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            return []
+    return list(value) if isinstance(value, (list, tuple)) else []
+
+
+def book_levels(orderbook, name: str) -> List[Tuple[float, float]]:
+    """``(price, size)`` levels of one side of an order book object or dict."""
+    orders = (
+        orderbook.get(name) if isinstance(orderbook, dict) else getattr(orderbook, name)
+    )
+    levels = []
+    for order in orders or []:
+        price, size = (
+            (order["price"], order["size"])
+            if isinstance(order, dict)
+            else (order.price, order.size)
+        )
+        levels.append((float(price), float(size)))
+    return levels
+
+
+def fill_order(
+    asks: List[Tuple[float, float]], amount: float, limit: float = 1.0
+) -> Tuple[float, float]:
+    """Shares bought and USDC spent buying up to ``amount`` at or below ``limit``."""
+    shares = cost = 0.0
+    for price, size in sorted(asks):
+        if price > limit or cost >= amount:
+            break
+        if price <= 0:
+            continue
+        take = min(size, (amount - cost) / price)
+        shares += take
+        cost += take * price
+    return shares, cost
+
+
+class HistoricalSnapshot(BaseModel):
+    taken_at: float
+    markets: List[Dict[str, Any]]
+    # token id -> {"bids": [{"price", "size"}], "asks": [...]}
+    orderbooks: Dict[str, Dict[str, Any]] = {}
+
+
+class SnapshotArchive:
+    def __init__(self, root: str = None) -> None:
+        self.root = Path(root or os.getenv("BACKTEST_DIR", "backtest_data"))
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def names(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(path.stem for path in self.root.glob("snapshot-*.json"))
+
+    def save(self, snapshot: HistoricalSnapshot) -> str:
+        name = "snapshot-" + time.strftime(
+            "%Y%m%d-%H%M%S", time.gmtime(snapshot.taken_at)
+        )
+        self._atomic_write(
+            self.root / f"{name}.json", snapshot.model_dump_json().encode()
+        )
+        return name
+
+    def load(self, name: str) -> HistoricalSnapshot:
+        return HistoricalSnapshot.model_validate_json(
+            (self.root / f"{name}.json").read_text()
+        )
+
+    def __iter__(self) -> Iterator[HistoricalSnapshot]:
+        for name in self.names():
+            yield self.load(name)
+
+    def resolutions(self) -> Dict[str, str]:
+        try:
+            return json.loads((self.root / "resolutions.json").read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def save_resolutions(self, resolutions: Dict[str, str]) -> None:
+        merged = {**self.resolutions(), **resolutions}
+        self._atomic_write(
+            self.root / "resolutions.json", json.dumps(merged, indent=1).encode()
+        )
+
+    @traced("backtest.record")
+    def record(
+        self,
+        gamma,
+        polymarket=None,
+        limit: int = None,
+        book_workers: int = 8,
+    ) -> str:
+        """Store the current markets and, given ``polymarket``, every outcome's book."""
+        markets = gamma.get_all_current_markets()
+        if limit:
+            markets = markets[:limit]
+        orderbooks = {}
+        if polymarket is not None:
+            token_ids = [
+                str(token) for m in markets for token in _list(m.get("clobTokenIds"))
+            ]
+
+            def read(token_id):
+                try:
+                    book = polymarket.get_orderbook(token_id)
+                except Exception as e:
+                    print(f"[backtest] order book {token_id}: {e}")
+                    return None
+                return {
+                    side: [
+                        {"price": price, "size": size}
+                        for price, size in book_levels(book, side)
+                    ]
+                    for side in ("bids", "asks")
+                }
+
+            with ThreadPoolExecutor(max_workers=book_workers) as pool:
+                for token_id, book in zip(token_ids, pool.map(read, token_ids)):
+                    if book is not None:
+                        orderbooks[token_id] = book
+        return self.save(
+            HistoricalSnapshot(
+                taken_at=time.time(), markets=markets, orderbooks=orderbooks
+            )
+        )
+
+    @traced("backtest.resolve")
+    def resolve(self, gamma) -> Dict[str, str]:
+        """Look up the archived markets that have closed since; returns the new ones."""
+        known = self.resolutions()
+        pending = {
+            str(market["id"])
+            for snapshot in self
+            for market in snapshot.markets
+            if str(market["id"]) not in known
+        }
+        resolved = {}
+        for market_id in sorted(pending):
+            market = gamma.get_market(market_id)
+            if not market.get("closed"):
+                continue
+            prices = [float(price) for price in _list(market.get("outcomePrices"))]
+            outcomes = _list(market.get("outcomes"))
+            if prices and max(prices) >= 0.99:
+                resolved[market_id] = outcomes[prices.index(max(prices))]
+        if resolved:
+            self.save_resolutions(resolved)
+        return resolved
+
+
+class Fill(BaseModel):
+    snapshot: int
+    market_id: str
+    outcome: int
+    shares: float
+    cost: float
+    probability: float  # forecast probability of the bought outcome
+
+
+class ForecastRecord(BaseModel):
+    snapshot: int
+    market_id: str
+    outcome: int
+    probability: float
+    price: float
+
+
+class CalibrationBin(BaseModel):
+    low: float
+    high: float
+    count: int
+    forecast: float
+    observed: float
+
+
+class BacktestReport(BaseModel):
+    snapshots: int
+    forecasts: int
+    failed_forecasts: int
+    fills: int
+    bankroll: float
+    final_equity: float
+    pnl: float
+    return_pct: float
+    max_drawdown: float
+    hit_rate: Optional[float] = None
+    resolved_forecasts: int
+    brier: Optional[float] = None
+    market_brier: Optional[float] = None  # the same outcomes priced by the market
+    calibration: List[CalibrationBin] = []
+    equity_curve: List[float] = []
+    seconds: float = 0.0
+
+
+def _outcome_index(outcomes: List[str], outcome: Optional[str]) -> int:
+    for index, name in enumerate(outcomes):
+        if outcome and str(name).lower() == outcome.lower():
+            return index
+    # no outcome named: the likelihood is read as the first outcome's
+    return 0
+
+
+class Backtester:
+    def __init__(
+        self,
+        archive: SnapshotArchive,
+        agent: Agent = None,
+        llm=None,
+        bankroll: float = 1000.0,
+        candidates: int = None,
+        min_edge: float = None,
+        max_fraction: float = None,
+        rag: bool = False,
+    ) -> None:
+        self.archive = archive
+        self.agent = agent or Agent()
+        if llm is not None:
+            self.agent.llm = llm
+        self.bankroll = bankroll
+        self.candidates = candidates or self.agent.trade_candidates
+        self.min_edge = (
+            min_edge
+            if min_edge is not None
+            else float(os.getenv("BACKTEST_MIN_EDGE", "0.05"))
+        )
+        self.max_fraction = (
+            max_fraction
+            if max_fraction is not None
+            else float(os.getenv("BACKTEST_MAX_FRACTION", "0.1"))
+        )
+        self.rag = rag
+        self.fills: List[Fill] = []
+        self.forecasts: List[ForecastRecord] = []
+
+    def select_candidates(self, markets: List[Dict[str, Any]]) -> list:
+        """
+        The markets to forecast: the hybrid RAG ranking the Trader uses with
+        ``rag``, otherwise the most liquid markets passing the executor's
+        liquidity and spread filters.
+        """
+        market_filter = self.agent.market_filter
+        if self.rag:
+            # days-to-end filters compare with today, not the snapshot's date
+            market_filter = market_filter.model_copy(
+                update={"min_days_to_end": None, "max_days_to_end": None}
+            )
+            results = self.agent.chroma.hybrid_search(
+                iter_gamma_market_documents(markets),
+                self.agent.prompter.filter_markets(),
+                k=self.candidates,
+                metadata_filter=market_filter,
+            )
+        else:
+            columns = MarketSnapshot.from_markets(markets).columns
+            liquidity = np.nan_to_num(columns["liquidity"], nan=-np.inf)
+            keep = np.ones(len(markets), dtype=bool)
+            # like MetadataFilter, a missing value does not exclude a market
+            if market_filter.min_liquidity is not None:
+                keep &= ~(columns["liquidity"] < market_filter.min_liquidity)
+            if market_filter.max_spread is not None:
+                keep &= ~(columns["spread"] > market_filter.max_spread)
+            indices = np.flatnonzero(keep)
+            order = indices[np.argsort(-liquidity[indices], kind="stable")]
+            results = [
+                (gamma_market_to_document(markets[i], int(i) + 1), 0.0)
+                for i in order[: self.candidates]
+            ]
+        return list(enumerate(results))
+
+    def forecast_candidate(self, candidate) -> TradeForecast:
+        index, market_object = candidate
+        return self.agent.try_forecast_market(market_object, index)
+
+    def build_pipeline(self):
+        return self.agent.pipeline(
+            [
+                Stage("candidates", self.select_candidates, mode="batch"),
+                Stage(
+                    "forecasts",
+                    self.forecast_candidate,
+                    concurrency=self.agent.forecast_concurrency,
+                ),
+            ]
+        )
+
+    def order(self, forecast: TradeForecast) -> Optional[Tuple[int, float, float]]:
+        """``(outcome, probability, fraction of bankroll)`` to buy, if any."""
+        if forecast.error or forecast.probability is None:
+            return None
+        prices = forecast.outcome_prices
+        outcome = _outcome_index(forecast.outcomes, forecast.forecast_outcome)
+        if outcome >= len(prices):
+            return None
+        probability = forecast.probability
+        if probability - prices[outcome] < self.min_edge:
+            if len(prices) != 2 or prices[outcome] - probability < self.min_edge:
+                return None
+            # overpriced in a binary market: buy the other outcome instead
+            outcome, probability = 1 - outcome, 1 - probability
+        fraction = min(forecast.size or self.max_fraction, self.max_fraction)
+        return outcome, probability, fraction
+
+    def fill(
+        self,
+        snapshot: HistoricalSnapshot,
+        market: Dict[str, Any],
+        outcome: int,
+        amount: float,
+        limit: float,
+    ) -> Tuple[float, float]:
+        """
+        Buy against the recorded asks of the outcome's token. Without a
+        recorded book the order fills at the outcome price plus half the
+        spread, with no depth limit.
+        """
+        token_ids = _list(market.get("clobTokenIds"))
+        book = (
+            snapshot.orderbooks.get(str(token_ids[outcome]))
+            if outcome < len(token_ids)
+            else None
+        )
+        if book is not None:
+            return fill_order(book_levels(book, "asks"), amount, limit)
+        prices = [float(price) for price in _list(market.get("outcomePrices"))]
+        price = prices[outcome] + float(market.get("spread") or 0) / 2
+        if not 0 < price <= limit:
+            return 0.0, 0.0
+        return amount / price, amount
+
+    @traced("backtest.run")
+    def run(self, names: List[str] = None) -> BacktestReport:
+        started = time.perf_counter()
+        names = names if names is not None else self.archive.names()
+        cash = self.bankroll
+        fills: List[Fill] = []
+        forecasts: List[ForecastRecord] = []
+        failed = 0
+        # per snapshot: {(market id, outcome): price} for marking positions
+        marks: List[Dict[Tuple[str, int], float]] = []
+        outcome_names: Dict[str, List[str]] = {}
+
+        for index, name in enumerate(names):
+            snapshot = self.archive.load(name)
+            with span(
+                "backtest.snapshot", snapshot=name, markets=len(snapshot.markets)
+            ):
+                markets = {str(m["id"]): m for m in snapshot.markets}
+                for market_id, market in markets.items():
+                    outcome_names[market_id] = [
+                        str(name) for name in _list(market.get("outcomes"))
+                    ]
+                marks.append(
+                    {
+                        (market_id, outcome): float(price)
+                        for market_id, market in markets.items()
+                        for outcome, price in enumerate(
+                            _list(market.get("outcomePrices"))
+                        )
+                    }
+                )
+                pipeline = self.build_pipeline()
+                results = pipeline.run_sync(snapshot.markets)
+                budget = cash
+                for forecast in sorted(results, key=lambda f: f.index):
+                    if forecast.error:
+                        failed += 1
+                        continue
+                    order = self.order(forecast)
+                    if forecast.probability is not None and forecast.market_id:
+                        outcome = _outcome_index(
+                            forecast.outcomes, forecast.forecast_outcome
+                        )
+                        if outcome < len(forecast.outcome_prices):
+                            forecasts.append(
+                                ForecastRecord(
+                                    snapshot=index,
+                                    market_id=forecast.market_id,
+                                    outcome=outcome,
+                                    probability=forecast.probability,
+                                    price=forecast.outcome_prices[outcome],
+                                )
+                            )
+                    if order is None or forecast.market_id not in markets:
+                        continue
+                    outcome, probability, fraction = order
+                    amount = min(fraction * budget, cash)
+                    shares, cost = self.fill(
+                        snapshot,
+                        markets[forecast.market_id],
+                        outcome,
+                        amount,
+                        probability,
+                    )
+                    if shares <= 0:
+                        continue
+                    cash -= cost
+                    fills.append(
+                        Fill(
+                            snapshot=index,
+                            market_id=forecast.market_id,
+                            outcome=outcome,
+                            shares=shares,
+                            cost=cost,
+                            probability=probability,
+                        )
+                    )
+
+        self.fills, self.forecasts = fills, forecasts
+        report = evaluate(
+            fills,
+            forecasts,
+            marks,
+            resolution_indices(self.archive.resolutions(), outcome_names),
+            self.bankroll,
+        )
+        report.failed_forecasts = failed
+        report.seconds = time.perf_counter() - started
+        return report
+
+
+def resolution_indices(
+    resolutions: Dict[str, str], outcome_names: Dict[str, List[str]]
+) -> Dict[str, int]:
+    """Winning outcome names turned into outcome indices."""
+    indices = {}
+    for market_id, winner in resolutions.items():
+        names = [name.lower() for name in outcome_names.get(market_id, [])]
+        if str(winner).lower() in names:
+            indices[market_id] = names.index(str(winner).lower())
+    return indices
+
+
+def evaluate(
+    fills: List[Fill],
+    forecasts: List[ForecastRecord],
+    marks: List[Dict[Tuple[str, int], float]],
+    resolutions: Dict[str, int],
+    bankroll: float,
+    bins: int = 10,
+) -> BacktestReport:
+    """
+    PnL, equity curve and forecast scores of a replay.
+
+    ``marks`` holds the outcome prices of every snapshot and ``resolutions``
+    maps a market id to its winning outcome index. Positions in unresolved
+    markets are valued at their last price.
+    """
+    steps = len(marks)
+    keys = sorted({(f.market_id, f.outcome) for f in fills})
+    column = {key: i for i, key in enumerate(keys)}
+
+    # prices[t, k]: price of position k in snapshot t, carried forward
+    prices = np.full((max(steps, 1), len(keys)), np.nan)
+    for t, snapshot_marks in enumerate(marks):
+        for key, k in column.items():
+            prices[t, k] = snapshot_marks.get(key, np.nan)
+    seen = np.where(~np.isnan(prices), np.arange(len(prices))[:, None], 0)
+    prices = prices[np.maximum.accumulate(seen, axis=0), np.arange(len(keys))]
+    prices = np.nan_to_num(prices)
+
+    steps_index = np.array([f.snapshot for f in fills], dtype=np.int64)
+    keys_index = np.array(
+        [column[(f.market_id, f.outcome)] for f in fills], dtype=np.int64
+    )
+    shares = np.array([f.shares for f in fills], dtype=np.float64)
+    costs = np.array([f.cost for f in fills], dtype=np.float64)
+
+    bought = np.zeros_like(prices)
+    np.add.at(bought, (steps_index, keys_index), shares)
+    positions = np.cumsum(bought, axis=0)
+    cash = bankroll - np.cumsum(np.bincount(steps_index, costs, minlength=len(prices)))
+    equity = cash + (positions * prices).sum(axis=1)
+
+    # settle: 1 per share of the winning outcome, 0 for the others
+    payout = np.array(
+        [
+            (
+                float(resolutions[market_id] == outcome)
+                if market_id in resolutions
+                else prices[-1, column[(market_id, outcome)]]
+            )
+            for market_id, outcome in keys
+        ],
+        dtype=np.float64,
+    ).reshape(len(keys))
+    final_equity = float(cash[-1] + positions[-1] @ payout) if steps else bankroll
+    curve = np.append(equity[:steps], final_equity)
+    peaks = np.maximum.accumulate(np.append(bankroll, curve))[1:]
+    drawdown = float(np.max((peaks - curve) / peaks)) if len(curve) else 0.0
+
+    resolved_fills = np.array([f.market_id in resolutions for f in fills], dtype=bool)
+    fill_pnl = shares * payout[keys_index] - costs
+    hit_rate = (
+        float(np.mean(fill_pnl[resolved_fills] > 0)) if resolved_fills.any() else None
+    )
+
+    resolved = [f for f in forecasts if f.market_id in resolutions]
+    probability = np.array([f.probability for f in resolved], dtype=np.float64)
+    market_price = np.array([f.price for f in resolved], dtype=np.float64)
+    happened = np.array(
+        [float(resolutions[f.market_id] == f.outcome) for f in resolved],
+        dtype=np.float64,
+    )
+    calibration = []
+    brier = market_brier = None
+    if len(resolved):
+        brier = float(np.mean((probability - happened) ** 2))
+        market_brier = float(np.mean((market_price - happened) ** 2))
+        edges = np.linspace(0.0, 1.0, bins + 1)
+        bin_index = np.clip(np.digitize(probability, edges) - 1, 0, bins - 1)
+        counts = np.bincount(bin_index, minlength=bins)
+        forecast_sums = np.bincount(bin_index, probability, minlength=bins)
+        observed_sums = np.bincount(bin_index, happened, minlength=bins)
+        for b in np.flatnonzero(counts):
+            calibration.append(
+                CalibrationBin(
+                    low=float(edges[b]),
+                    high=float(edges[b + 1]),
+                    count=int(counts[b]),
+                    forecast=float(forecast_sums[b] / counts[b]),
+                    observed=float(observed_sums[b] / counts[b]),
+                )
+            )
+
+    return BacktestReport(
+        snapshots=steps,
+        forecasts=len(forecasts),
+        failed_forecasts=0,
+        fills=len(fills),
+        bankroll=bankroll,
+        final_equity=final_equity,
+        pnl=final_equity - bankroll,
+        return_pct=100 * (final_equity - bankroll) / bankroll if bankroll else 0.0,
+        max_drawdown=drawdown,
+        hit_rate=hit_rate,
+        resolved_forecasts=len(resolved),
+        brier=brier,
+        market_brier=market_brier,
+        calibration=calibration,
+        equity_curve=curve.tolist(),
+    )
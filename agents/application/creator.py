@@ -1,6 +1,11 @@
 from agents.application.executor import Executor as Agent
+from agents.application.pipeline import Pipeline, Stage
+from agents.application.run_state import RunStateStore
+from agents.application.snapshot import MarketSnapshot
 from agents.polymarket.gamma import GammaMarketClient as Gamma
 from agents.polymarket.polymarket import Polymarket
+from agents.utils.memory_profile import profiled
+from agents.utils.tracing import traced
 
 
 class Creator:
@@ -8,8 +13,25 @@ class Creator:
         self.polymarket = Polymarket()
         self.gamma = Gamma()
         self.agent = Agent()
-
-    def one_best_market(self):
+        self.run_state = RunStateStore()
+
+    def build_pipeline(self, snapshot: MarketSnapshot = None) -> Pipeline:
+        """events -> filtered events -> markets -> filtered markets -> market idea."""
+        return self.agent.pipeline(
+            self.agent.selection_stages(snapshot)
+            + [
+                Stage(
+                    "market_idea",
+                    lambda markets: [self.agent.source_best_market_to_create(markets)],
+                    mode="batch",
+                ),
+            ],
+            store=self.run_state,
+        )
+
+    @traced("creator.one_best_market")
+    @profiled("creator.one_best_market")
+    def one_best_market(self, run_id: str = None, snapshot: MarketSnapshot = None):
         """
 
         one_best_trade is a strategy that evaluates all events, markets, and orderbooks
@@ -18,29 +40,30 @@ class Creator:
 
         then executes that trade without any human intervention
 
+        failed runs resume from their last checkpointed stage, see Trader
+
         """
+        self.run_state.prune()
+        run_id = self.run_state.start("create", run_id)
         try:
-            events = self.polymarket.get_all_tradeable_events()
-            print(f"1. FOUND {len(events)} EVENTS")
-
-            filtered_events = self.agent.filter_events_with_rag(events)
-            print(f"2. FILTERED {len(filtered_events)} EVENTS")
-
-            markets = self.agent.map_filtered_events_to_markets(filtered_events)
-            print()
-            print(f"3. FOUND {len(markets)} MARKETS")
-
-            print()
-            filtered_markets = self.agent.filter_markets(markets)
-            print(f"4. FILTERED {len(filtered_markets)} MARKETS")
-
-            best_market = self.agent.source_best_market_to_create(filtered_markets)
+            pipeline = self.build_pipeline(snapshot)
+            (best_market,) = pipeline.run_sync(run_id=run_id)
+            stats = pipeline.stats
+            print(f"1. FOUND {stats['events'].emitted} EVENTS")
+            print(f"2. FILTERED {stats['filtered_events'].emitted} EVENTS")
+            print(f"3. FOUND {stats['markets'].emitted} MARKETS")
+            print(f"4. FILTERED {stats['filtered_markets'].emitted} MARKETS")
             print(f"5. IDEA FOR NEW MARKET {best_market}")
+            self.run_state.finish(run_id)
             return best_market
 
         except Exception as e:
-            print(f"Error {e} \n \n Retrying")
-            self.one_best_market()
+            completed = ", ".join(self.run_state.completed_stages(run_id)) or "none"
+            print(
+                f"Error {e} \n \n Run {run_id} stopped, checkpointed stages: {completed}"
+            )
+        finally:
+            self.run_state.release(run_id)
 
     def maintain_positions(self):
         pass
@@ -1,24 +1,209 @@
-from agents.application.trade import Trader
+"""
+Scheduler for periodic jobs such as trading rounds.
+
+Jobs sit in a heap ordered by their next due time and the scheduler thread
+sleeps on an event until the earliest one is due (or a job is added or the
+scheduler is stopped), so an idle scheduler does not poll. Due jobs run on a
+worker pool:
+
+- a job still running when it is due again skips that run instead of
+  overlapping with itself
+- each run is delayed by a random jitter of up to ``jitter`` seconds, on
+  top of the fixed schedule, so the schedule itself does not drift
+- runs that were due while the scheduler was late are counted as missed
+  and not caught up, so work never stacks up after a stall
+"""
 
+import heapq
+import itertools
+import os
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from agents.application.trade import Trader
+from agents.utils.tracing import span
+
 
-from scheduler import Scheduler
-from scheduler.trigger import Monday
+def seconds_until_weekday(weekday: int, hour: int = 0, now: datetime = None) -> float:
+    """Seconds until the next ``weekday`` (Monday is 0) at ``hour``:00."""
+    now = now or datetime.now()
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    target += timedelta(days=(weekday - now.weekday()) % 7)
+    if target <= now:
+        target += timedelta(days=7)
+    return (target - now).total_seconds()
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        interval: float,
+        jitter: float = 0.0,
+        first_due: float = 0.0,
+    ) -> None:
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.jitter = jitter
+        # monotonic time of the next scheduled run, before jitter
+        self.scheduled = first_due
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.missed = 0
+        self.skipped_overlap = 0
+        self.last_started: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "missed": self.missed,
+            "skipped_overlap": self.skipped_overlap,
+            "last_started": self.last_started,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+        }
 
 
 class Scheduler:
-    def __init__(self) -> None:
-        self.trader = Trader()
-        self.schedule = Scheduler()
+    def __init__(self, max_workers: int = 4) -> None:
+        self.jobs: Dict[str, Job] = {}
+        self._heap: List = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="scheduler"
+        )
+        self._thread: Optional[threading.Thread] = None
+        # times the scheduler thread woke up, to check that it does not poll
+        self.wakeups = 0
+
+    def every(
+        self,
+        interval: float,
+        fn: Callable[[], Any],
+        name: str = None,
+        jitter: float = 0.0,
+        delay: float = 0.0,
+    ) -> Job:
+        """Run ``fn`` every ``interval`` seconds, the first time after ``delay``."""
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        name = name or getattr(fn, "__qualname__", repr(fn))
+        if name in self.jobs:
+            raise ValueError(f"A job named {name!r} is already scheduled")
+        job = Job(name, fn, interval, jitter, time.monotonic() + delay)
+        with self._lock:
+            self.jobs[name] = job
+            self._push(job)
+        self._wake.set()
+        return job
+
+    def _push(self, job: Job) -> None:
+        due = job.scheduled + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+        heapq.heappush(self._heap, (due, next(self._sequence), job))
+
+    def _dispatch(self, job: Job, now: float) -> None:
+        late = now - job.scheduled
+        if late >= job.interval:
+            # don't catch up on runs that were due while we were stalled
+            missed = int(late // job.interval)
+            job.missed += missed
+            job.scheduled += missed * job.interval
+            print(f"[scheduler] {job.name}: missed {missed} run(s)")
+        if job.running:
+            job.skipped_overlap += 1
+            print(f"[scheduler] {job.name}: previous run still going, skipping")
+        else:
+            job.running = True
+            self._pool.submit(self._run, job)
+        job.scheduled += job.interval
+        self._push(job)
+
+    def _run(self, job: Job) -> None:
+        job.last_started = time.time()
+        started = time.perf_counter()
+        try:
+            with span(f"job.{job.name}"):
+                job.fn()
+            job.last_error = None
+        except Exception as e:
+            job.failures += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            print(f"[scheduler] {job.name} failed: {job.last_error}")
+        finally:
+            job.runs += 1
+            job.last_duration = time.perf_counter() - started
+            job.running = False
+
+    def run_pending(self) -> Optional[float]:
+        """Dispatch every due job; return seconds until the next one, if any."""
+        with self._lock:
+            while self._heap:
+                due, _, job = self._heap[0]
+                now = time.monotonic()
+                if due > now:
+                    return due - now
+                heapq.heappop(self._heap)
+                self._dispatch(job, now)
+        return None
 
     def start(self) -> None:
-        while True:
-            self.schedule.exec_jobs()
-            time.sleep(1)
+        """Run the scheduler loop in the calling thread until ``stop``."""
+        while not self._stopped.is_set():
+            # clear before looking at the heap, so a job added meanwhile
+            # wakes the wait below
+            self._wake.clear()
+            timeout = self.run_pending()
+            self._wake.wait(timeout)
+            self.wakeups += 1
+
+    def start_background(self) -> threading.Thread:
+        self._thread = threading.Thread(
+            target=self.start, name="scheduler", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self, wait: bool = True) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._pool.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: job.stats() for name, job in self.jobs.items()}
 
 
 class TradingAgent(Scheduler):
     def __init__(self) -> None:
-        super()
+        super().__init__(max_workers=int(os.getenv("SCHEDULER_WORKERS", "2")))
         self.trader = Trader()
-        self.weekly(Monday(), self.trader.one_best_trade)
+        # weekly, starting on Monday, by default; an empty TRADE_WEEKDAY
+        # starts the first round right away
+        weekday = os.getenv("TRADE_WEEKDAY", "0")
+        self.every(
+            float(os.getenv("TRADE_INTERVAL_SECONDS", str(7 * 24 * 3600))),
+            self.trader.one_best_trade,
+            name="one_best_trade",
+            jitter=float(os.getenv("TRADE_JITTER_SECONDS", "60")),
+            delay=seconds_until_weekday(int(weekday)) if weekday else 0.0,
+        )
+
+
+if __name__ == "__main__":
+    TradingAgent().start()
@@ -1,21 +1,41 @@
 import os
 import json
 import ast
+import contextvars
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage
 
 from agents.llm import LLMFactory, LLMProvider
+from agents.llm.prompt_cache import supports_cache_control
+from agents.llm.tokens import count_tokens, pack_items
 from agents.polymarket.gamma import GammaMarketClient as Gamma
 from agents.connectors.chroma import PolymarketRAG as Chroma
-from agents.utils.objects import SimpleEvent, SimpleMarket
+from agents.connectors.retrieval import MetadataFilter
+from agents.utils.objects import SimpleEvent, SimpleMarket, TradeForecast
+from agents.utils.pools import shared_pool
+from agents.utils.tracing import traced
+from agents.utils.serialization import (
+    project_documents,
+    project_events,
+    project_markets,
+    render,
+)
+from agents.application.pipeline import Pipeline, Stage, StageStats
+from agents.application.prefetch import TradePrefetch
 from agents.application.prompts import Prompter
+from agents.application.run_state import RunStateStore
+from agents.application.snapshot import MarketSnapshot
+from agents.application.shared_results import get_shared_results
 from agents.polymarket.polymarket import Polymarket
 
+
 def retain_keys(data, keys_to_retain):
     if isinstance(data, dict):
         return {
@@ -28,6 +48,50 @@ def retain_keys(data, keys_to_retain):
     else:
         return data
 
+
+def _optional_float(value):
+    return float(value) if value else None
+
+
+def _first_float(pattern: str, text: str):
+    match = re.search(pattern, text, re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+
+def parse_forecast(forecast: str):
+    """Likelihood and outcome from "... has a likelihood `0.6` for outcome of `Yes`"."""
+    probability = _first_float(r"likelihood\W*(\d*\.?\d+)", forecast)
+    outcome = re.search(r"outcome of\W*([^`.\n]+)", forecast, re.IGNORECASE)
+    return probability, outcome.group(1).strip() if outcome else None
+
+
+def parse_trade(trade: str) -> Dict[str, Any]:
+    side = re.search(r"side\W*(BUY|SELL)", trade, re.IGNORECASE)
+    return {
+        "price": _first_float(r"price\W*(\d*\.?\d+)", trade),
+        "size": _first_float(r"size\W*(\d*\.?\d+)", trade),
+        "side": side.group(1).upper() if side else None,
+    }
+
+
+def forecast_edge(probability, forecast_outcome, outcomes, prices):
+    """Forecast probability minus the market price of the forecast outcome."""
+    if probability is None:
+        return None
+    for outcome, price in zip(outcomes, prices):
+        if forecast_outcome and outcome.lower() == forecast_outcome.lower():
+            return probability - price
+    # no outcome named: read the likelihood as the first outcome's
+    return probability - prices[0] if prices else None
+
+
+def rank_forecasts(forecasts: List[TradeForecast]) -> List[TradeForecast]:
+    return sorted(
+        forecasts,
+        key=lambda f: (f.error is not None, f.edge is None, -abs(f.edge or 0)),
+    )
+
+
 class Executor:
     def __init__(self, default_model: str = None) -> None:
         load_dotenv()
@@ -49,39 +113,82 @@ class Executor:
             self.llm_provider,
             self.model_name
         )
-        self.prompter = Prompter()
+        self.prompter = Prompter(
+            cache_control=supports_cache_control(self.llm_provider, self.model_name)
+        )
         self.gamma = Gamma()
         self.chroma = Chroma()
         self.polymarket = Polymarket()
+        # Number of events / markets kept by the RAG filters
+        self.rag_top_k = int(os.getenv("RAG_TOP_K", "4"))
+        # Concurrent chunk prompts in get_polymarket_llm's map step
+        self.chunk_concurrency = int(os.getenv("LLM_CHUNK_CONCURRENCY", "4"))
+        self.last_chunk_report: List[Dict[str, Any]] = []
+        # Markets forecast per trading round and how many run at once
+        self.trade_candidates = int(os.getenv("TRADE_CANDIDATES", "3"))
+        self.forecast_concurrency = int(os.getenv("TRADE_FORECAST_CONCURRENCY", "3"))
+        # Concurrent Gamma market reads in the Trader / Creator pipelines
+        self.market_fetch_concurrency = int(
+            os.getenv("PIPELINE_MARKET_FETCH_CONCURRENCY", "8")
+        )
+        # Retries of a failing pipeline stage call, with exponential backoff
+        self.stage_retries = int(os.getenv("PIPELINE_STAGE_RETRIES", "2"))
+        self.stage_backoff = float(os.getenv("PIPELINE_RETRY_BACKOFF", "1.0"))
+        # Tokens kept free for the answer when packing context
+        self.answer_reserve = int(os.getenv("LLM_ANSWER_RESERVE", "1024"))
+        self.event_filter = MetadataFilter()
+        self.market_filter = MetadataFilter(
+            min_liquidity=_optional_float(os.getenv("RAG_MIN_LIQUIDITY")),
+            max_spread=_optional_float(os.getenv("RAG_MAX_SPREAD")),
+            max_days_to_end=_optional_float(os.getenv("RAG_MAX_DAYS_TO_END")),
+        )
+
+    def stream_text(self, messages, run_name: str) -> Iterator[str]:
+        """Yield the model's answer to ``messages`` piece by piece as it arrives."""
+        for chunk in self.llm.stream(messages, config={"run_name": run_name}):
+            if chunk.content:
+                yield chunk.content
 
     def get_llm_response(self, user_input: str) -> str:
-        system_message = SystemMessage(content=str(self.prompter.market_analyst()))
+        system_message = self.prompter.system_message(self.prompter.market_analyst())
         human_message = HumanMessage(content=user_input)
         messages = [system_message, human_message]
-        result = self.llm.invoke(messages)
+        result = self.llm.invoke(messages, config={"run_name": "get_llm_response"})
         return result.content
 
+    def stream_llm_response(self, user_input: str) -> Iterator[str]:
+        system_message = self.prompter.system_message(self.prompter.market_analyst())
+        messages = [system_message, HumanMessage(content=user_input)]
+        return self.stream_text(messages, "get_llm_response")
+
     def get_superforecast(
         self, event_title: str, market_question: str, outcome: str
     ) -> str:
         messages = self.prompter.superforecaster(
             description=event_title, question=market_question, outcome=outcome
         )
-        result = self.llm.invoke(messages)
+        result = self.llm.invoke(messages, config={"run_name": "get_superforecast"})
         return result.content
 
+    def stream_superforecast(
+        self, event_title: str, market_question: str, outcome: str
+    ) -> Iterator[str]:
+        messages = self.prompter.superforecaster(
+            description=event_title, question=market_question, outcome=outcome
+        )
+        return self.stream_text(messages, "get_superforecast")
+
 
     def estimate_tokens(self, text: str) -> int:
-        # This is a rough estimate. For more accurate results, consider using a tokenizer.
-        return len(text) // 4  # Assuming average of 4 characters per token
+        return count_tokens(text, self.model_name)
 
     def process_data_chunk(self, data1: List[Dict[Any, Any]], data2: List[Dict[Any, Any]], user_input: str) -> str:
-        system_message = SystemMessage(
-            content=str(self.prompter.prompts_polymarket(data1=data1, data2=data2))
+        system_message = self.prompter.system_message(
+            str(self.prompter.prompts_polymarket(data1=data1, data2=data2))
         )
         human_message = HumanMessage(content=user_input)
         messages = [system_message, human_message]
-        result = self.llm.invoke(messages)
+        result = self.llm.invoke(messages, config={"run_name": "process_data_chunk"})
         return result.content
 
 
@@ -92,80 +199,278 @@ class Executor:
         # Use list comprehension to create sublists
         return [original_list[j:j+sublist_size] for j in range(0, len(original_list), sublist_size)]
     
+    @traced("executor.get_polymarket_llm")
     def get_polymarket_llm(self, user_input: str) -> str:
-        data1 = self.gamma.get_current_events()
-        data2 = self.gamma.get_current_markets()
-        
+        data1 = project_events(self.gamma.get_current_events())
+        data2 = project_markets(self.gamma.get_current_markets())
+
         combined_data = str(self.prompter.prompts_polymarket(data1=data1, data2=data2))
-        
-        # Estimate total tokens
-        total_tokens = self.estimate_tokens(combined_data)
-        
-        # Set a token limit (adjust as needed, leaving room for system and user messages)
-        token_limit = self.token_limit
-        if total_tokens <= token_limit:
+        total_tokens = self.estimate_tokens(combined_data + user_input)
+
+        # Leave room for the model's answer
+        if total_tokens <= self.token_limit - self.answer_reserve:
             # If within limit, process normally
             return self.process_data_chunk(data1, data2, user_input)
-        else:
-            # If exceeding limit, process in chunks
-            chunk_size = len(combined_data) // ((total_tokens // token_limit) + 1)
-            print(f'total tokens {total_tokens} exceeding llm capacity, now will split and answer')
-            group_size = (total_tokens // token_limit) + 1 # 3 is safe factor
-            keys_no_meaning = ['image','pagerDutyNotificationEnabled','resolvedBy','endDate','clobTokenIds','negRiskMarketID','conditionId','updatedAt','startDate']
-            useful_keys = ['id','questionID','description','liquidity','clobTokenIds','outcomes','outcomePrices','volume','startDate','endDate','question','questionID','events']
-            data1 = retain_keys(data1, useful_keys)
-            cut_1 = self.divide_list(data1, group_size)
-            cut_2 = self.divide_list(data2, group_size)
-            cut_data_12 = zip(cut_1, cut_2)
-
-            results = []
-
-            for cut_data in cut_data_12:
-                sub_data1 = cut_data[0]
-                sub_data2 = cut_data[1]
-                sub_tokens = self.estimate_tokens(str(self.prompter.prompts_polymarket(data1=sub_data1, data2=sub_data2)))
-
-                result = self.process_data_chunk(sub_data1, sub_data2, user_input)
-                results.append(result)
-            
-            combined_result = " ".join(results)
-            
-        
-            
-            return combined_result
+
+        print(f'total tokens {total_tokens} exceeding llm capacity, now will split and answer')
+        chunks = self.pack_data_chunks(data1, data2, user_input)
+        partial_answers = self.map_data_chunks(chunks, user_input)
+        return self.reduce_chunk_answers(partial_answers, user_input)
+
+    def stream_polymarket_llm(self, user_input: str) -> Iterator[str]:
+        """
+        Streaming ``get_polymarket_llm``. When the data has to be split, the
+        chunk answers are collected first and only the reduce step streams.
+        """
+        data1 = project_events(self.gamma.get_current_events())
+        data2 = project_markets(self.gamma.get_current_markets())
+
+        system_prompt = str(self.prompter.prompts_polymarket(data1=data1, data2=data2))
+        system_message = self.prompter.system_message(system_prompt)
+        total_tokens = self.estimate_tokens(system_prompt + user_input)
+        if total_tokens <= self.token_limit - self.answer_reserve:
+            messages = [system_message, HumanMessage(content=user_input)]
+            yield from self.stream_text(messages, "process_data_chunk")
+            return
+
+        chunks = self.pack_data_chunks(data1, data2, user_input)
+        partial_answers = self.map_data_chunks(chunks, user_input)
+        if len(partial_answers) == 1:
+            yield partial_answers[0]["content"]
+            return
+        messages = self.prompter.reduce_polymarket_answers(
+            [answer["content"] for answer in partial_answers], user_input
+        )
+        yield from self.stream_text(messages, "get_polymarket_llm.reduce")
+
+    def pack_data_chunks(self, data1, data2, user_input: str) -> List[tuple]:
+        """
+        Greedily fill each chunk up to the context window, minus the prompt
+        template, the user input and the answer reserve.
+        """
+        overhead = self.estimate_tokens(
+            str(self.prompter.prompts_polymarket(data1=[], data2=[])) + user_input
+        )
+        budget = max(1, self.token_limit - overhead - self.answer_reserve)
+        items = [("event", x) for x in data1] + [("market", x) for x in data2]
+        packed = pack_items(
+            items, budget, count=lambda item: self.estimate_tokens(render([item[1]]))
+        )
+        return [
+            (
+                [x for kind, x in chunk if kind == "event"],
+                [x for kind, x in chunk if kind == "market"],
+            )
+            for chunk in packed
+        ]
+
+    def process_data_chunk_with_stats(
+        self, index: int, data1, data2, user_input: str
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        system_prompt = str(self.prompter.prompts_polymarket(data1=data1, data2=data2))
+        messages = [
+            self.prompter.system_message(system_prompt),
+            HumanMessage(content=user_input),
+        ]
+        result = self.llm.invoke(messages, config={"run_name": "process_data_chunk"})
+        usage = getattr(result, "usage_metadata", None) or {}
+        return {
+            "chunk": index,
+            "content": result.content,
+            "latency": time.perf_counter() - started,
+            "input_tokens": usage.get(
+                "input_tokens", self.estimate_tokens(system_prompt + user_input)
+            ),
+            "output_tokens": usage.get(
+                "output_tokens", self.estimate_tokens(result.content)
+            ),
+        }
+
+    def map_data_chunks(self, chunks, user_input: str) -> List[Dict[str, Any]]:
+        """Send every chunk prompt concurrently, bounded by ``chunk_concurrency``."""
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self.chunk_concurrency, len(chunks)))
+        ) as pool:
+            # copy the context so trace spans nest under this call
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run,
+                    self.process_data_chunk_with_stats,
+                    index,
+                    sub_data1,
+                    sub_data2,
+                    user_input,
+                )
+                for index, (sub_data1, sub_data2) in enumerate(chunks)
+            ]
+            partial_answers = [future.result() for future in futures]
+
+        self.last_chunk_report = [
+            {key: value for key, value in answer.items() if key != "content"}
+            for answer in partial_answers
+        ]
+        for report in self.last_chunk_report:
+            print(
+                f"chunk {report['chunk']}: {report['latency']:.2f}s, "
+                f"{report['input_tokens']} input tokens, "
+                f"{report['output_tokens']} output tokens"
+            )
+        return partial_answers
+
+    def reduce_chunk_answers(
+        self, partial_answers: List[Dict[str, Any]], user_input: str
+    ) -> str:
+        """Merge the per-chunk answers into one coherent response."""
+        if len(partial_answers) == 1:
+            return partial_answers[0]["content"]
+        messages = self.prompter.reduce_polymarket_answers(
+            [answer["content"] for answer in partial_answers], user_input
+        )
+        result = self.llm.invoke(
+            messages, config={"run_name": "get_polymarket_llm.reduce"}
+        )
+        return result.content
+
     def filter_events(self, events: "list[SimpleEvent]") -> str:
         prompt = self.prompter.filter_events(events)
-        result = self.llm.invoke(prompt)
+        result = self.llm.invoke(prompt, config={"run_name": "filter_events"})
         return result.content
 
-    def filter_events_with_rag(self, events: "list[SimpleEvent]") -> str:
+    @traced("executor.filter_events_with_rag", count_result=True)
+    def filter_events_with_rag(
+        self,
+        events: "list[SimpleEvent]",
+        top_k: int = None,
+        metadata_filter: MetadataFilter = None,
+    ) -> "list[tuple]":
         prompt = self.prompter.filter_events()
         print()
         print("... prompting ... ", prompt)
         print()
-        return self.chroma.events(events, prompt)
+        return self.chroma.events(
+            events,
+            prompt,
+            k=top_k or self.rag_top_k,
+            metadata_filter=metadata_filter or self.event_filter,
+            hybrid=True,
+        )
+
+    def event_market_ids(self, filtered_event) -> List[str]:
+        """Market ids of one RAG ``(Document, score)`` event result."""
+        return filtered_event[0].metadata["markets"].split(",")
+
+    @traced("executor.fetch_market")
+    def fetch_market(self, market_id: str) -> SimpleMarket:
+        market_data = self.gamma.get_market(market_id)
+        return self.polymarket.map_api_to_market(market_data)
+
+    def snapshot_market(self, snapshot: MarketSnapshot, market_id: str) -> SimpleMarket:
+        """``fetch_market`` from ``snapshot``, read live when it lacks the market."""
+        market_data = snapshot.market(market_id)
+        if market_data is None:
+            return self.fetch_market(market_id)
+        return self.polymarket.map_api_to_market(market_data)
 
     def map_filtered_events_to_markets(
         self, filtered_events: "list[SimpleEvent]"
     ) -> "list[SimpleMarket]":
-        markets = []
-        for e in filtered_events:
-            data = json.loads(e[0].json())
-            market_ids = data["metadata"]["markets"].split(",")
-            for market_id in market_ids:
-                market_data = self.gamma.get_market(market_id)
-                formatted_market_data = self.polymarket.map_api_to_market(market_data)
-                markets.append(formatted_market_data)
-        return markets
-
-    def filter_markets(self, markets) -> "list[tuple]":
+        return [
+            self.fetch_market(market_id)
+            for e in filtered_events
+            for market_id in self.event_market_ids(e)
+        ]
+
+    def market_stages(self, snapshot: MarketSnapshot = None) -> List[Stage]:
+        """
+        Stages shared by the Trader and Creator graphs: tradeable events, RAG
+        filtered events, and their markets, fetched as soon as each filtered
+        event arrives. With a ``snapshot`` the events and markets are read
+        from it; only what it lacks is fetched.
+        """
+        events = lambda _: self.polymarket.get_all_tradeable_events()
+        fetch_market = self.fetch_market
+        if snapshot is not None:
+            if snapshot.events is not None:
+                events = lambda _: [SimpleEvent(**event) for event in snapshot.events]
+            fetch_market = lambda market_id: self.snapshot_market(snapshot, market_id)
+        return [
+            Stage("events", events, mode="flat_map"),
+            Stage("filtered_events", self.filter_events_with_rag, mode="batch"),
+            Stage(
+                "market_ids", self.event_market_ids, mode="flat_map", checkpoint=False
+            ),
+            Stage("markets", fetch_market, concurrency=self.market_fetch_concurrency),
+        ]
+
+    def selection_stages(self, snapshot: MarketSnapshot = None) -> List[Stage]:
+        """
+        ``market_stages`` and the RAG market filter: everything the Trader and
+        Creator graphs have in common, shared between their runs when
+        PIPELINE_SHARE_SECONDS is set.
+        """
+        return self.market_stages(snapshot) + [
+            Stage("filtered_markets", self.filter_markets, mode="batch", shared=True)
+        ]
+
+    def selection_key(self) -> str:
+        """The settings the shared market selection depends on."""
+        return json.dumps(
+            {
+                "rag_top_k": self.rag_top_k,
+                "event_filter": self.event_filter.model_dump(),
+                "market_filter": self.market_filter.model_dump(),
+                "embeddings": os.getenv("EMBEDDING_PROVIDER", "openai"),
+                "embedding_model": os.getenv("EMBEDDING_MODEL", ""),
+            },
+            sort_keys=True,
+        )
+
+    def pipeline(self, stages: List[Stage], store: RunStateStore = None) -> Pipeline:
+        shared = get_shared_results()
+        return Pipeline(
+            stages,
+            retries=self.stage_retries,
+            backoff=self.stage_backoff,
+            store=store,
+            shared=shared,
+            share_key=self.selection_key() if shared is not None else None,
+        )
+
+    def select_markets(
+        self, snapshot: MarketSnapshot = None
+    ) -> Tuple[Dict[str, StageStats], list]:
+        """Run the selection stages alone: per-stage stats and the filtered markets."""
+        pipeline = self.pipeline(self.selection_stages(snapshot))
+        filtered_markets = pipeline.run_sync()
+        return pipeline.stats, filtered_markets
+
+    @traced("executor.filter_markets", count_result=True)
+    def filter_markets(
+        self,
+        markets,
+        top_k: int = None,
+        metadata_filter: MetadataFilter = None,
+    ) -> "list[tuple]":
         prompt = self.prompter.filter_markets()
         print()
         print("... prompting ... ", prompt)
         print()
-        return self.chroma.markets(markets, prompt)
+        return self.chroma.markets(
+            markets,
+            prompt,
+            k=top_k or self.rag_top_k,
+            metadata_filter=metadata_filter or self.market_filter,
+            hybrid=True,
+        )
 
     def source_best_trade(self, market_object) -> str:
+        return self.forecast_market(market_object).trade
+
+    @traced("executor.forecast_market")
+    def forecast_market(self, market_object, index: int = 0) -> TradeForecast:
+        """Run the superforecaster and trade sizing prompts for one market."""
+        started = time.perf_counter()
         market_document = market_object[0].dict()
         market = market_document["metadata"]
         outcome_prices = ast.literal_eval(market["outcome_prices"])
@@ -177,33 +482,108 @@ class Executor:
         print()
         print("... prompting ... ", prompt)
         print()
-        result = self.llm.invoke(prompt)
-        content = result.content
+        result = self.llm.invoke(
+            prompt, config={"run_name": "source_best_trade.superforecaster"}
+        )
+        forecast = result.content
 
-        print("result: ", content)
+        print("result: ", forecast)
         print()
-        prompt = self.prompter.one_best_trade(content, outcomes, outcome_prices)
+        prompt = self.prompter.one_best_trade(forecast, outcomes, outcome_prices)
         print("... prompting ... ", prompt)
         print()
-        result = self.llm.invoke(prompt)
-        content = result.content
+        result = self.llm.invoke(
+            prompt, config={"run_name": "source_best_trade.one_best_trade"}
+        )
+        trade = result.content
 
-        print("result: ", content)
+        print("result: ", trade)
         print()
-        return content
+        probability, forecast_outcome = parse_forecast(forecast)
+        prices = [float(price) for price in outcome_prices]
+        return TradeForecast(
+            index=index,
+            market_id=str(market["id"]) if market.get("id") is not None else None,
+            question=question,
+            outcomes=outcomes,
+            outcome_prices=prices,
+            forecast=forecast,
+            probability=probability,
+            forecast_outcome=forecast_outcome,
+            trade=trade,
+            edge=forecast_edge(probability, forecast_outcome, outcomes, prices),
+            latency=time.perf_counter() - started,
+            **parse_trade(trade),
+        )
+
+    def try_forecast_market(self, market_object, index: int = 0) -> TradeForecast:
+        """``forecast_market``, with a failure recorded on the forecast instead of raised."""
+        try:
+            return self.forecast_market(market_object, index)
+        except Exception as e:
+            return TradeForecast(
+                index=index,
+                question=market_object[0].metadata.get("question", ""),
+                outcomes=[],
+                outcome_prices=[],
+                error=str(e),
+            )
 
-    def format_trade_prompt_for_execution(self, best_trade: str) -> float:
+    @traced("executor.source_best_trades", count_result=True)
+    def source_best_trades(
+        self, filtered_markets, top_n: int = None, concurrency: int = None
+    ) -> List[TradeForecast]:
+        """
+        Forecast the first ``top_n`` filtered markets concurrently and return
+        them ranked by absolute edge, failed markets last.
+        """
+        candidates = filtered_markets[: top_n or self.trade_candidates]
+        if not candidates:
+            return []
+        workers = max(1, min(concurrency or self.forecast_concurrency, len(candidates)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run,
+                    self.try_forecast_market,
+                    market_object,
+                    index,
+                )
+                for index, market_object in enumerate(candidates)
+            ]
+            forecasts = [future.result() for future in futures]
+        return rank_forecasts(forecasts)
+
+    def start_trade_prefetch(
+        self, filtered_markets, top_n: int = None
+    ) -> TradePrefetch:
+        """
+        Start reading the balance, allowance and order books for the markets
+        ``source_best_trades`` will forecast, so they load during the LLM calls.
+        """
+        candidates = filtered_markets[: top_n or self.trade_candidates]
+        return TradePrefetch(
+            self.polymarket, candidates, shared_pool("trade-prefetch", 8)
+        )
+
+    def format_trade_prompt_for_execution(
+        self, best_trade: str, usdc_balance: float = None
+    ) -> float:
         data = best_trade.split(",")
         # price = re.findall("\d+\.\d+", data[0])[0]
         size = re.findall("\d+\.\d+", data[1])[0]
-        usdc_balance = self.polymarket.get_usdc_balance()
+        if usdc_balance is None:
+            usdc_balance = self.polymarket.get_usdc_balance()
         return float(size) * usdc_balance
 
+    @traced("executor.source_best_market_to_create")
     def source_best_market_to_create(self, filtered_markets) -> str:
-        prompt = self.prompter.create_new_market(filtered_markets)
+        prompt = self.prompter.create_new_market(project_documents(filtered_markets))
         print()
         print("... prompting ... ", prompt)
         print()
-        result = self.llm.invoke(prompt)
+        result = self.llm.invoke(
+            prompt, config={"run_name": "source_best_market_to_create"}
+        )
         content = result.content
         return content
@@ -0,0 +1,333 @@
+"""
+Asyncio stage pipeline with bounded queues between stages.
+
+Items stream from stage to stage as soon as they are produced, so a slow
+stage only holds back the items it is working on. Each stage runs up to
+``concurrency`` items at once; blocking functions (HTTP clients, LLM calls)
+run on threads via ``asyncio.to_thread``, coroutine functions are awaited.
+
+Stage modes:
+
+- ``map``: one output per input item (``None`` drops the item)
+- ``flat_map``: the function returns an iterable, each element is emitted
+- ``batch``: waits for all input items and calls the function once with the
+  list, e.g. for a top-k filter that needs every candidate
+
+A failing call is retried in place, with exponential backoff, up to the
+stage's ``retries``. Given a ``RunStateStore`` and run id, each finished
+stage's outputs are checkpointed and a rerun of the same id starts after the
+last checkpointed stage. Given ``SharedResults`` and a key, the output of
+the last ``shared`` stage is published for other runs, and a run finding a
+fresh one starts after that stage the same way (see
+``agents.application.shared_results``). MEMORY_PROFILE=1 records each run's and stage's
+allocations (see ``agents.utils.memory_profile``).
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+from agents.application.run_state import RunStateStore
+from agents.application.shared_results import SharedResults
+from agents.utils.memory_profile import memory_profile
+from agents.utils.tracing import current_span, span
+
+MODES = ("map", "flat_map", "batch")
+
+_END = object()
+
+
+class StageStats(BaseModel):
+    received: int = 0
+    emitted: int = 0
+    retries: int = 0
+    busy_seconds: float = 0.0
+    # outputs loaded from a checkpoint instead of computed
+    resumed: bool = False
+    # outputs taken from another run's shared result
+    shared: bool = False
+    # seconds since the pipeline started
+    first_output: Optional[float] = None
+    finished: Optional[float] = None
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        concurrency: int = 1,
+        mode: str = "map",
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        checkpoint: bool = True,
+        shared: bool = False,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown stage mode {mode!r}, expected one of {MODES}")
+        if mode == "batch" and concurrency != 1:
+            raise ValueError("batch stages run once and take no concurrency")
+        self.name = name
+        self.fn = fn
+        self.concurrency = max(1, concurrency)
+        self.mode = mode
+        # None falls back to the pipeline's defaults
+        self.retries = retries
+        self.backoff = backoff
+        self.checkpoint = checkpoint
+        # this stage's outputs, and so every stage before it, may be shared
+        # between runs of pipelines with the same share key
+        self.shared = shared
+
+    async def call(self, argument) -> Any:
+        if asyncio.iscoroutinefunction(self.fn):
+            return await self.fn(argument)
+        return await asyncio.to_thread(self.fn, argument)
+
+
+class Pipeline:
+    def __init__(
+        self,
+        stages: List[Stage],
+        queue_size: int = 64,
+        retries: int = 0,
+        backoff: float = 1.0,
+        store: Optional[RunStateStore] = None,
+        shared: Optional[SharedResults] = None,
+        share_key: Optional[str] = None,
+    ) -> None:
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Stage names must be unique: {names}")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.retries = retries
+        self.backoff = backoff
+        self.store = store
+        self.shared = shared
+        self.share_key = share_key
+        self.stats: Dict[str, StageStats] = {}
+        self._outputs: Dict[str, List] = {}
+        self._checkpointed: set = set()
+        # the shared stage whose outputs this run publishes
+        self._publish: Optional[str] = None
+
+    async def _emit(self, stage: Stage, outbox: asyncio.Queue, item) -> None:
+        stats = self.stats[stage.name]
+        if stats.first_output is None:
+            stats.first_output = time.perf_counter() - self._started
+        stats.emitted += 1
+        if stage.name in self._outputs:
+            self._outputs[stage.name].append(item)
+        await outbox.put(item)
+
+    async def _call(self, stage: Stage, argument) -> Any:
+        retries = self.retries if stage.retries is None else stage.retries
+        backoff = self.backoff if stage.backoff is None else stage.backoff
+        for attempt in range(retries + 1):
+            try:
+                return await stage.call(argument)
+            except Exception:
+                if attempt == retries:
+                    raise
+                self.stats[stage.name].retries += 1
+                await asyncio.sleep(backoff * 2**attempt)
+
+    async def _process(self, stage: Stage, outbox: asyncio.Queue, argument) -> None:
+        stats = self.stats[stage.name]
+        started = time.perf_counter()
+        result = await self._call(stage, argument)
+        stats.busy_seconds += time.perf_counter() - started
+        if stage.mode == "map":
+            if result is not None:
+                await self._emit(stage, outbox, result)
+        else:
+            for item in result or ():
+                await self._emit(stage, outbox, item)
+
+    async def _run_stage(
+        self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue
+    ) -> None:
+        # the span starts with the stage's first item rather than while it
+        # waits for upstream; the stage's calls run in copies of this task's
+        # context, so their spans nest under it
+        first = await inbox.get()
+        with span(f"stage.{stage.name}", mode=stage.mode) as current, memory_profile(
+            f"stage.{stage.name}"
+        ):
+            await self._run_stage_items(stage, inbox, outbox, first)
+            stats = self.stats[stage.name]
+            current.set("received", stats.received)
+            current.set("emitted", stats.emitted)
+            current.set("retries", stats.retries)
+
+    async def _run_stage_items(
+        self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue, first
+    ) -> None:
+        stats = self.stats[stage.name]
+
+        if stage.mode == "batch":
+            items = []
+            item = first
+            while item is not _END:
+                stats.received += 1
+                items.append(item)
+                item = await inbox.get()
+            await self._process(stage, outbox, items)
+        else:
+            pending = [first]
+
+            async def worker() -> None:
+                while True:
+                    item = pending.pop() if pending else await inbox.get()
+                    if item is _END:
+                        # leave the marker for the stage's other workers
+                        await inbox.put(_END)
+                        return
+                    stats.received += 1
+                    await self._process(stage, outbox, item)
+
+            await asyncio.gather(*(worker() for _ in range(stage.concurrency)))
+
+        stats.finished = time.perf_counter() - self._started
+        if stage.name in self._outputs:
+            outputs = self._outputs.pop(stage.name)
+            if stage.name == self._publish:
+                self._publish = None
+                self.shared.publish(self.share_key, outputs, self._counts(stage.name))
+            if stage.name in self._checkpointed:
+                await asyncio.to_thread(
+                    self.store.save, self._run_id, stage.name, outputs
+                )
+        await outbox.put(_END)
+
+    def _counts(self, through: str) -> Dict[str, int]:
+        counts = {}
+        for stage in self.stages:
+            counts[stage.name] = self.stats[stage.name].emitted
+            if stage.name == through:
+                return counts
+        return counts
+
+    def _resume_point(self, run_id: str) -> int:
+        """Index of the last checkpointed stage of ``run_id``, -1 for none."""
+        completed = self.store.completed_stages(run_id)
+        for index in range(len(self.stages) - 1, -1, -1):
+            if self.stages[index].name in completed:
+                for stage in self.stages[: index + 1]:
+                    self.stats[stage.name] = StageStats(
+                        emitted=completed.get(stage.name, 0), resumed=True
+                    )
+                return index
+        return -1
+
+    async def run(self, items: Iterable = (None,), run_id: str = None) -> List:
+        """
+        Feed ``items`` to the first stage and return the last stage's outputs.
+        With a store and ``run_id``, resume after the last checkpointed stage.
+        """
+        with span("pipeline.run", run_id=run_id or "") as current, memory_profile(
+            "pipeline.run"
+        ):
+            results = await self._run(items, run_id)
+            current.set("items", len(results))
+            return results
+
+    def _share_point(self) -> int:
+        """Index of the last shared stage, -1 for none or without sharing."""
+        if self.shared is None or self.share_key is None:
+            return -1
+        for index in range(len(self.stages) - 1, -1, -1):
+            if self.stages[index].shared:
+                return index
+        return -1
+
+    async def _run(self, items: Iterable, run_id: Optional[str]) -> List:
+        self._started = time.perf_counter()
+        self._run_id = run_id
+        self.stats = {stage.name: StageStats() for stage in self.stages}
+        self._publish = None
+        stages = self.stages
+        checkpointing = self.store is not None and run_id is not None
+        resume = -1
+        if checkpointing:
+            resume = self._resume_point(run_id)
+            if resume >= 0:
+                items = await asyncio.to_thread(
+                    self.store.load, run_id, self.stages[resume].name
+                )
+                stages = self.stages[resume + 1 :]
+                current_span().set("resumed_after", self.stages[resume].name)
+        share = self._share_point()
+        if share > resume:
+            boundary = self.stages[share]
+            # a resumed run takes a finished result but does not compute one,
+            # its earlier stages' outputs are older than the run
+            result = await asyncio.to_thread(
+                self.shared.claim, self.share_key, resume < 0
+            )
+            if result is not None:
+                for stage in self.stages[: share + 1]:
+                    self.stats[stage.name] = StageStats(
+                        emitted=result.counts.get(stage.name, 0), shared=True
+                    )
+                items = result.items
+                stages = self.stages[share + 1 :]
+                current_span().set("shared_after", boundary.name)
+                if checkpointing and boundary.checkpoint:
+                    await asyncio.to_thread(
+                        self.store.save, run_id, boundary.name, items
+                    )
+            elif resume < 0:
+                self._publish = boundary.name
+        self._checkpointed = {
+            stage.name for stage in stages if checkpointing and stage.checkpoint
+        }
+        self._outputs = {
+            stage.name: []
+            for stage in stages
+            if stage.name in self._checkpointed or stage.name == self._publish
+        }
+        try:
+            return await self._stream(items, stages)
+        finally:
+            if self._publish is not None:
+                # failed before the shared stage finished
+                self.shared.abandon(self.share_key)
+                self._publish = None
+
+    async def _stream(self, items: Iterable, stages: List[Stage]) -> List:
+        if not stages:
+            return list(items)
+        queues = [
+            asyncio.Queue(maxsize=self.queue_size) for _ in range(len(stages) + 1)
+        ]
+        results: List = []
+
+        async def feed() -> None:
+            for item in items:
+                await queues[0].put(item)
+            await queues[0].put(_END)
+
+        async def collect() -> None:
+            while (item := await queues[-1].get()) is not _END:
+                results.append(item)
+
+        tasks = [asyncio.ensure_future(feed()), asyncio.ensure_future(collect())]
+        tasks += [
+            asyncio.ensure_future(self._run_stage(stage, queues[i], queues[i + 1]))
+            for i, stage in enumerate(stages)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return results
+
+    def run_sync(self, items: Iterable = (None,), run_id: str = None) -> List:
+        return asyncio.run(self.run(items, run_id))
@@ -0,0 +1,58 @@
+"""
+Background reads of the account and order book state a trade needs.
+
+The USDC balance, the exchange allowance and the candidate markets' order
+books only depend on which markets were selected, so they are read on a
+thread pool while the LLM forecasts those markets. By the time a trade has
+been chosen and sized, the reads have usually finished.
+"""
+
+import ast
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List
+
+
+def market_token_ids(market_object) -> List[str]:
+    """CLOB token ids of a filtered market ``(Document, score)`` result."""
+    token_ids = market_object[0].metadata.get("clob_token_ids")
+    if not token_ids:
+        return []
+    return [str(token_id) for token_id in ast.literal_eval(token_ids)]
+
+
+def _submit(pool: ThreadPoolExecutor, fn, *args) -> Future:
+    # keep the caller's context, e.g. the current trace span
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+class TradePrefetch:
+    def __init__(self, polymarket, candidates, pool: ThreadPoolExecutor) -> None:
+        self.balance_future: Future = _submit(pool, polymarket.get_usdc_balance)
+        self.allowance_future: Future = _submit(pool, polymarket.get_usdc_allowance)
+        # candidate index -> token id -> order book
+        self.orderbook_futures: Dict[int, Dict[str, Future]] = {
+            index: {
+                token_id: _submit(pool, polymarket.get_orderbook, token_id)
+                for token_id in market_token_ids(market_object)
+            }
+            for index, market_object in enumerate(candidates)
+        }
+
+    def balance(self, timeout: float = None) -> float:
+        return self.balance_future.result(timeout)
+
+    def allowance(self, timeout: float = None) -> float:
+        return self.allowance_future.result(timeout)
+
+    def orderbooks(self, index: int, timeout: float = None) -> Dict[str, Any]:
+        return {
+            token_id: future.result(timeout)
+            for token_id, future in self.orderbook_futures.get(index, {}).items()
+        }
+
+    def cancel(self) -> None:
+        """Drop reads that have not started yet, e.g. for discarded candidates."""
+        for futures in self.orderbook_futures.values():
+            for future in futures.values():
+                future.cancel()
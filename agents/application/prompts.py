@@ -1,8 +1,27 @@
 from typing import List
 from datetime import datetime
 
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from agents.utils.serialization import render
+
 
 class Prompter:
+    def __init__(self, cache_control: bool = False) -> None:
+        # Mark stable system prefixes with Anthropic-style cache_control
+        # breakpoints; only for providers that accept them (see
+        # agents.llm.prompt_cache.supports_cache_control)
+        self.cache_control = cache_control
+
+    def system_message(self, text: str) -> SystemMessage:
+        """Static prompt prefix, identical across calls so providers can cache it."""
+        if not self.cache_control:
+            return SystemMessage(content=text)
+        return SystemMessage(
+            content=[
+                {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+            ]
+        )
 
     def generate_simple_ai_trader(market_description: str, relevant_info: str) -> str:
         return f"""
@@ -36,8 +55,8 @@ class Prompter:
     def prompts_polymarket(
         self, data1: str, data2: str, market_question: str, outcome: str
     ) -> str:
-        current_market_data = str(data1)
-        current_event_data = str(data2)
+        current_market_data = render(data1)
+        current_event_data = render(data2)
         return f"""
         You are an AI assistant for users of a prediction market called Polymarket.
         Users want to place bets based on their beliefs of market outcomes such as political or sports events.
@@ -53,16 +72,40 @@ class Prompter:
         """
 
     def prompts_polymarket(self, data1: str, data2: str) -> str:
-        current_market_data = str(data1)
-        current_event_data = str(data2)
+        current_market_data = render(data1)
+        current_event_data = render(data2)
+        # Instructions first and data last, so the prefix stays cacheable and
+        # only the user's question (a separate message) varies per call
         return f"""
         You are an AI assistant for users of a prediction market called Polymarket.
         Users want to place bets based on their beliefs of market outcomes such as political or sports events.
+        Help users identify markets to trade based on their interests or queries.
+        Provide specific information for markets including probabilities of outcomes.
 
         Here is data for current Polymarket markets {current_market_data} and 
         current Polymarket events {current_event_data}.
-        Help users identify markets to trade based on their interests or queries.
-        Provide specific information for markets including probabilities of outcomes.
+        """
+
+    def reduce_polymarket_answers(
+        self, partial_answers: List[str], user_input: str
+    ) -> str:
+        numbered_answers = "\n\n".join(
+            f"Answer {i + 1}:\n{answer}" for i, answer in enumerate(partial_answers)
+        )
+        return f"""
+        You are an AI assistant for users of a prediction market called Polymarket.
+        The market data was too large to review at once, so it was split into parts
+        and each part was answered separately.
+
+        The user asked: {user_input}
+
+        Here are the answers for each part:
+
+        {numbered_answers}
+
+        Merge them into one coherent answer to the user's question.
+        Remove duplicates, resolve contradictions in favour of the most specific
+        information, and keep the probabilities of outcomes for every market mentioned.
         """
 
     def routing(self, system_message: str) -> str:
@@ -109,12 +152,14 @@ class Prompter:
         """
         )
 
-    def superforecaster(self, question: str, description: str, outcome: str) -> str:
-        return f"""
+    def superforecaster(
+        self, question: str, description: str, outcome: str
+    ) -> List[BaseMessage]:
+        system = """
         You are a Superforecaster tasked with correctly predicting the likelihood of events.
-        Use the following systematic process to develop an accurate prediction for the following
-        question=`{question}` and description=`{description}` combination. 
-        
+        Use the following systematic process to develop an accurate prediction for the
+        question and description combination given by the user.
+
         Here are the key steps to use in your analysis:
 
         1. Breaking Down the Question:
@@ -135,21 +180,27 @@ class Prompter:
             - Express predictions in terms of probabilities rather than certainties.
             - Assign likelihoods to different outcomes and avoid binary thinking.
             - Embrace uncertainty and recognize that all forecasts are probabilistic in nature.
-        
-        Given these steps produce a statement on the probability of outcome=`{outcome}` occuring.
+
+        Given these steps produce a statement on the probability of the user's outcome occuring.
+        """
+        human = f"""
+        question=`{question}`
+        description=`{description}`
+        outcome=`{outcome}`
 
         Give your response in the following format:
 
-        I believe {question} has a likelihood `{float}` for outcome of `{str}`.
+        I believe {question} has a likelihood `{{float}}` for outcome of `{{str}}`.
         """
+        return [self.system_message(system), HumanMessage(content=human)]
 
     def one_best_trade(
         self,
         prediction: str,
         outcomes: List[str],
         outcome_prices: str,
-    ) -> str:
-        return (
+    ) -> List[BaseMessage]:
+        system = (
             self.polymarket_analyst_api()
             + f"""
         
@@ -161,13 +212,9 @@ class Prompter:
                 Visualize yourself consistently achieving outstanding returns, earning recognition as the top trader on Polymarket. You inspire others with your success, setting new standards of excellence in the world of information markets.
 
         """
-            + f"""
-        
-        You made the following prediction for a market: {prediction}
-
-        The current outcomes ${outcomes} prices are: ${outcome_prices}
-
-        Given your prediction, respond with a genius trade in the format:
+            + """
+        Given your prediction for a market and its current outcome prices,
+        respond with a genius trade in the format:
         `
             price:'price_on_the_orderbook',
             size:'percentage_of_total_funds',
@@ -183,9 +230,14 @@ class Prompter:
             size:0.1,
             side:BUY,
         ```
-        
         """
         )
+        human = f"""
+        You made the following prediction for a market: {prediction}
+
+        The current outcomes ${outcomes} prices are: ${outcome_prices}
+        """
+        return [self.system_message(system), HumanMessage(content=human)]
 
     def format_price_from_one_best_trade_output(self, output: str) -> str:
         return f"""
@@ -225,7 +277,7 @@ class Prompter:
 
     def create_new_market(self, filtered_markets: str) -> str:
         return f"""
-        {filtered_markets}
+        {render(filtered_markets)}
         
         Invent an information market similar to these markets that ends in the future,
         at least 6 months after today, which is: {datetime.today().strftime('%Y-%m-%d')},
@@ -0,0 +1,189 @@
+"""
+Checkpoints of pipeline stage outputs, so a failed run resumes where it
+stopped instead of starting over.
+
+Every run gets a directory under RUN_STATE_DIR holding one pickle per
+finished stage and a ``manifest.json`` with the item counts. Runs are
+resumed only while they are younger than RUN_STATE_MAX_AGE seconds, since
+market data goes stale.
+
+Whoever works on a run holds an exclusive lock on the ``lock`` file in its
+directory, so neither several processes sharing RUN_STATE_DIR nor
+concurrent calls in one process (e.g. the server's requests) resume the same
+run; the lock goes away with the process, so the runs of a crashed process
+can be resumed.
+"""
+
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def _try_lock(handle: IO) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+class RunStateStore:
+    def __init__(self, root: str = None, max_age: float = None) -> None:
+        self.root = Path(root or os.getenv("RUN_STATE_DIR", "run_state"))
+        self.max_age = (
+            max_age
+            if max_age is not None
+            else float(os.getenv("RUN_STATE_MAX_AGE", "3600"))
+        )
+        # run id -> open lock file of the runs this store works on
+        self._locks: Dict[str, IO] = {}
+        self._locks_lock = threading.Lock()
+
+    def new_run_id(self, prefix: str) -> str:
+        """Create a run, claimed for the caller."""
+        run_id = f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._write_manifest(
+            run_id, {"created": time.time(), "complete": False, "stages": {}}
+        )
+        self.claim(run_id)
+        return run_id
+
+    def claim(self, run_id: str) -> bool:
+        """
+        Lock the run for the caller; False while anyone else holds it,
+        including another caller of this store, e.g. a concurrent request.
+        """
+        with self._locks_lock:
+            if run_id in self._locks:
+                return False
+            path = self._run_dir(run_id) / "lock"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(path, "a")
+            if not _try_lock(handle):
+                handle.close()
+                return False
+            self._locks[run_id] = handle
+            return True
+
+    def release(self, run_id: str) -> None:
+        with self._locks_lock:
+            handle = self._locks.pop(run_id, None)
+        if handle is not None:
+            handle.close()
+
+    def start(self, prefix: str, run_id: str = None) -> str:
+        """
+        Claim ``run_id``, else the latest unfinished run of ``prefix`` no
+        one else is working on, else a new run.
+        """
+        if run_id is not None:
+            if not self.claim(run_id):
+                raise RuntimeError(f"Run {run_id} is already in progress")
+            return run_id
+        return self.latest_unfinished(prefix) or self.new_run_id(prefix)
+
+    def _run_dir(self, run_id: str) -> Path:
+        return self.root / run_id
+
+    def manifest(self, run_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((self._run_dir(run_id) / "manifest.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, run_id: str, manifest: Dict[str, Any]) -> None:
+        self._atomic_write(
+            self._run_dir(run_id) / "manifest.json", json.dumps(manifest).encode()
+        )
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        # a crash mid-write must not leave a truncated checkpoint behind
+        os.replace(tmp, path)
+
+    def save(self, run_id: str, stage: str, items: List) -> None:
+        self._atomic_write(self._run_dir(run_id) / f"{stage}.pkl", pickle.dumps(items))
+        manifest = self.manifest(run_id) or {
+            "created": time.time(),
+            "complete": False,
+            "stages": {},
+        }
+        manifest["stages"][stage] = {"items": len(items), "saved": time.time()}
+        self._write_manifest(run_id, manifest)
+
+    def load(self, run_id: str, stage: str) -> Optional[List]:
+        manifest = self.manifest(run_id)
+        if manifest is None or stage not in manifest["stages"]:
+            return None
+        with open(self._run_dir(run_id) / f"{stage}.pkl", "rb") as f:
+            return pickle.load(f)
+
+    def discard(self, run_id: str, stage: str) -> None:
+        """Forget a stage's checkpoint so a resumed run computes it again."""
+        manifest = self.manifest(run_id)
+        if manifest is not None and manifest["stages"].pop(stage, None) is not None:
+            self._write_manifest(run_id, manifest)
+
+    def completed_stages(self, run_id: str) -> Dict[str, int]:
+        """Stage name -> number of checkpointed items."""
+        manifest = self.manifest(run_id) or {"stages": {}}
+        return {name: stage["items"] for name, stage in manifest["stages"].items()}
+
+    def finish(self, run_id: str) -> None:
+        manifest = self.manifest(run_id)
+        if manifest is not None:
+            manifest["complete"] = True
+            self._write_manifest(run_id, manifest)
+
+    def latest_unfinished(self, prefix: str) -> Optional[str]:
+        """
+        The newest incomplete run of ``prefix`` that is still fresh enough to
+        resume and not locked by anyone else, claimed for the caller.
+        """
+        if not self.root.is_dir():
+            return None
+        now = time.time()
+        candidates = []
+        for path in self.root.glob(f"{prefix}-*"):
+            manifest = self.manifest(path.name)
+            if manifest is None or manifest["complete"]:
+                continue
+            if now - manifest["created"] <= self.max_age:
+                candidates.append((manifest["created"], path.name))
+        for _, run_id in sorted(candidates, reverse=True):
+            if self.claim(run_id):
+                return run_id
+        return None
+
+    def delete(self, run_id: str) -> None:
+        self.release(run_id)
+        shutil.rmtree(self._run_dir(run_id), ignore_errors=True)
+
+    def prune(self) -> None:
+        """Delete runs older than ``max_age`` that nobody is working on."""
+        if not self.root.is_dir():
+            return
+        now = time.time()
+        for path in self.root.iterdir():
+            manifest = self.manifest(path.name)
+            if manifest is None or now - manifest["created"] > self.max_age:
+                if self.claim(path.name):
+                    self.delete(path.name)
@@ -0,0 +1,150 @@
+"""
+Stage outputs shared between pipeline runs in the same process.
+
+The Trader and Creator graphs, and the server's recommendation endpoint,
+start with the same stages: tradeable events, the RAG event filter, market
+reads and the RAG market filter. With PIPELINE_SHARE_SECONDS set, the first
+run publishes the output of the last shared stage (``Stage(shared=True)``)
+and later runs with the same key start after it, like a run resumed from a
+checkpoint, for that many seconds. Runs that start while the first is still
+computing wait for it instead of repeating the work (single flight); if it
+fails, or has not finished after PIPELINE_SHARE_WAIT_SECONDS, one of them
+takes over.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+class SharedResult:
+    __slots__ = ("items", "counts", "created")
+
+    def __init__(self, items: List, counts: Dict[str, int]) -> None:
+        self.items = items
+        # items emitted per stage, up to the shared one
+        self.counts = counts
+        self.created = time.time()
+
+
+class _Entry:
+    __slots__ = ("done", "result")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[SharedResult] = None
+
+
+class SharedResults:
+    def __init__(self, max_age: float, wait_timeout: Optional[float] = None) -> None:
+        self.max_age = max_age
+        # how long to wait for another run's result, None waits until it ends
+        self.wait_timeout = wait_timeout
+        self.hits = 0
+        self.waits = 0
+        self.misses = 0
+        self.takeovers = 0
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, entry: _Entry) -> bool:
+        return (
+            entry.result is None or time.time() - entry.result.created <= self.max_age
+        )
+
+    def claim(self, key: str, compute: bool = True) -> Optional[SharedResult]:
+        """
+        A fresh result for ``key``, waiting for one being computed. Returns
+        None when there is none; with ``compute`` the caller then owns the
+        computation and must ``publish`` or ``abandon`` it. A computation
+        not done within ``wait_timeout`` is taken to be stuck: the caller
+        takes it over and the other waiters wait for the caller instead.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and not self._fresh(entry):
+                    del self._entries[key]
+                    entry = None
+                if entry is not None and entry.result is not None:
+                    self.hits += 1
+                    return entry.result
+                if entry is None:
+                    if not compute:
+                        return None
+                    self.misses += 1
+                    self._entries[key] = _Entry()
+                    return None
+                self.waits += 1
+            if not entry.done.wait(self.wait_timeout):
+                with self._lock:
+                    if self._entries.get(key) is entry and entry.result is None:
+                        self.takeovers += 1
+                        self._entries[key] = _Entry()
+                        taken_over = True
+                    else:
+                        taken_over = False
+                if taken_over:
+                    entry.done.set()
+                    return None
+            if entry.result is not None:
+                return entry.result
+            # the computing run failed: take over or wait for whoever did
+
+    def publish(self, key: str, items: List, counts: Dict[str, int]) -> None:
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.result = SharedResult(items, counts)
+        entry.done.set()
+
+    def abandon(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.result is not None:
+                return
+            del self._entries[key]
+        entry.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "waits": self.waits,
+                "misses": self.misses,
+                "takeovers": self.takeovers,
+            }
+
+
+_shared: Optional[SharedResults] = None
+_configured = False
+_shared_lock = threading.Lock()
+
+
+def get_shared_results() -> Optional[SharedResults]:
+    """The process's shared results, None unless PIPELINE_SHARE_SECONDS is set."""
+    global _shared, _configured
+    if not _configured:
+        with _shared_lock:
+            if not _configured:
+                max_age = float(os.getenv("PIPELINE_SHARE_SECONDS", "0") or 0)
+                wait_timeout = float(os.getenv("PIPELINE_SHARE_WAIT_SECONDS", "300"))
+                _shared = (
+                    SharedResults(max_age, wait_timeout or None)
+                    if max_age > 0
+                    else None
+                )
+                _configured = True
+    return _shared
+
+
+def configure(
+    max_age: float, wait_timeout: Optional[float] = None
+) -> Optional[SharedResults]:
+    """Replace the process's shared results, e.g. from a test; 0 disables sharing."""
+    global _shared, _configured
+    with _shared_lock:
+        _shared = SharedResults(max_age, wait_timeout) if max_age > 0 else None
+        _configured = True
+    return _shared
@@ -0,0 +1,324 @@
+"""
+One market snapshot per tick, shared between processes.
+
+``build_snapshot`` fetches the current markets (and optionally the tradeable
+events, order books and embeddings) once. The numeric columns and the
+embedding matrix are copied into a single shared memory block by
+``SharedSnapshot``; worker processes ``attach`` to it through a small
+picklable ``SnapshotHandle`` and get read-only numpy views, so the data is not
+copied per strategy. Text fields and events travel as one compact JSON blob
+in the same block.
+
+In the building process the snapshot also keeps the raw Gamma markets, so
+``Trader`` and ``Creator`` runs given the snapshot read their events and
+markets from it instead of fetching them again.
+"""
+
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from agents.utils.tracing import current_span, traced
+
+NUMERIC_COLUMNS = (
+    "price_yes",
+    "price_no",
+    "liquidity",
+    "volume",
+    "spread",
+    "end_ts",
+    "best_bid",
+    "best_ask",
+)
+
+_ALIGNMENT = 64
+
+
+def _float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _list(value) -> List:
+    # Gamma encodes list fields as JSON strings
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return list(value) if isinstance(value, (list, tuple)) else []
+
+
+def _timestamp(value) -> float:
+    if not value:
+        return float("nan")
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return float("nan")
+
+
+def _side(orderbook, name: str) -> List[float]:
+    # py_clob_client returns OrderBookSummary objects, JSON fixtures dicts
+    orders = (
+        orderbook.get(name) if isinstance(orderbook, dict) else getattr(orderbook, name)
+    )
+    return [
+        _float(order["price"] if isinstance(order, dict) else order.price)
+        for order in orders or []
+    ]
+
+
+def _best_prices(orderbook) -> Tuple[float, float]:
+    bids = _side(orderbook, "bids")
+    asks = _side(orderbook, "asks")
+    return (max(bids) if bids else float("nan"), min(asks) if asks else float("nan"))
+
+
+class MarketSnapshot:
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        records: List[Dict[str, Any]],
+        taken_at: float,
+        embeddings: Optional[np.ndarray] = None,
+        events: Optional[List[Dict[str, Any]]] = None,
+        raw_markets: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        self.columns = columns
+        self.records = records
+        self.taken_at = taken_at
+        self.embeddings = embeddings
+        # tradeable events as SimpleEvent dicts, None when they were not read
+        self.events = events
+        # market id -> raw Gamma market, only in the process that built it
+        self.raw_markets = raw_markets or {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def market(self, market_id) -> Optional[Dict[str, Any]]:
+        """The raw Gamma market, None when it is not in the snapshot."""
+        return self.raw_markets.get(str(market_id))
+
+    @classmethod
+    def from_markets(
+        cls,
+        markets: List[Dict[str, Any]],
+        orderbooks: Dict[str, Any] = None,
+        embeddings: Optional[np.ndarray] = None,
+        events: Optional[List[Dict[str, Any]]] = None,
+    ) -> "MarketSnapshot":
+        """Columnar snapshot of raw Gamma market objects."""
+        orderbooks = orderbooks or {}
+        columns = {
+            name: np.full(len(markets), np.nan, dtype=np.float64)
+            for name in NUMERIC_COLUMNS
+        }
+        records = []
+        for i, market in enumerate(markets):
+            prices = [_float(price) for price in _list(market.get("outcomePrices"))]
+            token_ids = [str(token) for token in _list(market.get("clobTokenIds"))]
+            if prices:
+                columns["price_yes"][i] = prices[0]
+            if len(prices) > 1:
+                columns["price_no"][i] = prices[1]
+            columns["liquidity"][i] = _float(
+                market.get("liquidityNum", market.get("liquidity"))
+            )
+            columns["volume"][i] = _float(market.get("volumeNum", market.get("volume")))
+            columns["spread"][i] = _float(market.get("spread"))
+            columns["end_ts"][i] = _timestamp(market.get("endDate"))
+            if token_ids and token_ids[0] in orderbooks:
+                columns["best_bid"][i], columns["best_ask"][i] = _best_prices(
+                    orderbooks[token_ids[0]]
+                )
+            records.append(
+                {
+                    "id": str(market.get("id")),
+                    "question": market.get("question") or "",
+                    "description": market.get("description") or "",
+                    "outcomes": _list(market.get("outcomes")),
+                    "clob_token_ids": token_ids,
+                }
+            )
+        raw_markets = {str(market.get("id")): market for market in markets}
+        return cls(columns, records, time.time(), embeddings, events, raw_markets)
+
+
+@traced("snapshot.build")
+def build_snapshot(
+    gamma,
+    polymarket=None,
+    embeddings=None,
+    limit: int = None,
+    books: bool = False,
+    book_workers: int = 8,
+) -> MarketSnapshot:
+    """
+    Fetch the current markets once, and the tradeable events when
+    ``polymarket`` is given. ``books`` reads the first outcome's order book
+    per market through ``polymarket``; ``embeddings`` (a LangChain
+    Embeddings) embeds the question and description of every market.
+    """
+    markets = gamma.get_all_current_markets()
+    if limit:
+        markets = markets[:limit]
+
+    events = None
+    if polymarket is not None:
+        events = [
+            event.model_dump() if isinstance(event, BaseModel) else dict(event)
+            for event in polymarket.get_all_tradeable_events()
+        ]
+
+    orderbooks = {}
+    if books and polymarket is not None:
+        token_ids = [
+            str(tokens[0])
+            for tokens in (_list(m.get("clobTokenIds")) for m in markets)
+            if tokens
+        ]
+        with ThreadPoolExecutor(max_workers=book_workers) as pool:
+            for token_id, book in zip(
+                token_ids, pool.map(_safe_orderbook(polymarket), token_ids)
+            ):
+                if book is not None:
+                    orderbooks[token_id] = book
+
+    matrix = None
+    if embeddings is not None and markets:
+        texts = [
+            f"{m.get('question') or ''}\n{m.get('description') or ''}" for m in markets
+        ]
+        matrix = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    current_span().set("items", len(markets))
+    return MarketSnapshot.from_markets(markets, orderbooks, matrix, events)
+
+
+def _safe_orderbook(polymarket):
+    def read(token_id):
+        try:
+            return polymarket.get_orderbook(token_id)
+        except Exception as e:
+            print(f"[snapshot] order book {token_id}: {e}")
+            return None
+
+    return read
+
+
+class SnapshotHandle(BaseModel):
+    """Everything a worker needs to find the snapshot in shared memory."""
+
+    name: str
+    taken_at: float
+    # column -> (offset, dtype, shape)
+    columns: Dict[str, Tuple[int, str, Tuple[int, ...]]]
+    embeddings: Optional[Tuple[int, str, Tuple[int, ...]]] = None
+    records: Tuple[int, int]
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+class SharedSnapshot:
+    """Owns the shared memory copy of a snapshot; ``close`` releases it."""
+
+    def __init__(self, snapshot: MarketSnapshot) -> None:
+        arrays = dict(snapshot.columns)
+        if snapshot.embeddings is not None:
+            arrays["__embeddings__"] = snapshot.embeddings
+        records = json.dumps(
+            {"markets": snapshot.records, "events": snapshot.events},
+            separators=(",", ":"),
+        ).encode()
+
+        layout = {}
+        offset = 0
+        for name, array in arrays.items():
+            offset = _aligned(offset)
+            layout[name] = (offset, array.dtype.str, tuple(array.shape))
+            offset += array.nbytes
+        records_offset = _aligned(offset)
+        size = max(records_offset + len(records), 1)
+
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        for name, array in arrays.items():
+            start, dtype, shape = layout[name]
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=start)[...] = (
+                array
+            )
+        self.shm.buf[records_offset : records_offset + len(records)] = records
+
+        embeddings = layout.pop("__embeddings__", None)
+        self.handle = SnapshotHandle(
+            name=self.shm.name,
+            taken_at=snapshot.taken_at,
+            columns=layout,
+            embeddings=embeddings,
+            records=(records_offset, len(records)),
+        )
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach_shm(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if multiprocessing.get_start_method() != "fork":
+        # a spawned worker has its own resource tracker, which would unlink
+        # the block when the worker exits; forked workers share the owner's
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+@contextmanager
+def attach(handle: SnapshotHandle) -> Iterator[MarketSnapshot]:
+    """Read-only snapshot views over the shared block, valid inside the block."""
+    shm = _attach_shm(handle.name)
+
+    def view(offset: int, dtype: str, shape: Tuple[int, ...]) -> np.ndarray:
+        array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        return array
+
+    start, length = handle.records
+    text = json.loads(bytes(shm.buf[start : start + length]))
+    snapshot = MarketSnapshot(
+        {name: view(*layout) for name, layout in handle.columns.items()},
+        text["markets"],
+        handle.taken_at,
+        view(*handle.embeddings) if handle.embeddings else None,
+        text["events"],
+    )
+    try:
+        yield snapshot
+    finally:
+        # the views must be gone before the mapping can be closed
+        snapshot.columns = {}
+        snapshot.embeddings = None
+        del snapshot
+        try:
+            shm.close()
+        except BufferError:
+            # a view escaped, e.g. in a strategy's result; the mapping is
+            # released when the worker exits
+            pass
@@ -0,0 +1,206 @@
+"""
+Run many strategies against one market snapshot per tick.
+
+``StrategyRunner.tick`` builds a single ``MarketSnapshot``, publishes it in
+shared memory and runs every strategy on a process pool against read-only
+views of it, so adding a strategy only adds its own compute. Strategies are
+pickled to the workers: define them at module level, keep their state
+small, and return plain data (lists, dicts, copies) rather than views of
+the snapshot's arrays.
+
+``Trader.one_best_trade`` and ``Creator.one_best_market`` take the same
+snapshot (``StrategyRunner.last_snapshot`` after a tick) to select markets
+from it rather than fetching the universe again.
+"""
+
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from agents.application.snapshot import (
+    MarketSnapshot,
+    SharedSnapshot,
+    SnapshotHandle,
+    attach,
+    build_snapshot,
+)
+from agents.utils.tracing import span
+
+
+class StrategyResult(BaseModel):
+    name: str
+    result: Any = None
+    error: Optional[str] = None
+    latency: float = 0.0
+
+
+class Strategy(ABC):
+    name = "strategy"
+
+    @abstractmethod
+    def run(self, snapshot: MarketSnapshot) -> Any:
+        """Compute the strategy's result from one snapshot."""
+
+
+class LiquidityScreen(Strategy):
+    """The most liquid markets with a tight spread and a price in range."""
+
+    name = "liquidity_screen"
+
+    def __init__(
+        self,
+        k: int = 10,
+        max_spread: float = 0.05,
+        min_price: float = 0.05,
+        max_price: float = 0.95,
+    ) -> None:
+        self.k = k
+        self.max_spread = max_spread
+        self.min_price = min_price
+        self.max_price = max_price
+
+    def run(self, snapshot: MarketSnapshot) -> List[Dict[str, Any]]:
+        price = snapshot["price_yes"]
+        # NaN compares False, so markets without data drop out here
+        mask = (
+            (snapshot["spread"] <= self.max_spread)
+            & (price >= self.min_price)
+            & (price <= self.max_price)
+        )
+        candidates = np.flatnonzero(mask)
+        order = candidates[np.argsort(-snapshot["liquidity"][candidates])][: self.k]
+        return [
+            {
+                "id": snapshot.records[i]["id"],
+                "question": snapshot.records[i]["question"],
+                "price": float(price[i]),
+                "liquidity": float(snapshot["liquidity"][i]),
+            }
+            for i in order
+        ]
+
+
+class SimilarityScreen(Strategy):
+    """Markets closest to a query by cosine similarity of their embeddings."""
+
+    name = "similarity_screen"
+
+    def __init__(self, query_vector: List[float], k: int = 10) -> None:
+        self.query_vector = np.asarray(query_vector, dtype=np.float32)
+        self.k = k
+
+    def run(self, snapshot: MarketSnapshot) -> List[Dict[str, Any]]:
+        if snapshot.embeddings is None or not len(snapshot):
+            return []
+        matrix = snapshot.embeddings
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(self.query_vector)
+        scores = (matrix @ self.query_vector) / np.where(norms == 0, 1, norms)
+        order = np.argsort(-scores)[: self.k]
+        return [
+            {
+                "id": snapshot.records[i]["id"],
+                "question": snapshot.records[i]["question"],
+                "score": float(scores[i]),
+            }
+            for i in order
+        ]
+
+
+def run_strategy(strategy: Strategy, handle: SnapshotHandle) -> StrategyResult:
+    """Worker entry point: run one strategy against the shared snapshot."""
+    started = time.perf_counter()
+    try:
+        with attach(handle) as snapshot:
+            result = strategy.run(snapshot)
+        return StrategyResult(
+            name=strategy.name, result=result, latency=time.perf_counter() - started
+        )
+    except Exception as e:
+        return StrategyResult(
+            name=strategy.name,
+            error=f"{type(e).__name__}: {e}",
+            latency=time.perf_counter() - started,
+        )
+
+
+class StrategyRunner:
+    def __init__(
+        self,
+        strategies: List[Strategy],
+        gamma=None,
+        polymarket=None,
+        embeddings=None,
+        max_workers: int = None,
+        books: bool = None,
+        limit: int = None,
+    ) -> None:
+        names = [strategy.name for strategy in strategies]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Strategy names must be unique: {names}")
+        if gamma is None:
+            from agents.polymarket.gamma import GammaMarketClient
+
+            gamma = GammaMarketClient()
+        self.strategies = strategies
+        self.gamma = gamma
+        self.polymarket = polymarket
+        self.embeddings = embeddings
+        self.books = (
+            books
+            if books is not None
+            else os.getenv("STRATEGY_SNAPSHOT_BOOKS", "").lower()
+            in ("1", "true", "yes")
+        )
+        self.limit = limit or int(os.getenv("STRATEGY_SNAPSHOT_LIMIT", "0")) or None
+        self.pool = ProcessPoolExecutor(
+            max_workers=max_workers
+            or int(os.getenv("STRATEGY_WORKERS", "0"))
+            or min(len(strategies), os.cpu_count() or 1)
+            or 1
+        )
+        self.last_snapshot: Optional[MarketSnapshot] = None
+        self.last_snapshot_seconds: Optional[float] = None
+
+    def build_snapshot(self) -> MarketSnapshot:
+        return build_snapshot(
+            self.gamma,
+            polymarket=self.polymarket,
+            embeddings=self.embeddings,
+            limit=self.limit,
+            books=self.books,
+        )
+
+    def tick(self, snapshot: MarketSnapshot = None) -> Dict[str, StrategyResult]:
+        """Build (or take) one snapshot and run every strategy against it."""
+        with span("strategies.tick", strategies=len(self.strategies)):
+            started = time.perf_counter()
+            snapshot = snapshot if snapshot is not None else self.build_snapshot()
+            self.last_snapshot = snapshot
+            self.last_snapshot_seconds = time.perf_counter() - started
+            shared = SharedSnapshot(snapshot)
+            try:
+                futures = [
+                    self.pool.submit(run_strategy, strategy, shared.handle)
+                    for strategy in self.strategies
+                ]
+                results = [future.result() for future in futures]
+            finally:
+                shared.close()
+        return {result.name: result for result in results}
+
+    def close(self) -> None:
+        self.pool.shutdown()
+
+
+if __name__ == "__main__":
+    runner = StrategyRunner([LiquidityScreen()])
+    try:
+        for name, result in runner.tick().items():
+            print(name, result.error or result.result)
+    finally:
+        runner.close()
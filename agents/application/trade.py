@@ -1,6 +1,11 @@
-from agents.application.executor import Executor as Agent
+from agents.application.executor import Executor as Agent, rank_forecasts
+from agents.application.pipeline import Pipeline, Stage
+from agents.application.run_state import RunStateStore
+from agents.application.snapshot import MarketSnapshot
 from agents.polymarket.gamma import GammaMarketClient as Gamma
 from agents.polymarket.polymarket import Polymarket
+from agents.utils.memory_profile import profiled
+from agents.utils.tracing import traced
 
 import shutil
 
@@ -10,6 +15,7 @@ class Trader:
         self.polymarket = Polymarket()
         self.gamma = Gamma()
         self.agent = Agent()
+        self.run_state = RunStateStore()
 
     def pre_trade_logic(self) -> None:
         self.clear_local_dbs()
@@ -24,7 +30,40 @@ class Trader:
         except:
             pass
 
-    def one_best_trade(self) -> None:
+    def build_pipeline(self, snapshot: MarketSnapshot = None) -> Pipeline:
+        """
+        events -> filtered events -> markets -> filtered markets -> candidates
+        -> forecasts. Outputs ``(TradeForecast, market_object)`` pairs.
+        """
+        return self.agent.pipeline(
+            self.agent.selection_stages(snapshot)
+            + [
+                Stage("candidates", self.select_candidates, mode="batch"),
+                Stage(
+                    "forecasts",
+                    self.forecast_candidate,
+                    concurrency=self.agent.forecast_concurrency,
+                ),
+            ],
+            store=self.run_state,
+        )
+
+    def select_candidates(self, filtered_markets) -> list:
+        """Keep the top filtered markets and start prefetching their trade state."""
+        candidates = filtered_markets[: self.agent.trade_candidates]
+        # balance, allowance and order books load while the LLM forecasts
+        self.prefetch = self.agent.start_trade_prefetch(candidates)
+        return list(enumerate(candidates))
+
+    def forecast_candidate(self, candidate) -> tuple:
+        index, market_object = candidate
+        return self.agent.try_forecast_market(market_object, index), market_object
+
+    @traced("trader.one_best_trade")
+    @profiled("trader.one_best_trade")
+    def one_best_trade(
+        self, run_id: str = None, snapshot: MarketSnapshot = None
+    ) -> None:
         """
 
         one_best_trade is a strategy that evaluates all events, markets, and orderbooks
@@ -33,36 +72,81 @@ class Trader:
 
         then executes that trade without any human intervention
 
+        every stage's output is checkpointed under the run id; a failed run is
+        resumed from its last finished stage by the next call
+
+        with a ``snapshot`` (see agents.application.strategies) the events and
+        markets are read from it instead of the APIs
+
         """
+        self.run_state.prune()
+        run_id = self.run_state.start("trade", run_id)
+        self.prefetch = None
+        forecasted = False
         try:
             self.pre_trade_logic()
 
-            events = self.polymarket.get_all_tradeable_events()
-            print(f"1. FOUND {len(events)} EVENTS")
-
-            filtered_events = self.agent.filter_events_with_rag(events)
-            print(f"2. FILTERED {len(filtered_events)} EVENTS")
-
-            markets = self.agent.map_filtered_events_to_markets(filtered_events)
-            print()
-            print(f"3. FOUND {len(markets)} MARKETS")
-
-            print()
-            filtered_markets = self.agent.filter_markets(markets)
-            print(f"4. FILTERED {len(filtered_markets)} MARKETS")
-
-            market = filtered_markets[0]
-            best_trade = self.agent.source_best_trade(market)
+            pipeline = self.build_pipeline(snapshot)
+            results = pipeline.run_sync(run_id=run_id)
+            forecasted = True
+            stats = pipeline.stats
+            print(f"1. FOUND {stats['events'].emitted} EVENTS")
+            print(f"2. FILTERED {stats['filtered_events'].emitted} EVENTS")
+            print(f"3. FOUND {stats['markets'].emitted} MARKETS")
+            print(f"4. FILTERED {stats['filtered_markets'].emitted} MARKETS")
+
+            markets = {forecast.index: market for forecast, market in results}
+            forecasts = rank_forecasts([forecast for forecast, _ in results])
+            if not forecasts:
+                raise Exception("no markets left to forecast")
+            for forecast in forecasts:
+                if forecast.error:
+                    print(f"   {forecast.question}: ERROR {forecast.error}")
+                else:
+                    print(
+                        f"   {forecast.question}: edge={forecast.edge} "
+                        f"side={forecast.side} size={forecast.size} "
+                        f"({forecast.latency:.1f}s)"
+                    )
+            best = forecasts[0]
+            if best.error:
+                raise Exception(f"every forecast failed: {best.error}")
+            market = markets[best.index]
+            best_trade = best.trade
             print(f"5. CALCULATED TRADE {best_trade}")
 
-            amount = self.agent.format_trade_prompt_for_execution(best_trade)
+            if self.prefetch is None:
+                # resumed after the candidates were selected
+                self.prefetch = self.agent.start_trade_prefetch(
+                    [markets[index] for index in sorted(markets)]
+                )
+            prefetch = self.prefetch
+            amount = self.agent.format_trade_prompt_for_execution(
+                best_trade, usdc_balance=prefetch.balance()
+            )
+            orderbooks = prefetch.orderbooks(best.index)
+            prefetch.cancel()
+            print(f"   SIZED {amount} USDC, {len(orderbooks)} ORDER BOOKS LOADED")
+            if prefetch.allowance() < amount:
+                print(
+                    f"   WARNING: USDC allowance {prefetch.allowance()} is below amount"
+                )
             # Please refer to TOS before uncommenting: polymarket.com/tos
             # trade = self.polymarket.execute_market_order(market, amount)
             # print(f"6. TRADED {trade}")
+            self.run_state.finish(run_id)
 
         except Exception as e:
-            print(f"Error {e} \n \n Retrying")
-            self.one_best_trade()
+            if forecasted:
+                # forecast again on resume rather than reloading forecasts
+                # that failed or that led to this error
+                self.run_state.discard(run_id, "forecasts")
+            completed = ", ".join(self.run_state.completed_stages(run_id)) or "none"
+            print(
+                f"Error {e} \n \n Run {run_id} stopped, checkpointed stages: {completed}"
+            )
+        finally:
+            self.run_state.release(run_id)
 
     def maintain_positions(self):
         pass
@@ -1,23 +1,174 @@
+import hashlib
 import json
 import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Union
 
 from langchain_community.document_loaders import JSONLoader
 from langchain_community.vectorstores.chroma import Chroma
+from langchain_core.documents import Document
 
+from agents.connectors.retrieval import (
+    HybridRetriever,
+    MetadataFilter,
+    VectorIndex,
+    embed_queries,
+)
 from agents.llm import EmbeddingFactory, EmbeddingProvider
 from agents.polymarket.gamma import GammaMarketClient
 from agents.utils.objects import SimpleEvent, SimpleMarket
+from agents.utils.pools import shared_pool
+from agents.utils.tracing import current_span, traced
+
+
+def _as_dict(record: Union[dict, SimpleEvent, SimpleMarket]) -> dict:
+    if isinstance(record, dict):
+        return record
+    return record.dict()
+
+
+def _clean_metadata(metadata: dict) -> dict:
+    # Chroma only accepts scalar metadata values
+    return {
+        key: value
+        for key, value in metadata.items()
+        if isinstance(value, (str, int, float, bool))
+    }
+
+
+def event_to_document(
+    event: Union[dict, SimpleEvent], seq_num: int = 1
+) -> Document:
+    record = _as_dict(event)
+    metadata = {
+        "id": record.get("id"),
+        "markets": record.get("markets"),
+        "title": record.get("title"),
+        "end": record.get("end"),
+        "active": record.get("active"),
+        "closed": record.get("closed"),
+        "seq_num": seq_num,
+    }
+    return Document(
+        page_content=record.get("description") or "",
+        metadata=_clean_metadata(metadata),
+    )
+
+
+def market_to_document(
+    market: Union[dict, SimpleMarket], seq_num: int = 1
+) -> Document:
+    record = _as_dict(market)
+    metadata = {
+        "id": record.get("id"),
+        "outcomes": record.get("outcomes"),
+        "outcome_prices": record.get("outcome_prices"),
+        "question": record.get("question"),
+        "clob_token_ids": record.get("clob_token_ids"),
+        "end": record.get("end"),
+        "active": record.get("active"),
+        "spread": record.get("spread"),
+        "liquidity": record.get("liquidity"),
+        "seq_num": seq_num,
+    }
+    return Document(
+        page_content=record.get("description") or "",
+        metadata=_clean_metadata(metadata),
+    )
+
+
+def gamma_market_to_document(market: dict, seq_num: int = 1) -> Document:
+    """Build a market document straight from a raw Gamma API market object."""
+    metadata = {
+        "id": market.get("id"),
+        "outcomes": market.get("outcomes"),
+        "outcome_prices": market.get("outcomePrices"),
+        "question": market.get("question"),
+        "clob_token_ids": market.get("clobTokenIds"),
+        "end": market.get("endDate"),
+        "active": market.get("active"),
+        "spread": market.get("spread"),
+        "liquidity": market.get("liquidityNum", market.get("liquidity")),
+        "seq_num": seq_num,
+    }
+    return Document(
+        page_content=market.get("description") or "",
+        metadata=_clean_metadata(metadata),
+    )
+
+
+def iter_event_documents(
+    events: "Iterable[SimpleEvent]",
+) -> Iterator[Document]:
+    for seq_num, event in enumerate(events, start=1):
+        yield event_to_document(event, seq_num)
+
+
+def iter_market_documents(
+    markets: "Iterable[SimpleMarket]",
+) -> Iterator[Document]:
+    for seq_num, market in enumerate(markets, start=1):
+        yield market_to_document(market, seq_num)
+
+
+def iter_gamma_market_documents(markets: "Iterable[dict]") -> Iterator[Document]:
+    for seq_num, market in enumerate(markets, start=1):
+        yield gamma_market_to_document(market, seq_num)
+
+
+def documents_key(documents: "list[Document]") -> str:
+    """Content hash of ``documents``: ids, texts and metadata, in order."""
+    digest = hashlib.sha1()
+    for document in documents:
+        digest.update(document.page_content.encode())
+        digest.update(
+            json.dumps(document.metadata, sort_keys=True, default=str).encode()
+        )
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# hybrid retrievers, with their embedded vectors, by embeddings and input set;
+# shared by every PolymarketRAG so repeated rounds over unchanged events or
+# markets do not embed them again
+_retrievers: "OrderedDict[tuple, HybridRetriever]" = OrderedDict()
+_retrievers_lock = threading.Lock()
 
 
 class PolymarketRAG:
-    def __init__(self, local_db_directory=None, embedding_function=None) -> None:
+    def __init__(
+        self,
+        local_db_directory=None,
+        embedding_function=None,
+        write_snapshots: Optional[bool] = None,
+        ingest_batch_size: int = 256,
+        precision: Optional[str] = None,
+    ) -> None:
         self.gamma_client = GammaMarketClient()
         self.local_db_directory = local_db_directory
         self.embedding_function = embedding_function
         # Get embedding provider from environment, default to OpenAI
         embedding_provider_str = os.getenv("EMBEDDING_PROVIDER", "openai")
         self.embedding_provider = EmbeddingProvider(embedding_provider_str)
+        # JSON snapshots of the ingested objects are an optional side output
+        if write_snapshots is None:
+            write_snapshots = os.getenv("RAG_JSON_SNAPSHOTS", "false").lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+        self.write_snapshots = write_snapshots
+        self.ingest_batch_size = ingest_batch_size
+        # Storage precision of in-memory vector indexes: float32, float16 or int8
+        self.precision = precision or os.getenv("EMBEDDING_PRECISION", "float32")
+        # persist directory -> (document count, index, documents)
+        self._vector_indexes: dict = {}
+        # hybrid retrievers kept for repeated input sets, 0 disables the cache
+        self.retriever_cache_size = int(os.getenv("RAG_RETRIEVER_CACHE_SIZE", "4"))
 
     def _get_embeddings(self):
         """Get embeddings function using the configured provider."""
@@ -27,6 +178,89 @@ class PolymarketRAG:
             provider=self.embedding_provider
         )
 
+    def _write_snapshot(self, file_path: str, records: list) -> Optional[Future]:
+        """Dump ``records`` to ``file_path`` on a background thread."""
+        if not self.write_snapshots:
+            return None
+
+        def dump() -> str:
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            with open(file_path, "w+") as output_file:
+                json.dump([_as_dict(x) for x in records], output_file)
+            return file_path
+
+        # one writer for the process, shared by every PolymarketRAG
+        return shared_pool("rag-snapshot", 1).submit(dump)
+
+    @traced("rag.build_vector_db")
+    def build_vector_db(
+        self, documents: Iterable[Document], persist_directory: str
+    ) -> Chroma:
+        """Embed and store documents in batches as they are produced."""
+        local_db = Chroma(
+            persist_directory=persist_directory,
+            embedding_function=self._get_embeddings(),
+        )
+        documents = iter(documents)
+        while True:
+            batch = list(islice(documents, self.ingest_batch_size))
+            if not batch:
+                break
+            local_db.add_documents(batch)
+            current_span().add("documents", len(batch))
+        return local_db
+
+    @traced("rag.hybrid_search", count_result=True)
+    def hybrid_search(
+        self,
+        documents: Iterable[Document],
+        prompt: str,
+        k: int = 4,
+        metadata_filter: Optional[MetadataFilter] = None,
+        alpha: float = 0.5,
+    ) -> "list[tuple]":
+        """Rank documents with BM25 + vector scores after metadata filtering.
+
+        Scores are higher-is-better, unlike the Chroma distances returned by
+        the plain similarity search. The retriever, and so every vector it
+        embedded, is reused while the same documents are searched again.
+        """
+        retriever = self.hybrid_retriever(list(documents), alpha=alpha)
+        return retriever.search(prompt, k=k, metadata_filter=metadata_filter)
+
+    def _embeddings_key(self) -> tuple:
+        if self.embedding_function is not None:
+            return ("instance", id(self.embedding_function))
+        return (self.embedding_provider.value, os.getenv("EMBEDDING_MODEL", ""))
+
+    def _new_retriever(
+        self, documents: "list[Document]", alpha: float
+    ) -> HybridRetriever:
+        return HybridRetriever(
+            documents, self._get_embeddings(), alpha=alpha, precision=self.precision
+        )
+
+    def hybrid_retriever(
+        self, documents: "list[Document]", alpha: float = 0.5
+    ) -> HybridRetriever:
+        """A retriever over ``documents``, from the cache when they are unchanged."""
+        if self.retriever_cache_size <= 0:
+            return self._new_retriever(documents, alpha)
+        key = (self._embeddings_key(), self.precision, alpha, documents_key(documents))
+        with _retrievers_lock:
+            retriever = _retrievers.get(key)
+            if retriever is not None:
+                _retrievers.move_to_end(key)
+        current_span().set("retriever_cached", retriever is not None)
+        if retriever is not None:
+            return retriever
+        retriever = self._new_retriever(documents, alpha)
+        with _retrievers_lock:
+            _retrievers[key] = retriever
+            while len(_retrievers) > self.retriever_cache_size:
+                _retrievers.popitem(last=False)
+        return retriever
+
     def load_json_from_local(
         self, json_file_path=None, vector_db_directory="./local_db"
     ) -> None:
@@ -47,12 +281,10 @@ class PolymarketRAG:
             os.mkdir(local_directory)
 
         local_file_path = f"{local_directory}/all-current-markets_{time.time()}.json"
+        self._write_snapshot(local_file_path, all_markets)
 
-        with open(local_file_path, "w+") as output_file:
-            json.dump(all_markets, output_file)
-
-        self.load_json_from_local(
-            json_file_path=local_file_path, vector_db_directory=local_directory
+        self.build_vector_db(
+            iter_gamma_market_documents(all_markets), persist_directory=local_directory
         )
 
     def query_local_markets_rag(
@@ -65,74 +297,111 @@ class PolymarketRAG:
         response_docs = local_db.similarity_search_with_score(query=query)
         return response_docs
 
-    def events(self, events: "list[SimpleEvent]", prompt: str) -> "list[tuple]":
-        # create local json file
-        local_events_directory: str = "./local_db_events"
-        if not os.path.isdir(local_events_directory):
-            os.mkdir(local_events_directory)
-        local_file_path = f"{local_events_directory}/events.json"
-        dict_events = [x.dict() for x in events]
-        with open(local_file_path, "w+") as output_file:
-            json.dump(dict_events, output_file)
+    def load_vector_index(
+        self, local_directory: str
+    ) -> "tuple[Optional[VectorIndex], list[Document]]":
+        """Load a persisted collection into memory, reusing it while unchanged."""
+        local_db = Chroma(
+            persist_directory=local_directory,
+            embedding_function=self._get_embeddings(),
+        )
+        count = len(local_db.get(include=[])["ids"])
+        cached = self._vector_indexes.get(local_directory)
+        if cached is not None and cached[0] == count:
+            return cached[1], cached[2]
 
-        # create vector db
-        def metadata_func(record: dict, metadata: dict) -> dict:
+        data = local_db.get(include=["embeddings", "documents", "metadatas"])
+        documents = [
+            Document(page_content=text or "", metadata=metadata or {})
+            for text, metadata in zip(data["documents"], data["metadatas"])
+        ]
+        index = (
+            VectorIndex(data["embeddings"], precision=self.precision)
+            if documents
+            else None
+        )
+        self._vector_indexes[local_directory] = (count, index, documents)
+        return index, documents
 
-            metadata["id"] = record.get("id")
-            metadata["markets"] = record.get("markets")
+    @traced("rag.batch_query", count_result=True)
+    def batch_query_local_markets_rag(
+        self, local_directory=None, queries: "list[str]" = None, k: int = 4
+    ) -> "list[list[tuple]]":
+        """
+        Answer many queries against a local RAG database at once.
 
-            return metadata
+        Queries are embedded concurrently with ``embed_query``, as the single
+        query path does, and scored with one matrix product. Scores are cosine
+        similarities (higher is better). Works for any persisted collection,
+        e.g. ``./local_db`` for markets or ``./local_db_events/chroma`` for
+        events.
+        """
+        queries = list(queries or [])
+        if not queries:
+            return []
+        index, documents = self.load_vector_index(local_directory)
+        if index is None:
+            return [[] for _ in queries]
 
-        loader = JSONLoader(
-            file_path=local_file_path,
-            jq_schema=".[]",
-            content_key="description",
-            text_content=False,
-            metadata_func=metadata_func,
-        )
-        loaded_docs = loader.load()
-        embedding_function = self._get_embeddings()
-        vector_db_directory = f"{local_events_directory}/chroma"
-        local_db = Chroma.from_documents(
-            loaded_docs, embedding_function, persist_directory=vector_db_directory
-        )
+        query_vectors = embed_queries(self._get_embeddings(), queries)
+        indices, scores = index.search_batch(query_vectors, k=k)
+        return [
+            [(documents[i], float(score)) for i, score in zip(row, row_scores)]
+            for row, row_scores in zip(indices, scores)
+        ]
 
-        # query
-        return local_db.similarity_search_with_score(query=prompt)
+    @traced("rag.events", count_result=True)
+    def events(
+        self,
+        events: "list[SimpleEvent]",
+        prompt: str,
+        k: int = 4,
+        metadata_filter: Optional[MetadataFilter] = None,
+        hybrid: bool = False,
+    ) -> "list[tuple]":
+        local_events_directory: str = "./local_db_events"
+        self._write_snapshot(f"{local_events_directory}/events.json", events)
+        if hybrid:
+            return self.hybrid_search(
+                iter_event_documents(events), prompt, k, metadata_filter
+            )
 
-    def markets(self, markets: "list[SimpleMarket]", prompt: str) -> "list[tuple]":
-        # create local json file
-        local_events_directory: str = "./local_db_markets"
         if not os.path.isdir(local_events_directory):
             os.mkdir(local_events_directory)
-        local_file_path = f"{local_events_directory}/markets.json"
-        with open(local_file_path, "w+") as output_file:
-            json.dump(markets, output_file)
 
         # create vector db
-        def metadata_func(record: dict, metadata: dict) -> dict:
+        vector_db_directory = f"{local_events_directory}/chroma"
+        local_db = self.build_vector_db(
+            iter_event_documents(events), persist_directory=vector_db_directory
+        )
+
+        # query
+        return local_db.similarity_search_with_score(query=prompt, k=k)
 
-            metadata["id"] = record.get("id")
-            metadata["outcomes"] = record.get("outcomes")
-            metadata["outcome_prices"] = record.get("outcome_prices")
-            metadata["question"] = record.get("question")
-            metadata["clob_token_ids"] = record.get("clob_token_ids")
+    @traced("rag.markets", count_result=True)
+    def markets(
+        self,
+        markets: "list[SimpleMarket]",
+        prompt: str,
+        k: int = 4,
+        metadata_filter: Optional[MetadataFilter] = None,
+        hybrid: bool = False,
+    ) -> "list[tuple]":
+        local_markets_directory: str = "./local_db_markets"
+        self._write_snapshot(f"{local_markets_directory}/markets.json", markets)
+        if hybrid:
+            return self.hybrid_search(
+                iter_market_documents(markets), prompt, k, metadata_filter
+            )
 
-            return metadata
+        if not os.path.isdir(local_markets_directory):
+            os.mkdir(local_markets_directory)
 
-        loader = JSONLoader(
-            file_path=local_file_path,
-            jq_schema=".[]",
-            content_key="description",
-            text_content=False,
-            metadata_func=metadata_func,
-        )
-        loaded_docs = loader.load()
-        embedding_function = self._get_embeddings()
-        vector_db_directory = f"{local_events_directory}/chroma"
-        local_db = Chroma.from_documents(
-            loaded_docs, embedding_function, persist_directory=vector_db_directory
+        # create vector db
+        vector_db_directory = f"{local_markets_directory}/chroma"
+        local_db = self.build_vector_db(
+            iter_market_documents(markets), persist_directory=vector_db_directory
         )
 
         # query
-        return local_db.similarity_search_with_score(query=prompt)
+        return local_db.similarity_search_with_score(query=prompt, k=k)
@@ -0,0 +1,438 @@
+"""
+Hybrid lexical and vector retrieval over market and event documents.
+
+Documents are first narrowed down with metadata predicates, then ranked by
+a weighted blend of BM25 and embedding cosine similarity.
+"""
+
+import math
+import os
+import re
+import tempfile
+import threading
+import weakref
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from pydantic import BaseModel
+
+from agents.utils.pools import shared_pool
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def parse_end_date(value) -> Optional[datetime]:
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _as_float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class MetadataFilter(BaseModel):
+    """
+    Predicates applied to document metadata before any scoring happens.
+
+    Documents that do not carry a given field are not excluded by it, since
+    not every source (e.g. ``SimpleMarket``) reports liquidity.
+    """
+
+    active_only: bool = True
+    exclude_closed: bool = True
+    min_liquidity: Optional[float] = None
+    max_spread: Optional[float] = None
+    min_days_to_end: Optional[float] = None
+    max_days_to_end: Optional[float] = None
+
+    def matches(self, metadata: dict, now: Optional[datetime] = None) -> bool:
+        if self.active_only and metadata.get("active") is False:
+            return False
+        if self.exclude_closed and metadata.get("closed") is True:
+            return False
+
+        liquidity = _as_float(metadata.get("liquidity"))
+        if (
+            self.min_liquidity is not None
+            and liquidity is not None
+            and liquidity < self.min_liquidity
+        ):
+            return False
+
+        spread = _as_float(metadata.get("spread"))
+        if (
+            self.max_spread is not None
+            and spread is not None
+            and spread > self.max_spread
+        ):
+            return False
+
+        if self.min_days_to_end is not None or self.max_days_to_end is not None:
+            end = parse_end_date(metadata.get("end"))
+            if end is not None:
+                now = now or datetime.now(timezone.utc)
+                days_to_end = (end - now).total_seconds() / 86400
+                if (
+                    self.min_days_to_end is not None
+                    and days_to_end < self.min_days_to_end
+                ):
+                    return False
+                if (
+                    self.max_days_to_end is not None
+                    and days_to_end > self.max_days_to_end
+                ):
+                    return False
+        return True
+
+
+class BM25Index:
+    """Okapi BM25 over an inverted index of the document texts."""
+
+    def __init__(self, texts: Sequence[str], k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.doc_lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc_index, text in enumerate(texts):
+            terms = tokenize(text)
+            self.doc_lengths[doc_index] = len(terms)
+            for term, frequency in Counter(terms).items():
+                self.postings[term].append((doc_index, frequency))
+        self.avg_doc_length = float(self.doc_lengths.mean()) if len(texts) else 0.0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def idf(self, term: str) -> float:
+        document_frequency = len(self.postings.get(term, ()))
+        return math.log(
+            1 + (len(self) - document_frequency + 0.5) / (document_frequency + 0.5)
+        )
+
+    def scores(
+        self, query: str, candidates: Optional[Iterable[int]] = None
+    ) -> np.ndarray:
+        """Return a dense BM25 score vector; non-candidates score zero."""
+        scores = np.zeros(len(self), dtype=np.float32)
+        allowed = None if candidates is None else set(candidates)
+        avg_doc_length = self.avg_doc_length or 1.0
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_index, frequency in postings:
+                if allowed is not None and doc_index not in allowed:
+                    continue
+                norm = self.k1 * (
+                    1 - self.b + self.b * self.doc_lengths[doc_index] / avg_doc_length
+                )
+                scores[doc_index] += (
+                    idf * frequency * (self.k1 + 1) / (frequency + norm)
+                )
+        return scores
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+PRECISIONS = ("float32", "float16", "int8")
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _top_k(scores: np.ndarray, k: int) -> "tuple[np.ndarray, np.ndarray]":
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return (
+        np.take_along_axis(top, order, axis=1),
+        np.take_along_axis(top_scores, order, axis=1),
+    )
+
+
+class VectorIndex:
+    """
+    Brute-force cosine index answering many queries with one matrix product.
+
+    With ``precision="float16"`` or ``"int8"`` only the compressed matrix is
+    kept in memory. int8 uses symmetric per-vector scalar quantization. The
+    full-precision vectors go to a memory-mapped file and are read back only
+    to rescore the top ``k * rescore_factor`` candidates.
+    """
+
+    def __init__(
+        self,
+        vectors,
+        precision: str = "float32",
+        rescore: bool = True,
+        rescore_factor: int = 4,
+        rescore_path: Optional[str] = None,
+        block_size: int = 8192,
+    ) -> None:
+        if precision not in PRECISIONS:
+            raise ValueError(
+                f"Unsupported precision: {precision}. Expected one of {PRECISIONS}"
+            )
+        self.precision = precision
+        self.rescore_factor = rescore_factor
+        self.block_size = block_size
+        self.vectors: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        self.full_precision: Optional[np.ndarray] = None
+        self.rescore_path: Optional[str] = None
+
+        if rescore and precision != "float32":
+            if rescore_path is None:
+                handle, rescore_path = tempfile.mkstemp(suffix=".f32")
+                os.close(handle)
+                weakref.finalize(self, _remove_file, rescore_path)
+            else:
+                open(rescore_path, "wb").close()
+            self.rescore_path = rescore_path
+        self.add(vectors)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in memory by the searchable representation."""
+        scales_bytes = self.scales.nbytes if self.scales is not None else 0
+        return self.vectors.nbytes + scales_bytes
+
+    def _compress(
+        self, matrix: np.ndarray
+    ) -> "tuple[np.ndarray, Optional[np.ndarray]]":
+        if self.precision == "float32":
+            return matrix, None
+        if self.precision == "float16":
+            return matrix.astype(np.float16), None
+        scales = np.abs(matrix).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        return (
+            np.round(matrix / scales[:, None]).astype(np.int8),
+            scales.astype(np.float32),
+        )
+
+    def add(self, vectors) -> range:
+        """Append ``vectors`` to the index; returns the rows they got."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(matrix), -1)
+        matrix = _normalize_rows(matrix)
+        compressed, scales = self._compress(matrix)
+
+        start = 0 if self.vectors is None else len(self.vectors)
+        if self.vectors is None:
+            self.vectors, self.scales = compressed, scales
+        else:
+            self.vectors = np.concatenate([self.vectors, compressed])
+            if scales is not None:
+                self.scales = np.concatenate([self.scales, scales])
+
+        if self.rescore_path is not None and len(matrix):
+            with open(self.rescore_path, "ab") as f:
+                f.write(matrix.tobytes())
+            self.full_precision = np.memmap(
+                self.rescore_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(len(self.vectors), matrix.shape[1]),
+            )
+        return range(start, start + len(matrix))
+
+    def _scores(self, queries: np.ndarray, rows=None) -> np.ndarray:
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        scales = self.scales
+        if scales is not None and rows is not None:
+            scales = scales[rows]
+        if self.precision == "float32":
+            return queries @ vectors.T
+        # numpy has no fast low-precision matmul, so widen one block at a time
+        scores = np.empty((len(queries), len(vectors)), dtype=np.float32)
+        for start in range(0, len(vectors), self.block_size):
+            block = vectors[start : start + self.block_size].astype(np.float32)
+            block_scores = queries @ block.T
+            if scales is not None:
+                block_scores *= scales[start : start + self.block_size]
+            scores[:, start : start + self.block_size] = block_scores
+        return scores
+
+    def scores(self, query_vector, rows, exact: bool = False) -> np.ndarray:
+        """
+        Cosine scores of one query against ``rows``. With ``exact`` they come
+        from the full-precision copy, when the index keeps one.
+        """
+        query = _normalize_rows(np.asarray(query_vector, dtype=np.float32)[None, :])
+        if exact and self.full_precision is not None:
+            return np.asarray(self.full_precision[rows]) @ query[0]
+        return self._scores(query, rows)[0]
+
+    def search_batch(
+        self, query_vectors, k: int = 4
+    ) -> "tuple[np.ndarray, np.ndarray]":
+        """Return ``(indices, scores)`` of shape ``(n_queries, k)``, best first."""
+        queries = _normalize_rows(np.asarray(query_vectors, dtype=np.float32))
+        k = min(k, len(self))
+        if k == 0:
+            empty = np.zeros((len(queries), 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+
+        scores = self._scores(queries)
+        if self.full_precision is None:
+            return _top_k(scores, k)
+
+        shortlist, _ = _top_k(scores, min(k * self.rescore_factor, len(self)))
+        exact = np.einsum(
+            "qkd,qd->qk",
+            self.full_precision[shortlist.ravel()].reshape(shortlist.shape + (-1,)),
+            queries,
+        )
+        top, top_scores = _top_k(exact, k)
+        return np.take_along_axis(shortlist, top, axis=1), top_scores
+
+
+def embed_queries(embedding_function, queries: Sequence[str]) -> List[List[float]]:
+    """
+    Embed search queries with ``embed_query``. Instruction-tuned providers
+    embed queries differently from documents, so ``embed_documents`` would
+    put them in the wrong space; the calls run concurrently instead.
+    """
+    if len(queries) <= 1:
+        return [embedding_function.embed_query(query) for query in queries]
+    return list(
+        shared_pool("embed-queries", 8).map(embedding_function.embed_query, queries)
+    )
+
+
+def _min_max(values: np.ndarray) -> np.ndarray:
+    if values.size == 0:
+        return values
+    low, high = float(values.min()), float(values.max())
+    if high - low <= 1e-12:
+        return np.zeros_like(values) if high <= 0 else np.ones_like(values)
+    return (values - low) / (high - low)
+
+
+class HybridRetriever:
+    """
+    Ranks documents by ``alpha * vector + (1 - alpha) * bm25`` after filtering.
+
+    Embeddings are computed lazily and only for documents that survive the
+    metadata filter, then kept in a ``VectorIndex`` of the given precision
+    for later queries on the same retriever. With a compressed precision the
+    top ``k * rescore_factor`` documents by combined score are ranked again
+    with their full-precision vectors.
+    """
+
+    def __init__(
+        self,
+        documents: Sequence[Document],
+        embedding_function,
+        alpha: float = 0.5,
+        precision: str = "float32",
+        rescore: bool = True,
+    ) -> None:
+        self.documents = list(documents)
+        self.embedding_function = embedding_function
+        self.alpha = alpha
+        self.precision = precision
+        self.rescore = rescore
+        self.bm25 = BM25Index([self._lexical_text(doc) for doc in self.documents])
+        self.index: Optional[VectorIndex] = None
+        # document index -> row in self.index
+        self._rows: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _lexical_text(document: Document) -> str:
+        metadata = document.metadata
+        heading = metadata.get("question") or metadata.get("title") or ""
+        return f"{heading} {document.page_content}"
+
+    def candidates(self, metadata_filter: Optional[MetadataFilter] = None) -> List[int]:
+        if metadata_filter is None:
+            return list(range(len(self.documents)))
+        now = datetime.now(timezone.utc)
+        return [
+            index
+            for index, document in enumerate(self.documents)
+            if metadata_filter.matches(document.metadata, now=now)
+        ]
+
+    def _embed_candidates(self, candidates: List[int]) -> np.ndarray:
+        """Index rows of the candidates, embedding those not seen before."""
+        with self._lock:
+            missing = [index for index in candidates if index not in self._rows]
+            if missing:
+                embedded = self.embedding_function.embed_documents(
+                    [self.documents[index].page_content for index in missing]
+                )
+                if self.index is None:
+                    self.index = VectorIndex(
+                        embedded, precision=self.precision, rescore=self.rescore
+                    )
+                    rows = range(len(missing))
+                else:
+                    rows = self.index.add(embedded)
+                self._rows.update(zip(missing, rows))
+            return np.array([self._rows[index] for index in candidates])
+
+    def _combine(self, semantic: np.ndarray, lexical: np.ndarray) -> np.ndarray:
+        return self.alpha * _min_max(semantic) + (1 - self.alpha) * _min_max(lexical)
+
+    def search(
+        self,
+        query: str,
+        k: int = 4,
+        metadata_filter: Optional[MetadataFilter] = None,
+    ) -> "list[tuple]":
+        candidates = self.candidates(metadata_filter)
+        if not candidates or k <= 0:
+            return []
+
+        lexical = self.bm25.scores(query, candidates)[candidates]
+        rows = self._embed_candidates(candidates)
+        query_vector = self.embedding_function.embed_query(query)
+        semantic = self.index.scores(query_vector, rows)
+        combined = self._combine(semantic, lexical)
+
+        k = min(k, len(candidates))
+        if self.index.full_precision is None:
+            top = np.argpartition(-combined, k - 1)[:k]
+            top = top[np.argsort(-combined[top])]
+        else:
+            size = min(k * self.index.rescore_factor, len(candidates))
+            shortlist = np.argpartition(-combined, size - 1)[:size]
+            semantic[shortlist] = self.index.scores(
+                query_vector, rows[shortlist], exact=True
+            )
+            combined = self._combine(semantic, lexical)
+            top = shortlist[np.argsort(-combined[shortlist])][:k]
+        return [(self.documents[candidates[i]], float(combined[i])) for i in top]
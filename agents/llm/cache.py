@@ -0,0 +1,245 @@
+"""
+Persistent exact-match cache for chat model responses.
+
+Entries are keyed by provider, model, temperature and a hash of the
+whitespace-normalised messages, stored in SQLite with optional TTLs and
+least-recently-used eviction once ``max_entries`` is exceeded.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from agents.llm.wrappers import ChatModelWrapper
+
+
+def _content_text(content) -> str:
+    if isinstance(content, str):
+        return content
+    # multi-part content: keep text parts, drop hints such as cache_control
+    return "\n".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in content
+    )
+
+
+def normalize_messages(input) -> List[Tuple[str, str]]:
+    """Turn any chat model input into ``(role, text)`` pairs with collapsed whitespace."""
+    if hasattr(input, "to_messages"):
+        input = input.to_messages()
+    if isinstance(input, str):
+        input = [("human", input)]
+
+    normalized = []
+    for message in input:
+        if isinstance(message, BaseMessage):
+            role, content = message.type, message.content
+        elif isinstance(message, (tuple, list)):
+            role, content = message
+        else:
+            role, content = "human", str(message)
+        normalized.append((role, " ".join(_content_text(content).split())))
+    return normalized
+
+
+def cache_key(provider: str, model: str, temperature: float, input) -> str:
+    payload = json.dumps(
+        {
+            "provider": str(provider),
+            "model": model,
+            "temperature": temperature,
+            "messages": normalize_messages(input),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response store with TTLs, LRU eviction and hit metrics."""
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        ttl: Optional[float] = None,
+        max_entries: int = 10000,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " content TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " expires REAL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+        )
+        self._connection.commit()
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+
+    def get(self, key: str, call_site: str = "default") -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] is not None and row[1] <= now:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._connection.commit()
+                row = None
+            if row is None:
+                self._misses[call_site] += 1
+                return None
+            self._connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._connection.commit()
+            self._hits[call_site] += 1
+            return row[0]
+
+    def set(self, key: str, content: str, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires = now + ttl if ttl else None
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, content, now, now, expires),
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        self._connection.execute(
+            "DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?",
+            (time.time(),),
+        )
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Hits, misses and hit ratio per call site."""
+        with self._lock:
+            call_sites = set(self._hits) | set(self._misses)
+            stats = {}
+            for call_site in sorted(call_sites):
+                hits, misses = self._hits[call_site], self._misses[call_site]
+                stats[call_site] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+                }
+            return stats
+
+
+_shared_caches: Dict[str, ResponseCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_shared_cache(
+    path: str, ttl: Optional[float] = None, max_entries: int = 10000
+) -> ResponseCache:
+    """Return one ``ResponseCache`` per path so every client shares metrics."""
+    with _shared_caches_lock:
+        if path not in _shared_caches:
+            _shared_caches[path] = ResponseCache(path, ttl=ttl, max_entries=max_entries)
+        return _shared_caches[path]
+
+
+def cache_from_env() -> Optional[ResponseCache]:
+    """Build the cache configured by ``LLM_CACHE_PATH``; unset disables caching."""
+    path = os.getenv("LLM_CACHE_PATH")
+    if not path:
+        return None
+    ttl = os.getenv("LLM_CACHE_TTL")
+    return get_shared_cache(
+        path,
+        ttl=float(ttl) if ttl else None,
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+    )
+
+
+class CachedChatModel(ChatModelWrapper):
+    """
+    Serves repeated prompts from a ``ResponseCache``.
+
+    The call site used for hit metrics is the ``run_name`` of the LangChain
+    config passed to ``invoke``. Only deterministic (temperature 0) models
+    are cached; anything else passes straight through.
+    """
+
+    def __init__(
+        self, llm, cache: ResponseCache, provider: str, model: str, temperature: float
+    ) -> None:
+        super().__init__(llm)
+        self.cache = cache
+        self.provider = provider
+        self.model = model
+        self.temperature = temperature
+
+    def _lookup(self, input, config: Optional[dict]) -> Tuple[str, Optional[AIMessage]]:
+        key = cache_key(self.provider, self.model, self.temperature, input)
+        call_site = (config or {}).get("run_name") or "default"
+        content = self.cache.get(key, call_site)
+        if content is None:
+            return key, None
+        return key, AIMessage(content=content, response_metadata={"cached": True})
+
+    def _store(self, key: str, result) -> None:
+        if isinstance(getattr(result, "content", None), str):
+            self.cache.set(key, result.content)
+
+    def invoke(self, input, config: Optional[dict] = None, **kwargs):
+        if self.temperature:
+            return self.llm.invoke(input, config=config, **kwargs)
+        key, cached = self._lookup(input, config)
+        if cached is not None:
+            return cached
+        result = self.llm.invoke(input, config=config, **kwargs)
+        self._store(key, result)
+        return result
+
+    async def ainvoke(self, input, config: Optional[dict] = None, **kwargs):
+        if self.temperature:
+            return await self.llm.ainvoke(input, config=config, **kwargs)
+        key, cached = self._lookup(input, config)
+        if cached is not None:
+            return cached
+        result = await self.llm.ainvoke(input, config=config, **kwargs)
+        self._store(key, result)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return self.cache.stats()
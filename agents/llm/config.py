@@ -14,6 +14,7 @@ class LLMProvider(str, Enum):
     GEMINI = "gemini"
     QINIU = "qiniu"
     SILICONFLOW = "siliconflow"
+    LOCAL = "local"
 
 
 class EmbeddingProvider(str, Enum):
@@ -23,6 +24,7 @@ class EmbeddingProvider(str, Enum):
     GEMINI = "gemini"
     QINIU = "qiniu"
     SILICONFLOW = "siliconflow"
+    LOCAL = "local"
 
 
 # Model name mappings for different LLM providers
@@ -55,6 +57,9 @@ LLM_MODEL_MAPPING: Dict[LLMProvider, Dict[str, str]] = {
         "qwen": "Qwen/Qwen2.5-72B-Instruct",
         "deepseek": "deepseek-ai/DeepSeek-V3",
     },
+    LLMProvider.LOCAL: {
+        "default": "scripted",
+    },
 }
 
 # Model name mappings for embedding providers
@@ -74,6 +79,9 @@ EMBEDDING_MODEL_MAPPING: Dict[EmbeddingProvider, Dict[str, str]] = {
     EmbeddingProvider.SILICONFLOW: {
         "default": "BAAI/bge-large-en-v1.5",
     },
+    EmbeddingProvider.LOCAL: {
+        "default": "hashing-384",
+    },
 }
 
 # Token limits per model (conservative estimates for context window)
@@ -100,6 +108,28 @@ TOKEN_LIMITS: Dict[LLMProvider, Dict[str, int]] = {
         "Qwen/Qwen2.5-72B-Instruct": 32000,
         "deepseek-ai/DeepSeek-V3": 64000,
     },
+    LLMProvider.LOCAL: {
+        "scripted": 16000,
+    },
+}
+
+# Request (rpm) and token (tpm) rate limits per provider, shared by every
+# client in the process. Match these to your account tier; providers
+# without an entry are not rate limited.
+RATE_LIMITS: Dict[LLMProvider, Dict[str, int]] = {
+    LLMProvider.OPENAI: {"rpm": 500, "tpm": 200000},
+    LLMProvider.OPENROUTER: {"rpm": 200, "tpm": 400000},
+    LLMProvider.GEMINI: {"rpm": 60, "tpm": 1000000},
+    LLMProvider.QINIU: {"rpm": 60, "tpm": 100000},
+    LLMProvider.SILICONFLOW: {"rpm": 1000, "tpm": 50000},
+}
+
+EMBEDDING_RATE_LIMITS: Dict[EmbeddingProvider, Dict[str, int]] = {
+    EmbeddingProvider.OPENAI: {"rpm": 3000, "tpm": 1000000},
+    EmbeddingProvider.OPENROUTER: {"rpm": 200, "tpm": 1000000},
+    EmbeddingProvider.GEMINI: {"rpm": 1500, "tpm": 1000000},
+    EmbeddingProvider.QINIU: {"rpm": 60, "tpm": 100000},
+    EmbeddingProvider.SILICONFLOW: {"rpm": 2000, "tpm": 500000},
 }
 
 # Base URLs for OpenAI-compatible providers
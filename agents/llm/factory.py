@@ -3,7 +3,8 @@ Factory for creating LLM and Embedding instances from different providers.
 """
 
 import os
-from typing import Optional, Union
+import threading
+from typing import Dict, List, Optional, Tuple, Union
 
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
@@ -14,15 +15,37 @@ from agents.llm.config import (
     LLM_MODEL_MAPPING,
     EMBEDDING_MODEL_MAPPING,
     TOKEN_LIMITS,
+    RATE_LIMITS,
+    EMBEDDING_RATE_LIMITS,
     PROVIDER_BASE_URLS,
 )
+from agents.llm.cache import CachedChatModel, ResponseCache, cache_from_env
+from agents.llm.hedging import HedgedChatModel
+from agents.llm.prompt_cache import PromptCacheMeter
+from agents.llm.local import HashingEmbeddings, ScriptedChatModel
+from agents.llm.ratelimit import (
+    RateLimitedChatModel,
+    RateLimitedEmbeddings,
+    get_rate_limiter,
+)
+from agents.llm.traced import TracedChatModel, TracedEmbeddings
+from agents.utils.tracing import tracing_enabled
 
 load_dotenv()
 
 
+def _pool_key(*parts, **kwargs) -> Tuple:
+    return parts + tuple(sorted((k, repr(v)) for k, v in kwargs.items()))
+
+
 class LLMFactory:
     """Factory for creating LLM instances from different providers."""
 
+    # Clients are shared per (provider, model, temperature, kwargs) so every
+    # caller reuses the same HTTP connection pool
+    _client_pool: Dict[Tuple, object] = {}
+    _pool_lock = threading.Lock()
+
     @staticmethod
     def get_api_key(provider: LLMProvider) -> Optional[str]:
         """Get API key for a given provider."""
@@ -40,6 +63,8 @@ class LLMFactory:
         provider: Union[str, LLMProvider] = LLMProvider.OPENAI,
         model: Optional[str] = None,
         temperature: float = 0,
+        cache: Union[ResponseCache, bool, None] = None,
+        fallbacks: Optional[List[str]] = None,
         **kwargs
     ):
         """
@@ -49,6 +74,11 @@ class LLMFactory:
             provider: The LLM provider to use
             model: Model name (if None, uses provider default)
             temperature: Temperature for generation
+            cache: Response cache to serve repeated prompts from. None uses
+                the cache configured by LLM_CACHE_PATH, False disables it
+            fallbacks: "provider" or "provider:model" entries to hedge slow
+                calls to and fail over to on errors, in order. None uses
+                LLM_FALLBACK_PROVIDERS, an empty list disables hedging
             **kwargs: Additional provider-specific arguments
 
         Returns:
@@ -57,6 +87,82 @@ class LLMFactory:
         if isinstance(provider, str):
             provider = LLMProvider(provider)
 
+        # Get model name (use default if not specified)
+        if model is None:
+            model = LLM_MODEL_MAPPING[provider]["default"]
+
+        llm = LLMFactory._pooled_client(provider, model, temperature, **kwargs)
+
+        if fallbacks is None:
+            fallbacks = [
+                entry.strip()
+                for entry in os.getenv("LLM_FALLBACK_PROVIDERS", "").split(",")
+                if entry.strip()
+            ]
+        if fallbacks:
+            routes = [(f"{provider.value}:{model}", llm)]
+            for entry in fallbacks:
+                # OpenRouter model names may contain ":" themselves
+                fallback_provider, _, fallback_model = entry.partition(":")
+                fallback_provider = LLMProvider(fallback_provider)
+                fallback_model = (
+                    fallback_model
+                    or LLM_MODEL_MAPPING[fallback_provider]["default"]
+                )
+                routes.append((
+                    f"{fallback_provider.value}:{fallback_model}",
+                    LLMFactory._pooled_client(
+                        fallback_provider, fallback_model, temperature
+                    ),
+                ))
+            llm = HedgedChatModel(
+                routes,
+                default_deadline=float(os.getenv("LLM_HEDGE_DEFAULT_DEADLINE", "10")),
+                min_deadline=float(os.getenv("LLM_HEDGE_MIN_DEADLINE", "0.5")),
+            )
+
+        if cache is None:
+            cache = cache_from_env()
+        if isinstance(cache, ResponseCache):
+            llm = CachedChatModel(llm, cache, provider.value, model, temperature)
+        return llm
+
+    @staticmethod
+    def _pooled_client(
+        provider: LLMProvider, model: str, temperature: float, **kwargs
+    ):
+        """Return the shared, rate limited client for these settings."""
+        key = _pool_key(provider, model, temperature, **kwargs)
+        with LLMFactory._pool_lock:
+            llm = LLMFactory._client_pool.get(key)
+            if llm is None:
+                llm = LLMFactory._create_client(provider, model, temperature, **kwargs)
+                limiter = get_rate_limiter(
+                    "llm", provider.value, RATE_LIMITS.get(provider)
+                )
+                if limiter is not None:
+                    llm = RateLimitedChatModel(llm, limiter, model)
+                if provider != LLMProvider.LOCAL:
+                    # the offline model reports no provider cache usage
+                    llm = PromptCacheMeter(llm)
+                if tracing_enabled():
+                    llm = TracedChatModel(llm, f"{provider.value}:{model}")
+                LLMFactory._client_pool[key] = llm
+        return llm
+
+    @staticmethod
+    def _create_client(
+        provider: LLMProvider, model: str, temperature: float, **kwargs
+    ):
+        """Build the provider's LangChain chat model."""
+        if provider == LLMProvider.LOCAL:
+            # Offline scripted model, no API key required
+            return ScriptedChatModel(
+                model_name=model,
+                latency=float(os.getenv("LOCAL_LLM_LATENCY", "0")),
+                **kwargs
+            )
+
         api_key = LLMFactory.get_api_key(provider)
         if not api_key:
             raise ValueError(
@@ -64,10 +170,6 @@ class LLMFactory:
                 f"Please set the environment variable: {LLMFactory._get_env_var_name(provider)}"
             )
 
-        # Get model name (use default if not specified)
-        if model is None:
-            model = LLM_MODEL_MAPPING[provider]["default"]
-
         # Create LLM based on provider
         if provider == LLMProvider.OPENAI:
             return ChatOpenAI(
@@ -131,6 +233,9 @@ class LLMFactory:
 class EmbeddingFactory:
     """Factory for creating Embedding instances from different providers."""
 
+    _client_pool: Dict[Tuple, object] = {}
+    _pool_lock = threading.Lock()
+
     @staticmethod
     def get_api_key(provider: EmbeddingProvider) -> Optional[str]:
         """Get API key for a given provider."""
@@ -163,6 +268,34 @@ class EmbeddingFactory:
         if isinstance(provider, str):
             provider = EmbeddingProvider(provider)
 
+        # Get model name (use default if not specified)
+        if model is None:
+            model = EMBEDDING_MODEL_MAPPING[provider]["default"]
+
+        key = _pool_key(provider, model, **kwargs)
+        with EmbeddingFactory._pool_lock:
+            embeddings = EmbeddingFactory._client_pool.get(key)
+            if embeddings is None:
+                embeddings = EmbeddingFactory._create_client(provider, model, **kwargs)
+                limiter = get_rate_limiter(
+                    "embedding", provider.value, EMBEDDING_RATE_LIMITS.get(provider)
+                )
+                if limiter is not None:
+                    embeddings = RateLimitedEmbeddings(embeddings, limiter)
+                if tracing_enabled():
+                    embeddings = TracedEmbeddings(
+                        embeddings, f"{provider.value}:{model}"
+                    )
+                EmbeddingFactory._client_pool[key] = embeddings
+        return embeddings
+
+    @staticmethod
+    def _create_client(provider: EmbeddingProvider, model: str, **kwargs):
+        """Build the provider's LangChain embeddings client."""
+        if provider == EmbeddingProvider.LOCAL:
+            # Offline hashing vectorizer, model names look like "hashing-384"
+            return HashingEmbeddings(dimensions=int(model.rsplit("-", 1)[-1]))
+
         api_key = EmbeddingFactory.get_api_key(provider)
         if not api_key:
             raise ValueError(
@@ -170,10 +303,6 @@ class EmbeddingFactory:
                 f"Please set the environment variable: {EmbeddingFactory._get_env_var_name(provider)}"
             )
 
-        # Get model name (use default if not specified)
-        if model is None:
-            model = EMBEDDING_MODEL_MAPPING[provider]["default"]
-
         # Create embeddings based on provider
         if provider == EmbeddingProvider.OPENAI:
             return OpenAIEmbeddings(
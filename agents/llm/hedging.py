@@ -0,0 +1,311 @@
+"""
+Hedged and fallback requests across several chat model providers.
+
+``HedgedChatModel`` sends each call to the primary provider first. If no
+answer has arrived by that provider's p95 latency, the same request goes to
+the next provider and whichever gives a good answer first wins; errors fail
+over to the next provider immediately. Latencies are recorded per provider
+in ``LatencyHistogram``s so the deadlines track what the providers actually
+deliver.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from agents.llm.wrappers import ChatModelWrapper
+from agents.utils.pools import shared_pool
+
+# Log-spaced bucket upper bounds from 50ms to ~6 minutes
+BUCKET_BOUNDS: List[float] = [0.05 * 1.25**i for i in range(41)]
+
+# Threads running sync calls, shared by every HedgedChatModel in the process
+POOL_WORKERS = 32
+
+
+class LatencyHistogram:
+    """Bucketed latency distribution of one provider's successful calls."""
+
+    def __init__(self, bounds: Sequence[float] = BUCKET_BOUNDS) -> None:
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        index = next(
+            (i for i, bound in enumerate(self.bounds) if seconds <= bound),
+            len(self.bounds),
+        )
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile, None if empty."""
+        with self._lock:
+            if not self.count:
+                return None
+            target = q * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return self.bounds[index] if index < len(self.bounds) else self.max
+            return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def get_latency_histogram(label: str) -> LatencyHistogram:
+    """Return the process-wide histogram for a ``provider:model`` label."""
+    with _histograms_lock:
+        if label not in _histograms:
+            _histograms[label] = LatencyHistogram()
+        return _histograms[label]
+
+
+def latency_metrics() -> Dict[str, Dict]:
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {label: histogram.snapshot() for label, histogram in histograms.items()}
+
+
+class EmptyResponseError(ValueError):
+    """The provider answered, but with no content."""
+
+
+class HedgedChatModel(ChatModelWrapper):
+    """
+    Races ``routes`` (``(label, llm)`` pairs, primary first) for each call.
+
+    The deadline before hedging to the next route is the current route's
+    p95 latency, or ``default_deadline`` until ``min_samples`` calls have
+    been observed, and never less than ``min_deadline``. Only ``invoke`` and
+    ``ainvoke`` are hedged; streams fail over on errors raised before the
+    first chunk. Losing sync calls cannot be interrupted, so their results
+    are discarded (their latency is still recorded); async losers are
+    cancelled.
+    """
+
+    def __init__(
+        self,
+        routes: List[Tuple[str, object]],
+        default_deadline: float = 10.0,
+        min_deadline: float = 0.5,
+        min_samples: int = 20,
+        quantile: float = 0.95,
+    ) -> None:
+        super().__init__(routes[0][1])
+        self.routes = routes
+        self.default_deadline = default_deadline
+        self.min_deadline = min_deadline
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "hedges": 0, "failovers": 0, "failures": 0}
+        self._wins: Dict[str, int] = defaultdict(int)
+
+    def deadline(self, label: str) -> float:
+        histogram = get_latency_histogram(label)
+        if histogram.count < self.min_samples:
+            return self.default_deadline
+        return max(self.min_deadline, histogram.quantile(self.quantile))
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _win(self, label: str) -> None:
+        with self._stats_lock:
+            self._wins[label] += 1
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {**self._stats, "wins": dict(self._wins)}
+
+    @staticmethod
+    def _check(result):
+        if not getattr(result, "content", None):
+            raise EmptyResponseError("empty response")
+        return result
+
+    def _call(self, label: str, llm, input, config, kwargs):
+        histogram = get_latency_histogram(label)
+        started = time.perf_counter()
+        try:
+            result = self._check(llm.invoke(input, config=config, **kwargs))
+        except Exception:
+            histogram.record_error()
+            raise
+        histogram.record(time.perf_counter() - started)
+        return result
+
+    async def _acall(self, label: str, llm, input, config, kwargs):
+        histogram = get_latency_histogram(label)
+        started = time.perf_counter()
+        try:
+            result = self._check(await llm.ainvoke(input, config=config, **kwargs))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            histogram.record_error()
+            raise
+        histogram.record(time.perf_counter() - started)
+        return result
+
+    def invoke(self, input, config: Optional[dict] = None, **kwargs):
+        self._count("calls")
+        pending: Dict = {}
+        errors: List[Exception] = []
+        next_route = 0
+        hedge_at = None
+
+        def launch():
+            nonlocal next_route, hedge_at
+            label, llm = self.routes[next_route]
+            next_route += 1
+            # carry context such as the rate limiter priority into the worker
+            context = contextvars.copy_context()
+            future = shared_pool("llm-hedge", POOL_WORKERS).submit(
+                context.run, self._call, label, llm, input, config, kwargs
+            )
+            pending[future] = label
+            hedge_at = time.monotonic() + self.deadline(label)
+
+        launch()
+        while pending:
+            timeout = None
+            if next_route < len(self.routes):
+                timeout = max(0.0, hedge_at - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                self._count("hedges")
+                launch()
+                continue
+            for future in done:
+                label = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as error:
+                    errors.append(error)
+                    if next_route < len(self.routes):
+                        self._count("failovers")
+                        launch()
+                    continue
+                for other in pending:
+                    other.cancel()
+                self._win(label)
+                return result
+
+        self._count("failures")
+        raise errors[-1]
+
+    async def ainvoke(self, input, config: Optional[dict] = None, **kwargs):
+        self._count("calls")
+        pending: Dict = {}
+        errors: List[Exception] = []
+        next_route = 0
+        hedge_at = None
+
+        def launch():
+            nonlocal next_route, hedge_at
+            label, llm = self.routes[next_route]
+            next_route += 1
+            task = asyncio.ensure_future(self._acall(label, llm, input, config, kwargs))
+            pending[task] = label
+            hedge_at = time.monotonic() + self.deadline(label)
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if next_route < len(self.routes):
+                    timeout = max(0.0, hedge_at - time.monotonic())
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    self._count("hedges")
+                    launch()
+                    continue
+                for task in done:
+                    label = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as error:
+                        errors.append(error)
+                        if next_route < len(self.routes):
+                            self._count("failovers")
+                            launch()
+                        continue
+                    self._win(label)
+                    return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self._count("failures")
+        raise errors[-1]
+
+    def stream(self, input, config: Optional[dict] = None, **kwargs):
+        self._count("calls")
+        for index, (label, llm) in enumerate(self.routes):
+            started = False
+            try:
+                for chunk in llm.stream(input, config=config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception:
+                get_latency_histogram(label).record_error()
+                if started or index == len(self.routes) - 1:
+                    self._count("failures")
+                    raise
+                self._count("failovers")
+                continue
+            self._win(label)
+            return
+
+    async def astream(self, input, config: Optional[dict] = None, **kwargs):
+        self._count("calls")
+        for index, (label, llm) in enumerate(self.routes):
+            started = False
+            try:
+                async for chunk in llm.astream(input, config=config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception:
+                get_latency_histogram(label).record_error()
+                if started or index == len(self.routes) - 1:
+                    self._count("failures")
+                    raise
+                self._count("failovers")
+                continue
+            self._win(label)
+            return
@@ -0,0 +1,145 @@
+"""
+Deterministic offline providers for tests and benchmarks.
+
+``HashingEmbeddings`` is a hashing-vectorizer embedding and
+``ScriptedChatModel`` answers with canned, parseable responses after a
+configurable delay. Neither needs an API key or network access.
+"""
+
+import re
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbeddings(Embeddings):
+    """Signed feature hashing of unigrams and bigrams, L2-normalised."""
+
+    def __init__(self, dimensions: int = 384) -> None:
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        if features:
+            hashes = np.fromiter(
+                (zlib.crc32(feature.encode("utf-8")) for feature in features),
+                dtype=np.uint64,
+                count=len(features),
+            )
+            signs = np.where(hashes & (1 << 31), -1.0, 1.0)
+            np.add.at(vector, hashes % self.dimensions, signs)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+# (substring in the prompt, response) pairs, checked in order
+DEFAULT_SCRIPT: List[Tuple[str, str]] = [
+    (
+        "Superforecaster",
+        "I believe this market has a likelihood `0.62` for outcome of `Yes`.",
+    ),
+    ("genius trade", "```\n    price:0.55,\n    size:0.1,\n    side:BUY,\n```"),
+    (
+        "Invent an information market",
+        'Question: "Will the event described above resolve Yes?"\n'
+        "Outcomes: Yes or No",
+    ),
+]
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in content
+    )
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model that replies from a script instead of calling a provider.
+
+    The first ``script`` entry whose key occurs in the prompt wins, otherwise
+    ``default_response`` is returned. Every call sleeps ``latency`` seconds
+    so pipelines can be timed with a realistic model delay; streamed calls
+    pay it before the first chunk and then yield the response word by word.
+    """
+
+    model_name: str = "scripted"
+    script: List[Tuple[str, str]] = Field(default_factory=lambda: list(DEFAULT_SCRIPT))
+    default_response: str = "I believe the market is fairly priced."
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name, "latency": self.latency}
+
+    def respond(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(_message_text(message) for message in messages)
+        for trigger, response in self.script:
+            if trigger in prompt:
+                return response
+        return self.default_response
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        content = self.respond(messages)
+        input_tokens = sum(len(_message_text(m)) for m in messages) // 4
+        output_tokens = len(content) // 4
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        for piece in re.findall(r"\S+\s*|\s+", self.respond(messages)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
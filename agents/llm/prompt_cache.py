@@ -0,0 +1,149 @@
+"""
+Provider-side prompt caching support and instrumentation.
+
+OpenAI and Gemini cache long, repeated prompt prefixes automatically.
+Anthropic models (also through OpenRouter) only cache up to explicit
+``cache_control`` breakpoints, which ``Prompter`` adds to its stable system
+messages when ``supports_cache_control`` says the provider accepts them.
+
+``PromptCacheMeter`` reads the cached input tokens each provider reports in
+its usage metadata and keeps the cached-token ratio per call site.
+"""
+
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from agents.llm.config import LLMProvider
+from agents.llm.wrappers import ChatModelWrapper
+
+
+def supports_cache_control(provider: LLMProvider, model: Optional[str]) -> bool:
+    """Whether explicit cache_control breakpoints should be sent."""
+    override = os.getenv("PROMPT_CACHE_CONTROL")
+    if override:
+        return override.lower() in ("1", "true", "yes")
+    # OpenAI-style APIs reject unknown content part keys, so only send them
+    # where they are understood
+    return provider == LLMProvider.OPENROUTER and (model or "").startswith("anthropic/")
+
+
+def usage_tokens(result) -> Tuple[int, int, int]:
+    """``(input, cache_read, cache_creation)`` tokens reported for ``result``."""
+    usage = getattr(result, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    cache_read = details.get("cache_read")
+    if cache_read is None:
+        # older langchain-openai versions only keep the raw token usage
+        token_usage = (getattr(result, "response_metadata", None) or {}).get(
+            "token_usage"
+        ) or {}
+        cache_read = (token_usage.get("prompt_tokens_details") or {}).get(
+            "cached_tokens"
+        )
+    return (
+        usage.get("input_tokens", 0) or 0,
+        cache_read or 0,
+        details.get("cache_creation", 0) or 0,
+    )
+
+
+class PromptCacheStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._input: Dict[str, int] = defaultdict(int)
+        self._cache_read: Dict[str, int] = defaultdict(int)
+        self._cache_creation: Dict[str, int] = defaultdict(int)
+
+    def record(
+        self, call_site: str, input_tokens: int, cache_read: int, cache_creation: int
+    ) -> None:
+        with self._lock:
+            self._calls[call_site] += 1
+            self._input[call_site] += input_tokens
+            self._cache_read[call_site] += cache_read
+            self._cache_creation[call_site] += cache_creation
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                call_site: {
+                    "calls": self._calls[call_site],
+                    "input_tokens": self._input[call_site],
+                    "cached_tokens": self._cache_read[call_site],
+                    "cache_creation_tokens": self._cache_creation[call_site],
+                    "cached_ratio": (
+                        self._cache_read[call_site] / self._input[call_site]
+                        if self._input[call_site]
+                        else 0.0
+                    ),
+                }
+                for call_site in sorted(self._calls)
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            for counter in (
+                self._calls,
+                self._input,
+                self._cache_read,
+                self._cache_creation,
+            ):
+                counter.clear()
+
+
+prompt_cache_stats = PromptCacheStats()
+
+
+class PromptCacheMeter(ChatModelWrapper):
+    """
+    Records provider-reported cached input tokens per call site (the
+    ``run_name`` of the LangChain config) into ``prompt_cache_stats``.
+    Streams are recorded once they end, from the usage the chunks carried
+    (usually only the final one).
+    """
+
+    def __init__(self, llm, stats: PromptCacheStats = prompt_cache_stats) -> None:
+        super().__init__(llm)
+        self.prompt_cache_stats = stats
+
+    def _record(self, config: Optional[dict], result) -> None:
+        self._record_tokens(config, usage_tokens(result))
+
+    def _record_tokens(self, config: Optional[dict], tokens: Tuple[int, ...]) -> None:
+        call_site = (config or {}).get("run_name") or "default"
+        self.prompt_cache_stats.record(call_site, *tokens)
+
+    def invoke(self, input, config: Optional[dict] = None, **kwargs):
+        result = self.llm.invoke(input, config=config, **kwargs)
+        self._record(config, result)
+        return result
+
+    async def ainvoke(self, input, config: Optional[dict] = None, **kwargs):
+        result = await self.llm.ainvoke(input, config=config, **kwargs)
+        self._record(config, result)
+        return result
+
+    def stream(self, input, config: Optional[dict] = None, **kwargs):
+        tokens = (0, 0, 0)
+        try:
+            for chunk in self.llm.stream(input, config=config, **kwargs):
+                tokens = _add(tokens, usage_tokens(chunk))
+                yield chunk
+        finally:
+            self._record_tokens(config, tokens)
+
+    async def astream(self, input, config: Optional[dict] = None, **kwargs):
+        tokens = (0, 0, 0)
+        try:
+            async for chunk in self.llm.astream(input, config=config, **kwargs):
+                tokens = _add(tokens, usage_tokens(chunk))
+                yield chunk
+        finally:
+            self._record_tokens(config, tokens)
+
+
+def _add(total: Tuple[int, ...], tokens: Tuple[int, ...]) -> Tuple[int, ...]:
+    return tuple(a + b for a, b in zip(total, tokens))
@@ -0,0 +1,244 @@
+"""
+Per-provider admission control for LLM and embedding requests.
+
+Each provider gets one limiter per kind ("llm" or "embedding") with a
+requests-per-minute and a tokens-per-minute bucket, shared by every client
+in the process. Waiting requests are admitted in priority order, so
+interactive chat goes ahead of batch pipeline jobs.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from agents.llm.tokens import count_tokens
+from agents.llm.wrappers import ChatModelWrapper
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+_current_priority: ContextVar[Priority] = ContextVar(
+    "llm_request_priority", default=Priority.BATCH
+)
+
+
+@contextmanager
+def request_priority(priority: Priority):
+    """Run the enclosed LLM and embedding calls at ``priority``."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """Bucket refilled continuously at ``rate_per_minute`` up to ``capacity``."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+
+class ProviderRateLimiter:
+    def __init__(
+        self, name: str, rpm: Optional[int] = None, tpm: Optional[int] = None
+    ) -> None:
+        self.name = name
+        self.request_bucket = TokenBucket(rpm) if rpm else None
+        self.token_bucket = TokenBucket(tpm) if tpm else None
+        self._condition = threading.Condition()
+        self._queue: List[Tuple[int, int]] = []
+        self._counter = itertools.count()
+        self._admitted: Dict[str, int] = {p.name.lower(): 0 for p in Priority}
+        self._wait_total: Dict[str, float] = {p.name.lower(): 0.0 for p in Priority}
+        self._wait_max: Dict[str, float] = {p.name.lower(): 0.0 for p in Priority}
+        self._max_queue_depth = 0
+
+    def _wait_time(self, tokens: int) -> float:
+        now = time.monotonic()
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.time_until(1, now))
+        if self.token_bucket is not None and tokens:
+            wait = max(wait, self.token_bucket.time_until(tokens, now))
+        return wait
+
+    def acquire(self, tokens: int = 0, priority: Optional[Priority] = None) -> float:
+        """Block until the request may be sent; return the seconds waited."""
+        priority = _current_priority.get() if priority is None else priority
+        ticket = (int(priority), next(self._counter))
+        started = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._queue, ticket)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            try:
+                while True:
+                    if self._queue[0] == ticket:
+                        wait = self._wait_time(tokens)
+                        if wait <= 0:
+                            break
+                        self._condition.wait(timeout=wait)
+                    else:
+                        self._condition.wait()
+            except BaseException:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._condition.notify_all()
+                raise
+
+            heapq.heappop(self._queue)
+            if self.request_bucket is not None:
+                self.request_bucket.consume(1)
+            if self.token_bucket is not None and tokens:
+                self.token_bucket.consume(tokens)
+
+            waited = time.monotonic() - started
+            key = Priority(ticket[0]).name.lower()
+            self._admitted[key] += 1
+            self._wait_total[key] += waited
+            self._wait_max[key] = max(self._wait_max[key], waited)
+            self._condition.notify_all()
+            return waited
+
+    async def aacquire(
+        self, tokens: int = 0, priority: Optional[Priority] = None
+    ) -> float:
+        priority = _current_priority.get() if priority is None else priority
+        return await asyncio.to_thread(self.acquire, tokens, priority)
+
+    def metrics(self) -> Dict:
+        with self._condition:
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_queue_depth,
+                "admitted": dict(self._admitted),
+                "wait_seconds_total": dict(self._wait_total),
+                "wait_seconds_max": dict(self._wait_max),
+                "wait_seconds_avg": {
+                    key: self._wait_total[key] / count if count else 0.0
+                    for key, count in self._admitted.items()
+                },
+            }
+
+
+_limiters: Dict[Tuple[str, str], ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    kind: str, provider: str, limits: Optional[Dict[str, int]]
+) -> Optional[ProviderRateLimiter]:
+    """Return the process-wide limiter for ``(kind, provider)``, if configured."""
+    if not limits:
+        return None
+    key = (kind, str(provider))
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = ProviderRateLimiter(
+                f"{kind}:{provider}", rpm=limits.get("rpm"), tpm=limits.get("tpm")
+            )
+        return _limiters[key]
+
+
+def rate_limiter_metrics() -> Dict[str, Dict]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.metrics() for limiter in limiters}
+
+
+def _input_text(input) -> str:
+    if hasattr(input, "to_messages"):
+        input = input.to_messages()
+    if isinstance(input, str):
+        return input
+    parts = []
+    for message in input:
+        content = getattr(message, "content", message)
+        if isinstance(content, (tuple, list)) and len(content) == 2:
+            content = content[1]
+        parts.append(content if isinstance(content, str) else str(content))
+    return "\n".join(parts)
+
+
+class RateLimitedChatModel(ChatModelWrapper):
+    """Admits each call through a ``ProviderRateLimiter`` before sending it.
+
+    The TPM bucket is charged with the estimated input tokens, since the
+    output length is unknown until the response arrives.
+    """
+
+    def __init__(self, llm, limiter: ProviderRateLimiter, model: str = None) -> None:
+        super().__init__(llm)
+        self.limiter = limiter
+        self.model = model
+
+    def _tokens(self, input) -> int:
+        return count_tokens(_input_text(input), self.model)
+
+    def invoke(self, input, config: Optional[dict] = None, **kwargs):
+        self.limiter.acquire(self._tokens(input))
+        return self.llm.invoke(input, config=config, **kwargs)
+
+    async def ainvoke(self, input, config: Optional[dict] = None, **kwargs):
+        await self.limiter.aacquire(self._tokens(input))
+        return await self.llm.ainvoke(input, config=config, **kwargs)
+
+    def stream(self, input, config: Optional[dict] = None, **kwargs):
+        self.limiter.acquire(self._tokens(input))
+        yield from self.llm.stream(input, config=config, **kwargs)
+
+    async def astream(self, input, config: Optional[dict] = None, **kwargs):
+        await self.limiter.aacquire(self._tokens(input))
+        async for chunk in self.llm.astream(input, config=config, **kwargs):
+            yield chunk
+
+
+class RateLimitedEmbeddings(Embeddings):
+    """Embeddings whose provider calls go through a ``ProviderRateLimiter``."""
+
+    def __init__(self, embeddings: Embeddings, limiter: ProviderRateLimiter) -> None:
+        self.embeddings = embeddings
+        self.limiter = limiter
+
+    def __getattr__(self, name: str):
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.limiter.acquire(sum(count_tokens(text) for text in texts))
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self.limiter.acquire(count_tokens(text))
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,71 @@
+"""
+Token accounting with real tokenizers and greedy context packing.
+
+OpenAI models (including ``openai/...`` on OpenRouter) are counted with
+their exact tiktoken encoding. Other providers do not ship a local
+tokenizer, so they are counted with ``cl100k_base``, which is close for
+modern BPE vocabularies. When tiktoken is not installed or its encoding
+files cannot be loaded, counting falls back to four characters per token.
+"""
+
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+FALLBACK_ENCODING = "cl100k_base"
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: Optional[str] = None):
+    """Return the tiktoken encoding for ``model``, cached per model name."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model.split("/")[-1])
+            except KeyError:
+                pass
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception:
+        # encoding files are downloaded on first use and may be unavailable
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def pack_items(
+    items: Sequence[T],
+    budget: int,
+    count: Callable[[T], int],
+    separator_tokens: int = 1,
+) -> List[List[T]]:
+    """
+    Greedily pack ``items`` into chunks of at most ``budget`` tokens.
+
+    Items keep their order. An item larger than the whole budget gets a
+    chunk of its own rather than being dropped.
+    """
+    chunks: List[List[T]] = []
+    current: List[T] = []
+    used = 0
+    for item in items:
+        cost = count(item) + separator_tokens
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
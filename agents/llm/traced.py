@@ -0,0 +1,96 @@
+"""
+Tracing spans around provider calls, with the token counts each call
+reported. The factories only add these wrappers when tracing is enabled.
+"""
+
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from agents.llm.prompt_cache import usage_tokens
+from agents.llm.wrappers import ChatModelWrapper
+from agents.utils.tracing import end_span, span, start_span
+
+
+def _record_usage(current, result) -> None:
+    input_tokens, cache_read, _ = usage_tokens(result)
+    usage = getattr(result, "usage_metadata", None) or {}
+    current.add("input_tokens", input_tokens)
+    current.add("cached_tokens", cache_read)
+    current.add("output_tokens", usage.get("output_tokens", 0) or 0)
+
+
+class TracedChatModel(ChatModelWrapper):
+    def __init__(self, llm, label: str) -> None:
+        super().__init__(llm)
+        self.label = label
+
+    def _attributes(self, config: Optional[dict]) -> dict:
+        return {
+            "model": self.label,
+            "run_name": (config or {}).get("run_name") or "default",
+        }
+
+    def invoke(self, input, config: Optional[dict] = None, **kwargs):
+        with span("llm.invoke", **self._attributes(config)) as current:
+            result = self.llm.invoke(input, config=config, **kwargs)
+            _record_usage(current, result)
+            return result
+
+    async def ainvoke(self, input, config: Optional[dict] = None, **kwargs):
+        with span("llm.invoke", **self._attributes(config)) as current:
+            result = await self.llm.ainvoke(input, config=config, **kwargs)
+            _record_usage(current, result)
+            return result
+
+    def stream(self, input, config: Optional[dict] = None, **kwargs):
+        current = start_span("llm.stream", **self._attributes(config))
+        try:
+            for chunk in self.llm.stream(input, config=config, **kwargs):
+                current.add("chunks")
+                _record_usage(current, chunk)
+                yield chunk
+        except GeneratorExit:
+            # the consumer stopped reading early
+            end_span(current)
+            raise
+        except BaseException as e:
+            end_span(current, e)
+            raise
+        end_span(current)
+
+    async def astream(self, input, config: Optional[dict] = None, **kwargs):
+        current = start_span("llm.stream", **self._attributes(config))
+        try:
+            async for chunk in self.llm.astream(input, config=config, **kwargs):
+                current.add("chunks")
+                _record_usage(current, chunk)
+                yield chunk
+        except GeneratorExit:
+            end_span(current)
+            raise
+        except BaseException as e:
+            end_span(current, e)
+            raise
+        end_span(current)
+
+
+class TracedEmbeddings(Embeddings):
+    def __init__(self, embeddings: Embeddings, label: str) -> None:
+        self.embeddings = embeddings
+        self.label = label
+
+    def __getattr__(self, name: str):
+        if name == "embeddings":
+            raise AttributeError(name)
+        return getattr(self.embeddings, name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with span("embeddings.embed_documents", model=self.label) as current:
+            current.set("items", len(texts))
+            current.set("chars", sum(len(text) for text in texts))
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with span("embeddings.embed_query", model=self.label, chars=len(text)):
+            return self.embeddings.embed_query(text)
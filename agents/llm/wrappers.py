@@ -0,0 +1,69 @@
+"""
+Base class for wrappers layered around LangChain chat models.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+
+class ChatModelWrapper:
+    """
+    Forwards the LangChain chat model interface to a wrapped model.
+
+    Subclasses override ``invoke``/``ainvoke``; ``batch`` fans out through
+    ``invoke`` so the subclass behaviour applies to every item. Any other
+    attribute (``model_name``, ``get_num_tokens``...) is read from the
+    wrapped model.
+    """
+
+    def __init__(self, llm) -> None:
+        self.llm = llm
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes not found on the wrapper itself
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def invoke(self, input, config: Optional[dict] = None, **kwargs):
+        return self.llm.invoke(input, config=config, **kwargs)
+
+    async def ainvoke(self, input, config: Optional[dict] = None, **kwargs):
+        return await self.llm.ainvoke(input, config=config, **kwargs)
+
+    def batch(self, inputs: List, config=None, **kwargs) -> List:
+        if not inputs:
+            return []
+        configs = config if isinstance(config, list) else [config] * len(inputs)
+        max_concurrency = (configs[0] or {}).get("max_concurrency")
+        with ThreadPoolExecutor(
+            max_workers=max_concurrency or min(len(inputs), 8)
+        ) as pool:
+            return list(
+                pool.map(
+                    lambda pair: self.invoke(pair[0], config=pair[1], **kwargs),
+                    zip(inputs, configs),
+                )
+            )
+
+    async def abatch(self, inputs: List, config=None, **kwargs) -> List:
+        if not inputs:
+            return []
+        configs = config if isinstance(config, list) else [config] * len(inputs)
+        max_concurrency = (configs[0] or {}).get("max_concurrency")
+        semaphore = asyncio.Semaphore(max_concurrency or len(inputs))
+
+        async def run(input, item_config):
+            async with semaphore:
+                return await self.ainvoke(input, config=item_config, **kwargs)
+
+        return await asyncio.gather(
+            *(run(input, item_config) for input, item_config in zip(inputs, configs))
+        )
+
+    def stream(self, input, config: Optional[dict] = None, **kwargs):
+        return self.llm.stream(input, config=config, **kwargs)
+
+    def astream(self, input, config: Optional[dict] = None, **kwargs):
+        return self.llm.astream(input, config=config, **kwargs)
@@ -1,13 +1,14 @@
 import httpx
 import json
 
-from agents.polymarket.polymarket import Polymarket
+from agents.polymarket.polymarket import DEFAULT_GAMMA_URL, Polymarket, base_url
 from agents.utils.objects import Market, PolymarketEvent, ClobReward, Tag
+from agents.utils.tracing import record_http, traced
 
 
 class GammaMarketClient:
-    def __init__(self):
-        self.gamma_url = "https://gamma-api.polymarket.com"
+    def __init__(self, gamma_url: str = None):
+        self.gamma_url = base_url(gamma_url, "GAMMA_API_URL", DEFAULT_GAMMA_URL)
         self.gamma_markets_endpoint = self.gamma_url + "/markets"
         self.gamma_events_endpoint = self.gamma_url + "/events"
 
@@ -68,6 +69,7 @@ class GammaMarketClient:
         except Exception as err:
             print(f"[parse_event] Caught exception: {err}")
 
+    @traced("gamma.get_markets", count_result=True)
     def get_markets(
         self, querystring_params={}, parse_pydantic=False, local_file_path=None
     ) -> "list[Market]":
@@ -77,6 +79,7 @@ class GammaMarketClient:
             )
 
         response = httpx.get(self.gamma_markets_endpoint, params=querystring_params)
+        record_http(response)
         if response.status_code == 200:
             data = response.json()
             if local_file_path is not None:
@@ -93,6 +96,7 @@ class GammaMarketClient:
             print(f"Error response returned from api: HTTP {response.status_code}")
             raise Exception()
 
+    @traced("gamma.get_events", count_result=True)
     def get_events(
         self, querystring_params={}, parse_pydantic=False, local_file_path=None
     ) -> "list[PolymarketEvent]":
@@ -102,6 +106,7 @@ class GammaMarketClient:
             )
 
         response = httpx.get(self.gamma_events_endpoint, params=querystring_params)
+        record_http(response)
         if response.status_code == 200:
             data = response.json()
             if local_file_path is not None:
@@ -174,10 +179,12 @@ class GammaMarketClient:
             }
         )
 
+    @traced("gamma.get_market")
     def get_market(self, market_id: int) -> dict():
         url = self.gamma_markets_endpoint + "/" + str(market_id)
         print(url)
         response = httpx.get(url)
+        record_http(response)
         return response.json()
 
 
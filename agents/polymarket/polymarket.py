@@ -33,22 +33,36 @@ from py_clob_client.clob_types import (
 from py_clob_client.order_builder.constants import BUY
 
 from agents.utils.objects import SimpleMarket, SimpleEvent
+from agents.utils.tracing import record_http, traced
 
 load_dotenv()
 
+DEFAULT_GAMMA_URL = "https://gamma-api.polymarket.com"
+DEFAULT_CLOB_URL = "https://clob.polymarket.com"
+DEFAULT_POLYGON_RPC = "https://polygon-rpc.com"
+
+
+def base_url(value: str, env_var: str, default: str) -> str:
+    """An explicit URL, else the environment's, else production's."""
+    return (value or os.getenv(env_var) or default).rstrip("/")
+
 
 class Polymarket:
-    def __init__(self) -> None:
-        self.gamma_url = "https://gamma-api.polymarket.com"
+    def __init__(
+        self, gamma_url: str = None, clob_url: str = None, polygon_rpc: str = None
+    ) -> None:
+        # GAMMA_API_URL, CLOB_API_URL and POLYGON_RPC_URL point the client at
+        # another deployment, e.g. the stand-in server for load tests
+        self.gamma_url = base_url(gamma_url, "GAMMA_API_URL", DEFAULT_GAMMA_URL)
         self.gamma_markets_endpoint = self.gamma_url + "/markets"
         self.gamma_events_endpoint = self.gamma_url + "/events"
 
-        self.clob_url = "https://clob.polymarket.com"
+        self.clob_url = base_url(clob_url, "CLOB_API_URL", DEFAULT_CLOB_URL)
         self.clob_auth_endpoint = self.clob_url + "/auth/api-key"
 
         self.chain_id = 137  # POLYGON
         self.private_key = os.getenv("POLYGON_WALLET_PRIVATE_KEY")
-        self.polygon_rpc = "https://polygon-rpc.com"
+        self.polygon_rpc = base_url(polygon_rpc, "POLYGON_RPC_URL", DEFAULT_POLYGON_RPC)
         self.w3 = Web3(Web3.HTTPProvider(self.polygon_rpc))
 
         self.exchange_address = "0x4bfb41d5b3570defd03c39a9a4d8de6bd8b8982e"
@@ -192,6 +206,7 @@ class Polymarket:
         )
         print(ctf_approval_tx_receipt)
 
+    @traced("polymarket.get_all_markets", count_result=True)
     def get_all_markets(self, limit: int = 1000) -> "list[SimpleMarket]":
         markets = []
         # 添加查询参数获取活跃市场
@@ -202,6 +217,7 @@ class Polymarket:
             "limit": limit
         }
         res = httpx.get(self.gamma_markets_endpoint, params=params)
+        record_http(res)
         if res.status_code == 200:
             for market in res.json():
                 try:
@@ -219,9 +235,11 @@ class Polymarket:
                 tradeable_markets.append(market)
         return tradeable_markets
 
+    @traced("polymarket.get_market")
     def get_market(self, token_id: str) -> SimpleMarket:
         params = {"clob_token_ids": token_id}
         res = httpx.get(self.gamma_markets_endpoint, params=params)
+        record_http(res)
         if res.status_code == 200:
             data = res.json()
             market = data[0]
@@ -243,11 +261,13 @@ class Polymarket:
             "outcomes": str(market["outcomes"]),
             "outcome_prices": str(market["outcomePrices"]),
             "clob_token_ids": str(market["clobTokenIds"]),
+            "liquidity": float(market.get("liquidity") or 0),
         }
         if token_id:
             market["clob_token_ids"] = token_id
         return market
 
+    @traced("polymarket.get_all_events", count_result=True)
     def get_all_events(self, limit: int = 1000) -> "list[SimpleEvent]":
         events = []
         # 添加查询参数获取活跃事件
@@ -258,6 +278,7 @@ class Polymarket:
             "limit": limit
         }
         res = httpx.get(self.gamma_events_endpoint, params=params)
+        record_http(res)
         if res.status_code == 200:
             for event in res.json():
                 try:
@@ -304,6 +325,7 @@ class Polymarket:
                 tradeable_events.append(event)
         return tradeable_events
 
+    @traced("polymarket.get_all_tradeable_events", count_result=True)
     def get_all_tradeable_events(self) -> "list[SimpleEvent]":
         all_events = self.get_all_events()
         return self.filter_events_for_trading(all_events)
@@ -317,6 +339,7 @@ class Polymarket:
             markets.append(market)
         return markets
 
+    @traced("polymarket.get_orderbook")
     def get_orderbook(self, token_id: str) -> OrderBookSummary:
         return self.client.get_order_book(token_id)
 
@@ -373,15 +396,24 @@ class Polymarket:
         print("Done!")
         return resp
 
+    @traced("polymarket.get_usdc_balance")
     def get_usdc_balance(self) -> float:
         balance_res = self.usdc.functions.balanceOf(
             self.get_address_for_private_key()
         ).call()
         return float(balance_res / 10e5)
 
+    @traced("polymarket.get_usdc_allowance")
+    def get_usdc_allowance(self, spender: str = None) -> float:
+        allowance_res = self.usdc.functions.allowance(
+            self.get_address_for_private_key(),
+            Web3.to_checksum_address(spender or self.exchange_address),
+        ).call()
+        return float(allowance_res / 10e5)
+
 
 def test():
-    host = "https://clob.polymarket.com"
+    host = base_url(None, "CLOB_API_URL", DEFAULT_CLOB_URL)
     key = os.getenv("POLYGON_WALLET_PRIVATE_KEY")
     print(key)
     chain_id = POLYGON
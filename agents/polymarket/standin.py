@@ -0,0 +1,390 @@
+"""
+Local stand-in for the Gamma, CLOB and Polygon RPC APIs, for load tests.
+
+``create_app`` serves the read endpoints the agents use from synthetic data
+(``synthetic_fixtures``) or recorded fixtures, with a configurable latency,
+jitter and injected error rate. Point the clients at it with:
+
+    GAMMA_API_URL=http://localhost:8090/gamma
+    CLOB_API_URL=http://localhost:8090/clob
+    POLYGON_RPC_URL=http://localhost:8090/rpc
+    POLYGON_WALLET_PRIVATE_KEY=<any 32-byte hex key>
+
+CLOB API key creation always succeeds and the RPC endpoint answers USDC
+``balanceOf`` / ``allowance`` calls from the wallet fixture, so ``Trader``,
+the CLI and the FastAPI server run end to end without the network.
+``GET /_standin/stats`` counts requests and injected errors per route and
+``POST /_standin/config`` changes latency and error rate mid-test.
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from agents.utils.benchmark import Fixtures
+
+_TOPICS = [
+    ("Economics", "the Federal Reserve cut interest rates at the {month} meeting"),
+    ("Crypto", "Bitcoin close above ${level}k on {month} 28"),
+    ("Crypto", "Ethereum trade above ${level}00 on {month} 28"),
+    ("Sports", "the home team win game {level} of the {month} series"),
+    ("Politics", "the incumbent win the {month} election in district {level}"),
+    ("Tech", "a new frontier AI model be released before {month} 28"),
+    ("Economics", "US CPI inflation come in above {level}.0% for {month}"),
+    ("Commodities", "Brent crude close above ${level} on {month} 28"),
+]
+_MONTHS = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+
+def _levels(rng: random.Random, start: float, step: float) -> List[Dict[str, str]]:
+    return [
+        {
+            "price": f"{start + step * i:.3f}",
+            "size": f"{rng.lognormvariate(5, 1):.2f}",
+        }
+        for i in range(8)
+        if 0 < start + step * i < 1
+    ]
+
+
+def synthetic_fixtures(
+    markets: int = 1000, markets_per_event: int = 4, seed: int = 0
+) -> Fixtures:
+    """Gamma markets and events and CLOB books in the APIs' wire format."""
+    rng = random.Random(seed)
+    market_objects, events, orderbooks = [], [], {}
+    for event_index in range(math.ceil(markets / markets_per_event)):
+        event_id = str(100000 + event_index)
+        category, template = _TOPICS[event_index % len(_TOPICS)]
+        month = _MONTHS[event_index % 12]
+        end = f"2026-{event_index % 12 + 1:02d}-28T12:00:00Z"
+        event_markets = []
+        for j in range(min(markets_per_event, markets - len(market_objects))):
+            market_id = str(1000000 + len(market_objects))
+            text = template.format(month=month, level=rng.randrange(2, 120))
+            price = round(rng.uniform(0.03, 0.97), 3)
+            spread = rng.choice([0.001, 0.002, 0.01, 0.02, 0.05, 0.12])
+            liquidity = round(rng.lognormvariate(9, 1.2), 4)
+            volume = round(liquidity * rng.uniform(1, 30), 4)
+            token_ids = [str(10**20 + 2 * int(market_id) + k) for k in range(2)]
+            market = {
+                "id": market_id,
+                "question": f"Will {text}?",
+                "conditionId": "0x%064x" % rng.getrandbits(256),
+                "slug": f"market-{market_id}",
+                "endDate": end,
+                "startDate": "2025-11-01T00:00:00Z",
+                "description": f'This market will resolve to "Yes" if {text}. '
+                f'Otherwise, this market will resolve to "No". Category: {category}.',
+                "outcomes": json.dumps(["Yes", "No"]),
+                "outcomePrices": json.dumps([str(price), f"{1 - price:.3f}"]),
+                "clobTokenIds": json.dumps(token_ids),
+                "liquidity": str(liquidity),
+                "liquidityNum": liquidity,
+                "volume": str(volume),
+                "volumeNum": volume,
+                "spread": spread,
+                "bestBid": round(price - spread / 2, 3),
+                "bestAsk": round(price + spread / 2, 3),
+                "lastTradePrice": price,
+                "active": True,
+                "closed": False,
+                "archived": False,
+                "new": False,
+                "featured": j == 0,
+                "restricted": True,
+                "funded": False,
+                "enableOrderBook": True,
+                "acceptingOrders": True,
+                "negRisk": False,
+                "orderPriceMinTickSize": 0.001,
+                "orderMinSize": 5,
+                "rewardsMinSize": 50,
+                "rewardsMaxSpread": 3.5,
+                "events": [{"id": event_id, "title": f"{category} {month}"}],
+            }
+            for token_id, mid in zip(token_ids, (price, 1 - price)):
+                best_bid = round(mid - spread / 2, 3)
+                orderbooks[token_id] = {
+                    "market": market["conditionId"],
+                    "asset_id": token_id,
+                    "hash": "%040x" % rng.getrandbits(160),
+                    "timestamp": str(int(time.time() * 1000)),
+                    "bids": _levels(rng, best_bid, -0.01),
+                    "asks": _levels(rng, round(best_bid + spread, 3), 0.01),
+                }
+            market_objects.append(market)
+            event_markets.append(market)
+        events.append(
+            {
+                "id": event_id,
+                "ticker": f"event-{event_id}",
+                "slug": f"event-{event_id}",
+                "title": f"{category} {month}",
+                "description": " ".join(m["question"] for m in event_markets),
+                "startDate": "2025-11-01T00:00:00Z",
+                "endDate": end,
+                "active": True,
+                "closed": False,
+                "archived": False,
+                "new": False,
+                "featured": False,
+                "restricted": True,
+                "liquidity": sum(m["liquidityNum"] for m in event_markets),
+                "volume": sum(m["volumeNum"] for m in event_markets),
+                "markets": [
+                    {
+                        key: m[key]
+                        for key in ("id", "question", "outcomePrices", "clobTokenIds")
+                    }
+                    for m in event_markets
+                ],
+            }
+        )
+    return Fixtures(
+        market_objects,
+        events,
+        orderbooks,
+        wallet={"usdc_balance": 1000.0, "usdc_allowance": 1000.0},
+    )
+
+
+class StandInConfig(BaseModel):
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # up to this many more seconds, uniformly
+    error_rate: float = 0.0  # share of requests answered with error_status
+    error_status: int = 503
+
+
+def _flag(value: Optional[str]) -> Optional[bool]:
+    return None if value is None else value.lower() in ("1", "true", "yes")
+
+
+def _filtered(items: List[Dict[str, Any]], params) -> List[Dict[str, Any]]:
+    for field in ("active", "closed", "archived"):
+        wanted = _flag(params.get(field))
+        if wanted is not None:
+            items = [item for item in items if bool(item.get(field)) == wanted]
+    offset = int(params.get("offset") or 0)
+    limit = params.get("limit")
+    return items[offset : offset + int(limit)] if limit else items[offset:]
+
+
+# USDC call selector -> wallet fixture field
+_USDC_CALLS = {
+    "0x70a08231": "usdc_balance",  # balanceOf(address)
+    "0xdd62ed3e": "usdc_allowance",  # allowance(address,address)
+}
+
+
+def _word(value: int) -> str:
+    return "0x" + format(value, "064x")
+
+
+def create_app(
+    fixtures: Fixtures, config: StandInConfig = None, seed: int = None
+) -> FastAPI:
+    app = FastAPI(title="Polymarket stand-in")
+    app.state.config = config or StandInConfig()
+    app.state.stats = defaultdict(lambda: {"requests": 0, "errors": 0})
+    rng = random.Random(seed)
+    markets_by_id = {str(m["id"]): m for m in fixtures.markets}
+    events_by_id = {str(e["id"]): e for e in fixtures.events}
+    markets_by_token = {
+        str(token): m
+        for m in fixtures.markets
+        for token in json.loads(m.get("clobTokenIds") or "[]")
+    }
+
+    @app.middleware("http")
+    async def shape_traffic(request: Request, call_next):
+        if request.url.path.startswith("/_standin"):
+            return await call_next(request)
+        # per API and resource, e.g. "gamma/markets" for /gamma/markets/123
+        stats = app.state.stats["/".join(request.url.path.strip("/").split("/")[:2])]
+        stats["requests"] += 1
+        config = app.state.config
+        delay = config.latency + (rng.uniform(0, config.jitter) if config.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if config.error_rate and rng.random() < config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"error": "injected by the stand-in server"},
+                status_code=config.error_status,
+            )
+        return await call_next(request)
+
+    @app.get("/_standin/stats")
+    async def stats():
+        return {
+            "config": app.state.config.model_dump(),
+            "markets": len(fixtures.markets),
+            "events": len(fixtures.events),
+            "orderbooks": len(fixtures.orderbooks),
+            "routes": dict(app.state.stats),
+        }
+
+    @app.post("/_standin/config")
+    async def configure(config: StandInConfig):
+        app.state.config = config
+        return config
+
+    # Gamma
+
+    @app.get("/gamma/markets")
+    async def gamma_markets(request: Request):
+        params = request.query_params
+        markets = fixtures.markets
+        token_id = params.get("clob_token_ids")
+        if token_id:
+            market = markets_by_token.get(token_id)
+            markets = [market] if market else []
+        ids = params.getlist("id")
+        if ids:
+            markets = [markets_by_id[i] for i in ids if i in markets_by_id]
+        return _filtered(markets, params)
+
+    @app.get("/gamma/markets/{market_id}")
+    async def gamma_market(market_id: str):
+        if market_id not in markets_by_id:
+            raise HTTPException(404, "market not found")
+        return markets_by_id[market_id]
+
+    @app.get("/gamma/events")
+    async def gamma_events(request: Request):
+        return _filtered(fixtures.events, request.query_params)
+
+    @app.get("/gamma/events/{event_id}")
+    async def gamma_event(event_id: str):
+        if event_id not in events_by_id:
+            raise HTTPException(404, "event not found")
+        return events_by_id[event_id]
+
+    # CLOB
+
+    def book(token_id: str) -> Dict[str, Any]:
+        if token_id not in fixtures.orderbooks:
+            raise HTTPException(404, "No orderbook exists for the requested token id")
+        return fixtures.orderbooks[token_id]
+
+    @app.post("/clob/auth/api-key")
+    @app.get("/clob/auth/derive-api-key")
+    async def api_key():
+        return {
+            "apiKey": "stand-in",
+            "secret": "c3RhbmQtaW4=",
+            "passphrase": "stand-in",
+        }
+
+    @app.get("/clob/time")
+    async def server_time():
+        return int(time.time())
+
+    @app.get("/clob/book")
+    async def order_book(token_id: str):
+        return book(token_id)
+
+    @app.get("/clob/price")
+    async def price(token_id: str, side: str):
+        levels = book(token_id)["asks" if side.upper() == "BUY" else "bids"]
+        if not levels:
+            raise HTTPException(404, "No orders on this side of the book")
+        prices = [float(level["price"]) for level in levels]
+        return {"price": str(min(prices) if side.upper() == "BUY" else max(prices))}
+
+    @app.get("/clob/midpoint")
+    async def midpoint(token_id: str):
+        current = book(token_id)
+        bid = max((float(level["price"]) for level in current["bids"]), default=0.0)
+        ask = min((float(level["price"]) for level in current["asks"]), default=1.0)
+        return {"mid": str(round((bid + ask) / 2, 4))}
+
+    @app.get("/clob/prices-history")
+    async def prices_history(market: str, fidelity: int = 60, points: int = 100):
+        """A deterministic random walk ending at the token's current midpoint."""
+        end = (await midpoint(market))["mid"]
+        walk = random.Random(market)
+        prices = [float(end)]
+        for _ in range(points - 1):
+            prices.append(min(0.99, max(0.01, prices[-1] + walk.gauss(0, 0.01))))
+        now = int(time.time())
+        return {
+            "history": [
+                {"t": now - i * fidelity * 60, "p": round(p, 4)}
+                for i, p in reversed(list(enumerate(prices)))
+            ]
+        }
+
+    @app.get("/clob/sampling-simplified-markets")
+    async def sampling_simplified_markets(next_cursor: str = "MA=="):
+        return {
+            "limit": len(fixtures.markets),
+            "count": len(fixtures.markets),
+            "next_cursor": "LTE=",
+            "data": [
+                {
+                    "condition_id": m.get("conditionId"),
+                    "tokens": [
+                        {"token_id": token, "outcome": outcome}
+                        for token, outcome in zip(
+                            json.loads(m["clobTokenIds"]), json.loads(m["outcomes"])
+                        )
+                    ],
+                    "active": m.get("active"),
+                    "closed": m.get("closed"),
+                }
+                for m in fixtures.markets
+            ],
+        }
+
+    # Polygon JSON-RPC, enough for the USDC balance and allowance reads
+
+    @app.post("/rpc")
+    async def rpc(request: Request):
+        payload = await request.json()
+        calls = payload if isinstance(payload, list) else [payload]
+        answers = []
+        for call in calls:
+            method = call.get("method")
+            answer = {"jsonrpc": "2.0", "id": call.get("id")}
+            if method == "eth_chainId":
+                answer["result"] = hex(137)
+            elif method == "net_version":
+                answer["result"] = "137"
+            elif method == "eth_blockNumber":
+                answer["result"] = hex(int(time.time()) // 2)
+            elif method == "eth_call":
+                transaction = call["params"][0]
+                data = transaction.get("data", transaction.get("input", ""))
+                field = _USDC_CALLS.get(data[:10])
+                # USDC has 6 decimals
+                amount = fixtures.wallet[field] if field else 0
+                answer["result"] = _word(int(amount * 10**6))
+            else:
+                answer["error"] = {"code": -32601, "message": f"{method} not supported"}
+            answers.append(answer)
+        return answers if isinstance(payload, list) else answers[0]
+
+    return app
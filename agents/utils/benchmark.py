@@ -0,0 +1,229 @@
+"""
+Benchmark helpers: timing with latency percentiles, baselines, and the
+Gamma, CLOB and wallet fixtures benchmarks and tests run against.
+
+Fixtures use the APIs' wire format. ``scripts/python/benchmark.py record``
+writes real responses to ``tests/fixtures``; until then the markets, events
+and order books come from ``standin.synthetic_fixtures``. ``tests/replay.py``
+serves them to the real clients offline, and the stand-in server
+(``scripts/python/standin_server.py``) serves them over HTTP.
+"""
+
+import contextlib
+import copy
+import io
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from pydantic import BaseModel
+
+FIXTURES_DIR = Path(__file__).parent.parent.parent / "tests" / "fixtures"
+
+
+class BenchmarkResult(BaseModel):
+    name: str
+    iterations: int
+    items: int  # items processed per iteration
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    throughput: float  # items per second at the mean latency
+
+
+class Regression(BaseModel):
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    change: float  # relative, positive is worse
+
+
+def measure(
+    name: str,
+    fn: Callable[..., Any],
+    iterations: int = 20,
+    warmup: int = 2,
+    items: int = 1,
+    setup: Callable[[], tuple] = None,
+    quiet: bool = True,
+) -> BenchmarkResult:
+    """
+    Time ``fn(*setup())`` ``iterations`` times after ``warmup`` untimed runs.
+    ``setup`` runs outside the timed section, e.g. to copy inputs ``fn``
+    mutates. ``quiet`` swallows what ``fn`` prints.
+    """
+    timings = []
+    output = (
+        contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext()
+    )
+    with output:
+        for iteration in range(warmup + iterations):
+            args = setup() if setup is not None else ()
+            started = time.perf_counter()
+            fn(*args)
+            elapsed = time.perf_counter() - started
+            if iteration >= warmup:
+                timings.append(elapsed * 1000)
+    timings = np.array(timings)
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+    mean = float(timings.mean())
+    return BenchmarkResult(
+        name=name,
+        iterations=iterations,
+        items=items,
+        mean_ms=mean,
+        p50_ms=float(p50),
+        p90_ms=float(p90),
+        p99_ms=float(p99),
+        max_ms=float(timings.max()),
+        throughput=items * 1000 / mean if mean else float("inf"),
+    )
+
+
+def save_baseline(path: str, results: List[BenchmarkResult]) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    data = {result.name: result.model_dump() for result in results}
+    Path(path).write_text(json.dumps(data, indent=2, sort_keys=True))
+
+
+def load_baseline(path: str) -> Dict[str, BenchmarkResult]:
+    data = json.loads(Path(path).read_text())
+    return {name: BenchmarkResult(**result) for name, result in data.items()}
+
+
+def compare(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, BenchmarkResult],
+    tolerance: float = 0.2,
+) -> List[Regression]:
+    """
+    Benchmarks whose median latency or throughput got worse by more than
+    ``tolerance``. Results over a different number of items, e.g. another
+    ``--scale``, are not comparable and skipped.
+    """
+    regressions = []
+    for result in results:
+        before = baseline.get(result.name)
+        if before is None or before.items != result.items:
+            continue
+        if before.p50_ms and result.p50_ms > before.p50_ms * (1 + tolerance):
+            regressions.append(
+                Regression(
+                    name=result.name,
+                    metric="p50_ms",
+                    baseline=before.p50_ms,
+                    current=result.p50_ms,
+                    change=result.p50_ms / before.p50_ms - 1,
+                )
+            )
+        if result.throughput < before.throughput / (1 + tolerance):
+            regressions.append(
+                Regression(
+                    name=result.name,
+                    metric="throughput",
+                    baseline=before.throughput,
+                    current=result.throughput,
+                    change=(
+                        before.throughput / result.throughput - 1
+                        if result.throughput
+                        else float("inf")
+                    ),
+                )
+            )
+    return regressions
+
+
+class Fixtures:
+    """Recorded Gamma markets and events, CLOB order books and wallet state."""
+
+    def __init__(
+        self,
+        markets: List[Dict[str, Any]],
+        events: List[Dict[str, Any]],
+        orderbooks: Dict[str, Dict[str, Any]],
+        wallet: Dict[str, float] = None,
+        llm_script: List[tuple] = None,
+    ) -> None:
+        self.markets = markets
+        self.events = events
+        self.orderbooks = orderbooks
+        self.wallet = wallet or {"usdc_balance": 0.0, "usdc_allowance": 0.0}
+        self.llm_script = llm_script
+
+    @classmethod
+    def load(cls, directory: str = None, synthetic_markets: int = 120) -> "Fixtures":
+        """
+        Fixtures from ``directory``, by default ``tests/fixtures``. Without
+        recorded markets there, ``synthetic_markets`` synthetic markets with
+        their events and order books are used instead.
+        """
+        root = Path(directory) if directory else FIXTURES_DIR
+
+        def read(name, default=None):
+            path = root / f"{name}.json"
+            return json.loads(path.read_text()) if path.exists() else default
+
+        script = read("llm_script")
+        markets = read("gamma_markets")
+        if markets is None:
+            from agents.polymarket.standin import synthetic_fixtures
+
+            synthetic = synthetic_fixtures(synthetic_markets)
+            markets, events, orderbooks = (
+                synthetic.markets,
+                synthetic.events,
+                synthetic.orderbooks,
+            )
+        else:
+            events = read("gamma_events", [])
+            orderbooks = read("clob_orderbooks", {})
+        return cls(
+            markets=markets,
+            events=events,
+            orderbooks=orderbooks,
+            wallet=read("wallet"),
+            llm_script=[tuple(entry) for entry in script] if script else None,
+        )
+
+    def save(self, directory: str) -> None:
+        root = Path(directory)
+        root.mkdir(parents=True, exist_ok=True)
+        for name, data in (
+            ("gamma_markets", self.markets),
+            ("gamma_events", self.events),
+            ("clob_orderbooks", self.orderbooks),
+        ):
+            (root / f"{name}.json").write_text(json.dumps(data, indent=2))
+        (root / "wallet.json").write_text(json.dumps(self.wallet, indent=2))
+
+    def scaled(self, factor: int) -> "Fixtures":
+        """``factor`` copies of every market and event under fresh ids."""
+        if factor <= 1:
+            return self
+        markets, events, orderbooks = [], [], dict(self.orderbooks)
+        for copy_index in range(factor):
+            suffix = "" if copy_index == 0 else f"{copy_index:02d}"
+            for market in self.markets:
+                market = copy.deepcopy(market)
+                market["id"] = f"{market['id']}{suffix}"
+                if suffix:
+                    token_ids = json.loads(market.get("clobTokenIds") or "[]")
+                    market["clobTokenIds"] = json.dumps(
+                        [f"{token}{suffix}" for token in token_ids]
+                    )
+                    for token in token_ids:
+                        if token in self.orderbooks:
+                            orderbooks[f"{token}{suffix}"] = self.orderbooks[token]
+                markets.append(market)
+            for event in self.events:
+                event = copy.deepcopy(event)
+                event["id"] = f"{event['id']}{suffix}"
+                for market in event.get("markets", []):
+                    market["id"] = f"{market['id']}{suffix}"
+                events.append(event)
+        return Fixtures(markets, events, orderbooks, self.wallet, self.llm_script)
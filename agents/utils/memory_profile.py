@@ -0,0 +1,245 @@
+"""
+Opt-in memory profiling of pipeline runs with ``tracemalloc``.
+
+MEMORY_PROFILE=1 starts ``tracemalloc`` and records, for each profiled
+section (``Trader.one_best_trade``, ``Creator.one_best_market`` and every
+pipeline run and stage, including those the server's endpoints start):
+
+- Python heap in use when the section started and finished, and its peak
+  while the section was open, overlapping sections included
+- the process RSS at the end and the peak RSS so far
+- the ``MEMORY_PROFILE_TOP`` source lines whose live allocations grew the
+  most between the section's start and end snapshots, i.e. what the section
+  left behind rather than what it freed again
+
+Records are appended as JSON lines to MEMORY_PROFILE_FILE, by default next
+to the trace (``trace.jsonl`` -> ``trace.memory.jsonl``), and carry the
+trace and span ids of the section's span. The peak and the growth are also
+set on the span as ``memory_peak_bytes`` and ``memory_delta_bytes``.
+
+Taking snapshots costs time in proportion to the live heap, so profiled runs
+are slower; with profiling off, sections are a no-op.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from agents.utils.tracing import current_span
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def default_path() -> Optional[str]:
+    path = os.getenv("MEMORY_PROFILE_FILE")
+    if path:
+        return path
+    trace_file = os.getenv("TRACE_FILE")
+    if trace_file:
+        root, extension = os.path.splitext(trace_file)
+        return f"{root}.memory{extension or '.jsonl'}"
+    return None
+
+
+class _Section:
+    __slots__ = ("name", "snapshot", "started", "start_bytes", "peak_bytes")
+
+    def __init__(self, name: str, snapshot, start_bytes: int) -> None:
+        self.name = name
+        self.snapshot = snapshot
+        self.started = time.perf_counter()
+        self.start_bytes = start_bytes
+        self.peak_bytes = start_bytes
+
+
+class MemoryProfiler:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        enabled: bool = True,
+        top: int = 10,
+        frames: int = 1,
+        keep: int = 500,
+    ) -> None:
+        self.path = path
+        self.enabled = enabled
+        self.top = top
+        self.frames = frames
+        self.recent: deque = deque(maxlen=keep)
+        self._open: List[_Section] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "MemoryProfiler":
+        enabled = os.getenv("MEMORY_PROFILE", "").lower() in ("1", "true", "yes")
+        return cls(
+            default_path(),
+            enabled,
+            top=int(os.getenv("MEMORY_PROFILE_TOP", "10")),
+            frames=int(os.getenv("MEMORY_PROFILE_FRAMES", "1")),
+        )
+
+    def _fold_peak(self) -> int:
+        """
+        Credit the heap peak since the last section boundary to every open
+        section and start a new measurement window; returns the heap in use.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        for section in self._open:
+            section.peak_bytes = max(section.peak_bytes, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+    def _top_sites(self, before, after) -> List[Dict[str, Any]]:
+        sites = []
+        for stat in after.compare_to(before, "lineno")[: self.top]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            sites.append(
+                {
+                    "site": f"{frame.filename}:{frame.lineno}",
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size": stat.size,
+                }
+            )
+        return sites
+
+    def begin(self, name: str) -> _Section:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        snapshot = self._snapshot() if self.top else None
+        with self._lock:
+            section = _Section(name, snapshot, self._fold_peak())
+            self._open.append(section)
+        return section
+
+    def end(self, section: _Section) -> Dict[str, Any]:
+        with self._lock:
+            end_bytes = self._fold_peak()
+            self._open.remove(section)
+        top = self._top_sites(section.snapshot, self._snapshot()) if self.top else []
+        current = current_span()
+        record = {
+            "name": section.name,
+            "trace_id": current.trace_id,
+            "span_id": current.span_id,
+            "time": time.time(),
+            "seconds": round(time.perf_counter() - section.started, 6),
+            "start_bytes": section.start_bytes,
+            "end_bytes": end_bytes,
+            "peak_bytes": section.peak_bytes,
+            "rss_bytes": rss_bytes(),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "top": top,
+        }
+        current.set("memory_peak_bytes", section.peak_bytes)
+        current.set("memory_delta_bytes", end_bytes - section.start_bytes)
+        with self._lock:
+            self.recent.append(record)
+            if self.path:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+        return record
+
+    def records(self, trace_id: str = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                record
+                for record in self.recent
+                if trace_id is None or record["trace_id"] == trace_id
+            ]
+
+
+_profiler: Optional[MemoryProfiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_memory_profiler() -> MemoryProfiler:
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = MemoryProfiler.from_env()
+    return _profiler
+
+
+def configure(
+    path: Optional[str] = None, enabled: bool = True, top: int = 10, frames: int = 1
+) -> MemoryProfiler:
+    """Replace the global profiler, e.g. from a script or a test."""
+    global _profiler
+    with _profiler_lock:
+        _profiler = MemoryProfiler(path, enabled, top=top, frames=frames)
+    return _profiler
+
+
+@contextmanager
+def memory_profile(name: str) -> Iterator[None]:
+    """
+    Profile the block's allocations; open it inside the block's span so the
+    record and the span refer to each other.
+    """
+    profiler = get_memory_profiler()
+    if not profiler.enabled:
+        yield
+        return
+    section = profiler.begin(name)
+    try:
+        yield
+    finally:
+        profiler.end(section)
+
+
+def profiled(name: str = None) -> Callable:
+    """Decorator profiling the function; apply it under ``traced``."""
+
+    def decorator(fn: Callable) -> Callable:
+        section_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with memory_profile(section_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
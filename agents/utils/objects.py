@@ -42,6 +42,25 @@ class SimpleMarket(BaseModel):
     outcomes: str
     outcome_prices: str
     clob_token_ids: Optional[str]
+    liquidity: Optional[float] = None
+
+
+class TradeForecast(BaseModel):
+    index: int  # position of the market in the filtered markets list
+    market_id: Optional[str] = None
+    question: str
+    outcomes: list[str]
+    outcome_prices: list[float]
+    forecast: str = ""
+    probability: Optional[float] = None  # likelihood from the superforecaster
+    forecast_outcome: Optional[str] = None
+    trade: str = ""
+    price: Optional[float] = None
+    size: Optional[float] = None
+    side: Optional[str] = None
+    edge: Optional[float] = None  # probability minus the outcome's market price
+    latency: float = 0.0
+    error: Optional[str] = None
 
 
 class ClobReward(BaseModel):
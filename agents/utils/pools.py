@@ -0,0 +1,29 @@
+"""
+Process-wide thread pools for background work.
+
+Objects such as ``PolymarketRAG`` or ``Executor`` are built per request or
+per round; pools created per instance were never shut down and piled up
+threads. ``shared_pool`` hands out one pool per name for the life of the
+process instead.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def shared_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """The pool called ``name``, created with ``max_workers`` threads on first use."""
+    pool = _pools.get(name)
+    if pool is None:
+        with _lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix=name
+                )
+                _pools[name] = pool
+    return pool
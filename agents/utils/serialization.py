@@ -0,0 +1,168 @@
+"""
+Compact serialization of Polymarket data for prompts.
+
+Raw Gamma API objects carry dozens of keys (images, icons, timestamps,
+internal ids) that cost tokens without helping the model. Records are
+projected to a field set when they are fetched and rendered as a
+pipe-separated table (default) or compact JSON instead of a Python repr.
+
+Field sets and the format can be overridden with PROMPT_EVENT_FIELDS,
+PROMPT_MARKET_FIELDS (comma-separated) and PROMPT_FORMAT
+(table, json or repr).
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+FORMATS = ("table", "json", "repr")
+
+EVENT_FIELDS = [
+    "id",
+    "title",
+    "description",
+    "endDate",
+    "liquidity",
+    "volume",
+    "markets",
+]
+# fields kept on the markets nested inside an event
+EVENT_MARKET_FIELDS = ["question", "outcomes", "outcomePrices"]
+MARKET_FIELDS = [
+    "id",
+    "question",
+    "description",
+    "outcomes",
+    "outcomePrices",
+    "endDate",
+    "liquidity",
+    "volume",
+    "spread",
+]
+# metadata of the market documents returned by the RAG filters
+DOCUMENT_FIELDS = [
+    "question",
+    "outcomes",
+    "outcome_prices",
+    "end",
+    "liquidity",
+    "spread",
+]
+
+
+def _fields_from_env(name: str, default: List[str]) -> List[str]:
+    value = os.getenv(name)
+    if not value:
+        return list(default)
+    return [field.strip() for field in value.split(",") if field.strip()]
+
+
+def default_format() -> str:
+    fmt = os.getenv("PROMPT_FORMAT", "table")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown prompt format {fmt!r}, expected one of {FORMATS}")
+    return fmt
+
+
+def _decode(value: Any) -> Any:
+    # Gamma returns list fields such as outcomes as JSON-encoded strings
+    if isinstance(value, str) and value[:1] == "[":
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def project(
+    record: Dict[str, Any],
+    fields: Sequence[str],
+    nested: Optional[Dict[str, Sequence[str]]] = None,
+) -> Dict[str, Any]:
+    """Keep ``fields`` of ``record`` (in that order), projecting nested lists too."""
+    projected = {}
+    for field in fields:
+        value = _decode(record.get(field))
+        if value is None or value == "" or value == []:
+            continue
+        if nested and field in nested and isinstance(value, list):
+            value = [
+                project(item, nested[field]) if isinstance(item, dict) else item
+                for item in value
+            ]
+        projected[field] = value
+    return projected
+
+
+def project_events(
+    events: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    fields = fields or _fields_from_env("PROMPT_EVENT_FIELDS", EVENT_FIELDS)
+    return [
+        project(event, fields, nested={"markets": EVENT_MARKET_FIELDS})
+        for event in events
+    ]
+
+
+def project_markets(
+    markets: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    fields = fields or _fields_from_env("PROMPT_MARKET_FIELDS", MARKET_FIELDS)
+    return [project(market, fields) for market in markets]
+
+
+def project_documents(results: Iterable) -> List[Dict[str, Any]]:
+    """Turn RAG ``(Document, score)`` results into market records."""
+    records = []
+    for result in results:
+        document = result[0] if isinstance(result, (tuple, list)) else result
+        record = project(document.metadata, DOCUMENT_FIELDS)
+        if document.page_content:
+            record["description"] = document.page_content
+        records.append(record)
+    return records
+
+
+def _cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:g}"
+    if isinstance(value, dict):
+        return " ".join(_cell(item) for item in value.values())
+    if isinstance(value, list):
+        separator = "; " if any(isinstance(item, dict) for item in value) else "/"
+        return separator.join(_cell(item) for item in value)
+    text = "" if value is None else str(value)
+    return " ".join(text.replace("|", "/").split())
+
+
+def to_table(records: Sequence[Dict[str, Any]]) -> str:
+    """One header line with the union of keys, then one pipe-separated row per record."""
+    if not records:
+        return ""
+    columns: List[str] = []
+    for record in records:
+        columns.extend(key for key in record if key not in columns)
+    lines = ["|".join(columns)]
+    lines.extend(
+        "|".join(_cell(record.get(column)) for column in columns) for record in records
+    )
+    return "\n".join(lines)
+
+
+def to_compact_json(records: Sequence[Dict[str, Any]]) -> str:
+    return json.dumps(list(records), separators=(",", ":"), ensure_ascii=False)
+
+
+def render(data: Any, fmt: Optional[str] = None) -> str:
+    """
+    Render prompt data. Lists of records use ``fmt`` (PROMPT_FORMAT by
+    default); anything else, such as pre-rendered text, goes through ``str``.
+    """
+    fmt = fmt or default_format()
+    if fmt == "repr" or not isinstance(data, list):
+        return str(data)
+    if data and not all(isinstance(record, dict) for record in data):
+        return str(data)
+    if fmt == "json":
+        return to_compact_json(data)
+    return to_table(data)
@@ -0,0 +1,356 @@
+"""
+Lightweight tracing: nested spans with durations and counters (items,
+bytes, tokens).
+
+Tracing is off unless TRACE_FILE (export path) or TRACING=1 (in-memory only)
+is set, or ``configure`` is called; disabled spans are shared no-op objects.
+Finished spans are kept in a bounded in-memory buffer and, with a file,
+appended one per line either as plain JSON (TRACE_FORMAT=jsonl) or as an
+OTLP/JSON ``ExportTraceServiceRequest`` (TRACE_FORMAT=otlp), the format the
+OpenTelemetry collector's file receiver reads.
+
+Parents are tracked with a context variable, so spans opened in threads
+started with ``asyncio.to_thread`` or ``contextvars.copy_context`` nest
+under the span that started them. ``scripts/python/trace_summary.py``
+prints a run's critical path.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+FORMATS = ("jsonl", "otlp")
+SERVICE_NAME = "polymarket-agents"
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start",
+        "end",
+        "attributes",
+        "error",
+        "_started",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: float = 1) -> None:
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def finish(self) -> None:
+        # wall clock start for export, monotonic clock for the duration
+        self.end = self.start + (time.perf_counter() - self._started)
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    trace_id = span_id = parent_id = None
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def add(self, key: str, amount: float = 1) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span], service: str = SERVICE_NAME) -> Dict[str, Any]:
+    """OTLP/JSON ``ExportTraceServiceRequest`` holding ``spans``."""
+    otlp_spans = []
+    for span in spans:
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            # SPAN_KIND_INTERNAL
+            "kind": 1,
+            "startTimeUnixNano": str(int(span.start * 1e9)),
+            "endTimeUnixNano": str(int((span.end or span.start) * 1e9)),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in span.attributes.items()
+            ],
+            # STATUS_CODE_ERROR / STATUS_CODE_OK
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            otlp_span["parentSpanId"] = span.parent_id
+        otlp_spans.append(otlp_span)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": service}}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": "agents"}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+def from_otlp(request: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Span dicts (as ``Span.to_dict``) from an OTLP/JSON request."""
+    spans = []
+    for resource_spans in request.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                start = int(span["startTimeUnixNano"]) / 1e9
+                end = int(span["endTimeUnixNano"]) / 1e9
+                status = span.get("status") or {}
+                spans.append(
+                    {
+                        "trace_id": span["traceId"],
+                        "span_id": span["spanId"],
+                        "parent_id": span.get("parentSpanId") or None,
+                        "name": span["name"],
+                        "start": start,
+                        "end": end,
+                        "duration_ms": round((end - start) * 1000, 3),
+                        "attributes": {
+                            attribute["key"]: next(iter(attribute["value"].values()))
+                            for attribute in span.get("attributes", [])
+                        },
+                        "error": (
+                            status.get("message") if status.get("code") == 2 else None
+                        ),
+                    }
+                )
+    return spans
+
+
+def children_by_parent(spans: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    children = defaultdict(list)
+    for span in spans:
+        if span["parent_id"]:
+            children[span["parent_id"]].append(span)
+    return children
+
+
+def critical_path(
+    span: Dict[str, Any], children: Dict[str, List[Dict[str, Any]]], depth: int = 0
+) -> List[Tuple[Dict[str, Any], int]]:
+    """
+    Walk back from the span's end: the child finishing last, then of the
+    children started before that one, the one finishing last, and so on,
+    recursively. Streamed stages overlap, so a predecessor may end slightly
+    after its successor started.
+    """
+    path = [(span, depth)]
+    chain = []
+    cutoff = float("inf")
+    remaining = children.get(span["span_id"], [])
+    while True:
+        remaining = [child for child in remaining if child["start"] < cutoff]
+        if not remaining:
+            break
+        child = max(remaining, key=lambda c: c["end"])
+        chain.append(child)
+        cutoff = child["start"]
+    for child in reversed(chain):
+        path.extend(critical_path(child, children, depth + 1))
+    return path
+
+
+def read_spans(path: str) -> List[Dict[str, Any]]:
+    """Read a trace file in either format."""
+    spans = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "resourceSpans" in record:
+                spans.extend(from_otlp(record))
+            else:
+                spans.append(record)
+    return spans
+
+
+class Tracer:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        fmt: str = "jsonl",
+        enabled: bool = None,
+        keep: int = 2000,
+    ) -> None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown trace format {fmt!r}, expected one of {FORMATS}")
+        self.path = path
+        self.fmt = fmt
+        self.enabled = bool(path) if enabled is None else enabled
+        self.recent: deque = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        path = os.getenv("TRACE_FILE") or None
+        enabled = bool(path) or os.getenv("TRACING", "").lower() in ("1", "true", "yes")
+        return cls(path, os.getenv("TRACE_FORMAT", "jsonl"), enabled)
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self.recent.append(span)
+            if self.path:
+                record = to_otlp([span]) if self.fmt == "otlp" else span.to_dict()
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+
+    def spans(self, trace_id: str = None) -> List[Span]:
+        with self._lock:
+            return [
+                span
+                for span in self.recent
+                if trace_id is None or span.trace_id == trace_id
+            ]
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer.from_env()
+    return _tracer
+
+
+def configure(
+    path: Optional[str] = None, fmt: str = "jsonl", enabled: bool = True
+) -> Tracer:
+    """Replace the global tracer, e.g. from a script or a test."""
+    global _tracer
+    with _tracer_lock:
+        _tracer = Tracer(path, fmt, enabled)
+    return _tracer
+
+
+def tracing_enabled() -> bool:
+    return get_tracer().enabled
+
+
+def current_span():
+    return _current.get() or NOOP_SPAN
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Time the block as a child of the current span."""
+    tracer = get_tracer()
+    if not tracer.enabled:
+        yield NOOP_SPAN
+        return
+    current = Span(name, _current.get(), **attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.finish()
+        _current.reset(token)
+        tracer.record(current)
+
+
+def start_span(name: str, **attributes):
+    """
+    Open a span without making it current, for work such as a streamed
+    response that is resumed from different contexts. Close it with
+    ``end_span``.
+    """
+    if not tracing_enabled():
+        return NOOP_SPAN
+    return Span(name, _current.get(), **attributes)
+
+
+def end_span(span, error: BaseException = None) -> None:
+    if span is NOOP_SPAN:
+        return
+    if error is not None:
+        span.error = f"{type(error).__name__}: {error}"
+    span.finish()
+    get_tracer().record(span)
+
+
+def traced(name: str = None, count_result: bool = False) -> Callable:
+    """Decorator running the function in a span; ``count_result`` records ``len(result)``."""
+
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name) as current:
+                result = fn(*args, **kwargs)
+                if count_result and hasattr(result, "__len__"):
+                    current.set("items", len(result))
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def record_http(response) -> None:
+    """Add an HTTP response's status and body size to the current span."""
+    current = current_span()
+    current.set("status_code", response.status_code)
+    current.add("bytes", len(response.content))
@@ -34,31 +34,34 @@ export default function AIChat() {
     setInput('');
     setLoading(true);
 
-    try {
-      let response;
-
-      if (mode === 'superforecaster') {
-        response = await api.chatLLM({
-          message: input,
-          mode,
-          context: superforecasterContext,
-        });
-      } else {
-        response = await api.chatLLM({
-          message: input,
-          mode,
-        });
-      }
-
-      const assistantMessage: ChatMessage = {
-        id: (Date.now() + 1).toString(),
+    const assistantId = (Date.now() + 1).toString();
+    setMessages((prev) => [
+      ...prev,
+      {
+        id: assistantId,
         role: 'assistant',
-        content: response.response,
-        mode: response.mode,
-        timestamp: response.timestamp,
-      };
+        content: '',
+        mode,
+        timestamp: new Date().toISOString(),
+      },
+    ]);
 
-      setMessages((prev) => [...prev, assistantMessage]);
+    try {
+      const chatRequest = mode === 'superforecaster'
+        ? { message: input, mode, context: superforecasterContext }
+        : { message: input, mode };
+
+      const done = await api.streamChatLLM(chatRequest, (token) => {
+        setMessages((prev) => prev.map((message) => (
+          message.id === assistantId
+            ? { ...message, content: message.content + token }
+            : message
+        )));
+      });
+
+      setMessages((prev) => prev.map((message) => (
+        message.id === assistantId ? { ...message, timestamp: done.timestamp } : message
+      )));
     } catch (error) {
       console.error('Failed to send message:', error);
     } finally {
@@ -154,7 +157,7 @@ export default function AIChat() {
             </div>
           )}
 
-          {messages.map((message) => (
+          {messages.filter((message) => message.content).map((message) => (
             <div key={message.id} className={`chat-message ${message.role}`}>
               <div className="message-header">
                 <span className="message-role">{message.role}</span>
@@ -167,7 +170,7 @@ export default function AIChat() {
             </div>
           ))}
 
-          {loading && (
+          {loading && !messages[messages.length - 1]?.content && (
             <div className="chat-message assistant">
               <div className="message-header">
                 <span className="message-role">assistant</span>
@@ -1,7 +1,7 @@
 import type {
   Market, Trade, Agent, NewsItem, TradeRequest, TradeResponse, DashboardStats,
-  Event, LLMChatRequest, LLMChatResponse, RAGQueryRequest, RAGQueryResponse,
-  RAGResult, RAGCreateRequest, AutonomousTraderRequest, AutonomousTraderResponse,
+  Event, LLMChatRequest, LLMChatResponse, LLMChatStreamDone, RAGQueryRequest, RAGQueryResponse,
+  RAGResult, RAGCreateRequest, RAGBatchQueryRequest, RAGBatchQueryResponse, AutonomousTraderRequest, AutonomousTraderResponse,
   MarketIdeaResponse
 } from '../types';
 
@@ -92,6 +92,39 @@ export const api = {
       body: JSON.stringify(chatRequest),
     }),
 
+  // Server-Sent Events stream: onToken is called for every chunk of the answer
+  streamChatLLM: async (chatRequest: LLMChatRequest, onToken: (token: string) => void) => {
+    const response = await fetch(`${API_BASE}/llm/chat/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(chatRequest),
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`API Error: ${response.status} ${response.statusText}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let done: LLMChatStreamDone | null = null;
+    for (;;) {
+      const { value, done: finished } = await reader.read();
+      if (finished) break;
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split('\n\n');
+      buffer = events.pop() ?? '';
+      for (const raw of events) {
+        const event = raw.match(/^event: (.*)$/m)?.[1];
+        const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] ?? '{}');
+        if (event === 'token') onToken(data.token);
+        else if (event === 'done') done = data;
+        else if (event === 'error') throw new Error(data.detail);
+      }
+    }
+    if (!done) throw new Error('Stream ended before completion');
+    return done;
+  },
+
   // ========================================
   // RAG
   // ========================================
@@ -108,6 +141,12 @@ export const api = {
       body: JSON.stringify(ragRequest),
     }),
 
+  queryRAGDatabaseBatch: (ragRequest: RAGBatchQueryRequest) =>
+    request<RAGBatchQueryResponse>('/rag/query-batch', {
+      method: 'POST',
+      body: JSON.stringify(ragRequest),
+    }),
+
   filterEventsRAG: (query: string) =>
     request<RAGResult[]>('/rag/filter-events', {
       method: 'POST',
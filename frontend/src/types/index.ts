@@ -104,6 +104,11 @@ export interface LLMChatResponse {
   timestamp: string;
 }
 
+export interface LLMChatStreamDone {
+  mode: LLMMode;
+  timestamp: string;
+}
+
 export interface ChatMessage {
   id: string;
   role: 'user' | 'assistant';
@@ -128,6 +133,18 @@ export interface RAGQueryResponse {
   count: number;
 }
 
+export interface RAGBatchQueryRequest {
+  queries: string[];
+  filter_type: 'events' | 'markets';
+  local_directory?: string;
+  k?: number;
+}
+
+export interface RAGBatchQueryResponse {
+  results: RAGQueryResponse[];
+  count: number;
+}
+
 export interface RAGResult {
   content: string;
   metadata: Record<string, any>;
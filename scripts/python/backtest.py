@@ -0,0 +1,116 @@
+"""
+Record market snapshots and replay them through the forecasting pipeline.
+
+    python scripts/python/backtest.py record --books       # e.g. daily, from cron
+    python scripts/python/backtest.py resolve              # after markets close
+    LLM_PROVIDER=local python scripts/python/backtest.py run
+    LLM_CACHE_PATH=llm_cache.db python scripts/python/backtest.py run --rag
+
+Snapshots are stored under BACKTEST_DIR (default ``backtest_data``).
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from agents.application.backtest import Backtester, SnapshotArchive
+from agents.polymarket.gamma import GammaMarketClient
+
+app = typer.Typer()
+console = Console()
+
+
+@app.command()
+def record(
+    directory: Optional[str] = typer.Option(None, help="Archive directory"),
+    books: bool = typer.Option(False, help="Also record every outcome's order book"),
+    limit: Optional[int] = typer.Option(None, help="Markets recorded"),
+) -> None:
+    polymarket = None
+    if books:
+        from agents.polymarket.polymarket import Polymarket
+
+        polymarket = Polymarket()
+    name = SnapshotArchive(directory).record(
+        GammaMarketClient(), polymarket=polymarket, limit=limit
+    )
+    console.print(f"recorded {name}")
+
+
+@app.command()
+def resolve(
+    directory: Optional[str] = typer.Option(None, help="Archive directory"),
+) -> None:
+    resolved = SnapshotArchive(directory).resolve(GammaMarketClient())
+    console.print(f"{len(resolved)} newly resolved markets")
+
+
+@app.command()
+def run(
+    directory: Optional[str] = typer.Option(None, help="Archive directory"),
+    bankroll: float = typer.Option(1000.0, help="Starting USDC"),
+    candidates: Optional[int] = typer.Option(
+        None, help="Markets forecast per snapshot"
+    ),
+    min_edge: Optional[float] = typer.Option(None, help="Edge needed to trade"),
+    rag: bool = typer.Option(False, help="Select markets with the hybrid RAG ranking"),
+) -> None:
+    archive = SnapshotArchive(directory)
+    if not archive.names():
+        console.print(f"no snapshots in {archive.root}")
+        raise typer.Exit(1)
+    report = Backtester(
+        archive, bankroll=bankroll, candidates=candidates, min_edge=min_edge, rag=rag
+    ).run()
+
+    table = Table(
+        title=f"backtest of {report.snapshots} snapshots ({report.seconds:.1f}s)"
+    )
+    table.add_column("metric")
+    table.add_column("value", justify="right")
+    rows = [
+        ("forecasts", report.forecasts),
+        ("failed forecasts", report.failed_forecasts),
+        ("fills", report.fills),
+        ("final equity", f"{report.final_equity:.2f}"),
+        ("pnl", f"{report.pnl:.2f} ({report.return_pct:.1f}%)"),
+        ("max drawdown", f"{100 * report.max_drawdown:.1f}%"),
+        (
+            "hit rate",
+            "-" if report.hit_rate is None else f"{100 * report.hit_rate:.1f}%",
+        ),
+        ("resolved forecasts", report.resolved_forecasts),
+        ("brier", "-" if report.brier is None else f"{report.brier:.4f}"),
+        (
+            "market brier",
+            "-" if report.market_brier is None else f"{report.market_brier:.4f}",
+        ),
+    ]
+    for metric, value in rows:
+        table.add_row(metric, str(value))
+    console.print(table)
+
+    if report.calibration:
+        table = Table(title="calibration")
+        for column in ("bin", "forecasts", "mean forecast", "observed"):
+            table.add_column(column, justify="right")
+        for calibration in report.calibration:
+            table.add_row(
+                f"{calibration.low:.1f}-{calibration.high:.1f}",
+                str(calibration.count),
+                f"{calibration.forecast:.3f}",
+                f"{calibration.observed:.3f}",
+            )
+        console.print(table)
+
+
+if __name__ == "__main__":
+    app()
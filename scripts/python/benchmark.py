@@ -0,0 +1,274 @@
+"""
+Benchmark parsing, filtering, RAG and full trading rounds on fixture data.
+
+Gamma, CLOB and wallet reads are replayed (tests/replay.py) from the
+fixtures in tests/fixtures, synthetic until ``record`` writes real
+responses there, and the LLM answers from the fixtures' script, so runs are
+offline and repeatable:
+
+    python scripts/python/benchmark.py run
+    python scripts/python/benchmark.py run --save-baseline benchmark_baseline.json
+    python scripts/python/benchmark.py run --baseline benchmark_baseline.json
+    python scripts/python/benchmark.py run --scale 10 --only rag
+    python scripts/python/benchmark.py record --limit 200
+
+``run --baseline`` exits with status 1 when a benchmark's median latency or
+throughput is worse than the baseline by more than ``--tolerance``.
+"""
+
+import copy
+import dataclasses
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, List, Optional
+
+project_root = Path(__file__).parent.parent.parent
+for path in (project_root, project_root / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from agents.utils.benchmark import (
+    FIXTURES_DIR,
+    Fixtures,
+    compare,
+    load_baseline,
+    measure,
+    save_baseline,
+)
+from replay import replay
+
+app = typer.Typer()
+console = Console()
+
+
+class Case:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        items: int,
+        setup: Callable[[], tuple] = None,
+        iterations: int = None,
+    ) -> None:
+        self.name = name
+        self.fn = fn
+        self.items = items
+        self.setup = setup
+        # fewer iterations for the slow end-to-end cases
+        self.iterations = iterations
+
+
+def build_cases(
+    fixtures: Fixtures, llm_latency: float, run_state_dir: str
+) -> List[Case]:
+    """Benchmarks over ``fixtures``; call inside ``replay``."""
+    from agents.application.prompts import Prompter
+    from agents.application.trade import Trader
+    from agents.connectors.chroma import iter_gamma_market_documents
+    from agents.connectors.retrieval import HybridRetriever, MetadataFilter
+    from agents.llm.local import HashingEmbeddings, ScriptedChatModel
+    from agents.polymarket.gamma import GammaMarketClient
+    from agents.polymarket.polymarket import Polymarket
+    from agents.utils.objects import SimpleEvent, SimpleMarket
+
+    gamma = GammaMarketClient()
+    polymarket = Polymarket()
+    markets = fixtures.markets
+    simple_markets = [SimpleMarket(**polymarket.map_api_to_market(m)) for m in markets]
+    simple_events = [
+        SimpleEvent(**polymarket.map_api_to_event(e)) for e in fixtures.events
+    ]
+    documents = list(iter_gamma_market_documents(markets))
+    metadata_filter = MetadataFilter(min_liquidity=1000, max_spread=0.05)
+    prompt = Prompter().filter_markets()
+    embeddings = HashingEmbeddings()
+    warm = HybridRetriever(documents, embeddings)
+    warm.search(prompt, k=4)
+
+    def one_best_trade(trader):
+        trader.one_best_trade()
+        if trader.run_state.latest_unfinished("trade"):
+            raise RuntimeError("one_best_trade did not finish, run it with --verbose")
+
+    def new_trader():
+        os.environ["RUN_STATE_DIR"] = run_state_dir
+        trader = Trader()
+        trader.agent.llm = ScriptedChatModel(
+            script=fixtures.llm_script or [], latency=llm_latency
+        )
+        return (trader,)
+
+    return [
+        Case(
+            "parse_pydantic_market",
+            lambda batch: [gamma.parse_pydantic_market(m) for m in batch],
+            len(markets),
+            # parsing rewrites its input in place
+            setup=lambda: (copy.deepcopy(markets),),
+        ),
+        Case(
+            "map_api_to_market",
+            lambda: [polymarket.map_api_to_market(m) for m in markets],
+            len(markets),
+        ),
+        Case(
+            "map_api_to_event",
+            lambda: [polymarket.map_api_to_event(e) for e in fixtures.events],
+            len(fixtures.events),
+        ),
+        Case(
+            "filter_markets_for_trading",
+            lambda: polymarket.filter_markets_for_trading(simple_markets),
+            len(simple_markets),
+        ),
+        Case(
+            "filter_events_for_trading",
+            lambda: polymarket.filter_events_for_trading(simple_events),
+            len(simple_events),
+        ),
+        Case(
+            "metadata_filter",
+            lambda: [metadata_filter.matches(d.metadata) for d in documents],
+            len(documents),
+        ),
+        Case(
+            "gamma.get_all_current_markets",
+            gamma.get_all_current_markets,
+            len(markets),
+        ),
+        Case(
+            "rag.ingest",
+            lambda: HybridRetriever(documents, embeddings).search(prompt, k=4),
+            len(documents),
+        ),
+        Case("rag.query", lambda: warm.search(prompt, k=4), 1),
+        Case(
+            "rag.query_filtered",
+            lambda: warm.search(prompt, k=4, metadata_filter=metadata_filter),
+            1,
+        ),
+        Case("one_best_trade", one_best_trade, 1, setup=new_trader, iterations=5),
+    ]
+
+
+@app.command()
+def run(
+    fixtures_dir: Optional[Path] = typer.Option(None, help="Fixture directory"),
+    iterations: int = typer.Option(20, help="Timed runs per benchmark"),
+    warmup: int = typer.Option(2, help="Untimed runs per benchmark"),
+    scale: int = typer.Option(1, help="Copies of the recorded markets and events"),
+    only: Optional[str] = typer.Option(
+        None, help="Run benchmarks whose name contains this"
+    ),
+    llm_latency: float = typer.Option(0.0, help="Seconds per scripted LLM call"),
+    baseline: Optional[Path] = typer.Option(None, help="Baseline to compare with"),
+    save: Optional[Path] = typer.Option(
+        None, "--save-baseline", help="Write results here"
+    ),
+    tolerance: float = typer.Option(0.2, help="Allowed slowdown before a regression"),
+    verbose: bool = typer.Option(False, help="Show what the benchmarked code prints"),
+) -> None:
+    fixtures = Fixtures.load(str(fixtures_dir) if fixtures_dir else None).scaled(scale)
+    results = []
+    with tempfile.TemporaryDirectory() as run_state_dir, replay(fixtures) as replayed:
+        for case in build_cases(fixtures, llm_latency, run_state_dir):
+            if only and only not in case.name:
+                continue
+            results.append(
+                measure(
+                    case.name,
+                    case.fn,
+                    iterations=min(case.iterations or iterations, iterations),
+                    warmup=warmup,
+                    items=case.items,
+                    setup=case.setup,
+                    quiet=not verbose,
+                )
+            )
+    console.print(
+        f"{len(fixtures.markets)} markets, {len(fixtures.events)} events, "
+        f"{len(fixtures.orderbooks)} order books, {replayed.requests} replayed requests"
+    )
+
+    previous = load_baseline(str(baseline)) if baseline else {}
+    table = Table(title="benchmarks")
+    columns = ("benchmark", "items", "mean ms", "p50 ms", "p90 ms", "p99 ms", "items/s")
+    for column in columns + (("vs baseline",) if previous else ()):
+        table.add_column(column, justify="left" if column == "benchmark" else "right")
+    for result in results:
+        row = [
+            result.name,
+            str(result.items),
+            f"{result.mean_ms:.3f}",
+            f"{result.p50_ms:.3f}",
+            f"{result.p90_ms:.3f}",
+            f"{result.p99_ms:.3f}",
+            f"{result.throughput:,.0f}",
+        ]
+        if previous:
+            before = previous.get(result.name)
+            row.append(
+                f"{100 * (result.p50_ms / before.p50_ms - 1):+.1f}%"
+                if before and before.p50_ms
+                else "-"
+            )
+        table.add_row(*row)
+    console.print(table)
+
+    if save:
+        save_baseline(str(save), results)
+        console.print(f"baseline written to {save}")
+    if previous:
+        regressions = compare(results, previous, tolerance)
+        for regression in regressions:
+            console.print(
+                f"[red]REGRESSION[/red] {regression.name} {regression.metric}: "
+                f"{regression.baseline:.3f} -> {regression.current:.3f} "
+                f"({100 * regression.change:+.1f}%)"
+            )
+        if regressions:
+            raise typer.Exit(1)
+
+
+@app.command()
+def record(
+    fixtures_dir: Path = typer.Option(FIXTURES_DIR, help="Where to write the fixtures"),
+    limit: int = typer.Option(120, help="Markets and events recorded"),
+) -> None:
+    """Refresh the fixtures from the live Gamma and CLOB APIs."""
+    import json
+
+    from py_clob_client.client import ClobClient
+
+    from agents.polymarket.gamma import GammaMarketClient
+    from agents.polymarket.polymarket import DEFAULT_CLOB_URL, base_url
+
+    gamma = GammaMarketClient()
+    params = {"active": True, "closed": False, "archived": False, "limit": limit}
+    markets = gamma.get_markets(querystring_params=params)
+    events = gamma.get_events(querystring_params=params)
+    clob = ClobClient(base_url(None, "CLOB_API_URL", DEFAULT_CLOB_URL))
+    orderbooks = {}
+    for market in markets:
+        for token_id in json.loads(market.get("clobTokenIds") or "[]"):
+            try:
+                orderbooks[token_id] = dataclasses.asdict(clob.get_order_book(token_id))
+            except Exception as e:
+                console.print(f"order book {token_id}: {e}")
+    existing = Fixtures.load(str(fixtures_dir))
+    # the wallet and the LLM script are not recorded
+    Fixtures(markets, events, orderbooks, existing.wallet).save(str(fixtures_dir))
+    console.print(
+        f"recorded {len(markets)} markets, {len(events)} events, "
+        f"{len(orderbooks)} order books to {fixtures_dir}"
+    )
+
+
+if __name__ == "__main__":
+    app()
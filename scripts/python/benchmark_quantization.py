@@ -0,0 +1,98 @@
+"""
+Compare float32, float16 and int8 vector index storage.
+
+Reports recall@k against exact float32 search, resident memory of the index
+and batched query latency for each precision level:
+
+    python scripts/python/benchmark_quantization.py --documents 20000 --dim 1536
+"""
+
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import numpy as np
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from agents.connectors.retrieval import PRECISIONS, VectorIndex
+
+app = typer.Typer()
+console = Console()
+
+
+def synthetic_embeddings(
+    rng: np.random.Generator, documents: int, dim: int, clusters: int
+) -> np.ndarray:
+    """Clustered vectors, closer to real text embeddings than uniform noise."""
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    assignments = rng.integers(0, clusters, size=documents)
+    noise = rng.normal(scale=0.6, size=(documents, dim)).astype(np.float32)
+    return centers[assignments] + noise
+
+
+def recall_at_k(expected: np.ndarray, actual: np.ndarray) -> float:
+    hits = sum(len(set(e) & set(a)) for e, a in zip(expected, actual))
+    return hits / expected.size
+
+
+@app.command()
+def main(
+    documents: int = typer.Option(20000, help="Number of indexed vectors"),
+    dim: int = typer.Option(1536, help="Embedding dimension"),
+    queries: int = typer.Option(64, help="Queries per batch"),
+    k: int = typer.Option(10, help="Results per query"),
+    clusters: int = typer.Option(200, help="Topic clusters in the synthetic data"),
+    repeats: int = typer.Option(5, help="Timed runs per configuration"),
+    rescore_factor: int = typer.Option(4, help="Shortlist size as a multiple of k"),
+    seed: int = typer.Option(0),
+) -> None:
+    rng = np.random.default_rng(seed)
+    vectors = synthetic_embeddings(rng, documents, dim, clusters)
+    picks = rng.integers(0, documents, size=queries)
+    query_vectors = vectors[picks] + rng.normal(scale=0.3, size=(queries, dim))
+
+    exact_index = VectorIndex(vectors)
+    expected, _ = exact_index.search_batch(query_vectors, k=k)
+
+    table = Table(title=f"{documents} x {dim} vectors, {queries} queries, k={k}")
+    table.add_column("precision")
+    table.add_column("rescore")
+    table.add_column(f"recall@{k}", justify="right")
+    table.add_column("memory (MiB)", justify="right")
+    table.add_column("batch latency (ms)", justify="right")
+    table.add_column("per query (ms)", justify="right")
+
+    for precision in PRECISIONS:
+        for rescore in (False, True) if precision != "float32" else (False,):
+            index = VectorIndex(
+                vectors,
+                precision=precision,
+                rescore=rescore,
+                rescore_factor=rescore_factor,
+            )
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                actual, _ = index.search_batch(query_vectors, k=k)
+                timings.append(time.perf_counter() - started)
+            latency_ms = float(np.median(timings)) * 1000
+            table.add_row(
+                precision,
+                "yes" if rescore else "no",
+                f"{recall_at_k(expected, actual):.4f}",
+                f"{index.nbytes / 2**20:.1f}",
+                f"{latency_ms:.1f}",
+                f"{latency_ms / queries:.2f}",
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,110 @@
+"""
+Report the tokens saved by compact prompt serialization.
+
+Builds each data-carrying prompt from the same events and markets, once with
+the raw API objects (the old ``str(data)`` behaviour) and once per compact
+format, and prints the token counts:
+
+    python scripts/python/prompt_token_report.py --events 20 --markets 20
+    python scripts/python/prompt_token_report.py --input-file snapshot.json
+
+An input file holds ``{"events": [...], "markets": [...]}`` as returned by
+the Gamma API, so the report can run offline.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from agents.application.prompts import Prompter
+from agents.connectors.chroma import gamma_market_to_document
+from agents.llm.tokens import count_tokens
+from agents.utils.serialization import (
+    project_documents,
+    project_events,
+    project_markets,
+    render,
+)
+
+app = typer.Typer()
+console = Console()
+
+
+@app.command()
+def main(
+    events: int = typer.Option(20, help="Current events to fetch"),
+    markets: int = typer.Option(20, help="Current markets to fetch"),
+    input_file: Optional[Path] = typer.Option(
+        None, help="JSON snapshot to use instead of the Gamma API"
+    ),
+    model: str = typer.Option("gpt-4o", help="Model whose tokenizer is used"),
+) -> None:
+    if input_file is not None:
+        snapshot = json.loads(input_file.read_text())
+        raw_events, raw_markets = snapshot["events"], snapshot["markets"]
+    else:
+        from agents.polymarket.gamma import GammaMarketClient
+
+        gamma = GammaMarketClient()
+        raw_events = gamma.get_current_events(limit=events)
+        raw_markets = gamma.get_current_markets(limit=markets)
+
+    prompter = Prompter()
+    # create_new_market receives the RAG filter's (Document, score) results
+    raw_results = [(gamma_market_to_document(m), 0.0) for m in raw_markets]
+
+    prompts = {
+        "prompts_polymarket": (
+            lambda: prompter.prompts_polymarket(
+                data1=str(raw_events), data2=str(raw_markets)
+            ),
+            lambda fmt: prompter.prompts_polymarket(
+                data1=render(project_events(raw_events), fmt),
+                data2=render(project_markets(raw_markets), fmt),
+            ),
+        ),
+        "create_new_market": (
+            lambda: prompter.create_new_market(str(raw_results)),
+            lambda fmt: prompter.create_new_market(
+                render(project_documents(raw_results), fmt)
+            ),
+        ),
+    }
+
+    table = Table(
+        title=f"{len(raw_events)} events, {len(raw_markets)} markets ({model} tokens)"
+    )
+    table.add_column("prompt")
+    table.add_column("format")
+    table.add_column("tokens", justify="right")
+    table.add_column("saved", justify="right")
+    table.add_column("saved %", justify="right")
+
+    for name, (build_raw, build_compact) in prompts.items():
+        baseline = count_tokens(build_raw(), model)
+        table.add_row(name, "raw repr", str(baseline), "-", "-")
+        for fmt in ("json", "table"):
+            tokens = count_tokens(build_compact(fmt), model)
+            saved = baseline - tokens
+            table.add_row(
+                "",
+                fmt,
+                str(tokens),
+                str(saved),
+                f"{100 * saved / baseline:.1f}" if baseline else "-",
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,11 +1,14 @@
 import os
 import sys
+import json
 from typing import Optional, List
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Add project root to path for imports
@@ -17,7 +20,13 @@ from agents.connectors.news import News
 from agents.application.executor import Executor
 from agents.application.trade import Trader
 from agents.application.creator import Creator
+from agents.application.shared_results import get_shared_results
 from agents.connectors.chroma import PolymarketRAG
+from agents.llm.hedging import HedgedChatModel, latency_metrics
+from agents.llm.prompt_cache import prompt_cache_stats
+from agents.llm.ratelimit import Priority, rate_limiter_metrics, request_priority
+from agents.utils.memory_profile import get_memory_profiler
+from agents.utils.tracing import get_tracer, span
 
 load_dotenv()
 
@@ -32,6 +41,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """One span per API request; spans of the endpoint's work nest under it"""
+    with span(
+        "http.request", method=request.method, path=request.url.path
+    ) as current:
+        response = await call_next(request)
+        current.set("status_code", response.status_code)
+        return response
+
+
 # Initialize clients
 polymarket = Polymarket()
 gamma = GammaMarketClient()
@@ -142,6 +163,18 @@ class RAGQueryResponse(BaseModel):
     count: int
 
 
+class RAGBatchQueryRequest(BaseModel):
+    queries: List[str]
+    filter_type: str
+    local_directory: Optional[str] = None
+    k: int = 4
+
+
+class RAGBatchQueryResponse(BaseModel):
+    results: List[RAGQueryResponse]
+    count: int
+
+
 class RAGCreateRequest(BaseModel):
     local_directory: str
     data_type: str
@@ -525,19 +558,21 @@ def get_event(event_id: str):
 def llm_chat(request: LLMChatRequest):
     """LLM chat as market analyst"""
     try:
-        if request.mode == "general":
-            response = executor.get_llm_response(request.message)
-        elif request.mode == "polymarket":
-            response = executor.get_polymarket_llm(request.message)
-        elif request.mode == "superforecaster":
-            context = request.context or {}
-            response = executor.get_superforecast(
-                event_title=context.get("event_title", ""),
-                market_question=context.get("market_question", ""),
-                outcome=context.get("outcome", "")
-            )
-        else:
-            raise HTTPException(status_code=400, detail="Invalid mode")
+        # Chat requests are admitted ahead of batch pipeline calls
+        with request_priority(Priority.INTERACTIVE):
+            if request.mode == "general":
+                response = executor.get_llm_response(request.message)
+            elif request.mode == "polymarket":
+                response = executor.get_polymarket_llm(request.message)
+            elif request.mode == "superforecaster":
+                context = request.context or {}
+                response = executor.get_superforecast(
+                    event_title=context.get("event_title", ""),
+                    market_question=context.get("market_question", ""),
+                    outcome=context.get("outcome", "")
+                )
+            else:
+                raise HTTPException(status_code=400, detail="Invalid mode")
 
         return LLMChatResponse(
             response=response,
@@ -548,6 +583,113 @@ def llm_chat(request: LLMChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+_STREAM_END = object()
+
+
+@app.post("/api/llm/chat/stream")
+async def llm_chat_stream(request: LLMChatRequest):
+    """LLM chat as market analyst, streamed as Server-Sent Events
+
+    Emits a `token` event per chunk of the answer, then `done` (or `error`).
+    """
+    if request.mode == "general":
+        tokens = executor.stream_llm_response(request.message)
+    elif request.mode == "polymarket":
+        tokens = executor.stream_polymarket_llm(request.message)
+    elif request.mode == "superforecaster":
+        context = request.context or {}
+        tokens = executor.stream_superforecast(
+            event_title=context.get("event_title", ""),
+            market_question=context.get("market_question", ""),
+            outcome=context.get("outcome", "")
+        )
+    else:
+        raise HTTPException(status_code=400, detail="Invalid mode")
+
+    async def events():
+        # Chat requests are admitted ahead of batch pipeline calls
+        with request_priority(Priority.INTERACTIVE):
+            try:
+                while True:
+                    # the LLM client blocks, so pull each chunk off the event loop
+                    token = await run_in_threadpool(next, tokens, _STREAM_END)
+                    if token is _STREAM_END:
+                        break
+                    yield _sse("token", {"token": token})
+                yield _sse("done", {
+                    "mode": request.mode,
+                    "timestamp": datetime.now().isoformat()
+                })
+            except Exception as e:
+                yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/llm/cache/stats")
+def llm_cache_stats():
+    """Response cache hit metrics per call site"""
+    cache = getattr(executor.llm, "cache", None)
+    if cache is None:
+        return {"enabled": False, "entries": 0, "call_sites": {}}
+    return {"enabled": True, "entries": len(cache), "call_sites": cache.stats()}
+
+
+@app.get("/api/llm/prompt-cache")
+def llm_prompt_cache():
+    """Provider-reported cached input tokens and ratio per call site"""
+    return prompt_cache_stats.stats()
+
+
+@app.get("/api/llm/latency")
+def llm_latency():
+    """Per-provider latency histograms and hedging counters"""
+    llm = executor.llm
+    while llm is not None and not isinstance(llm, HedgedChatModel):
+        llm = getattr(llm, "llm", None)
+    return {
+        "providers": latency_metrics(),
+        "hedging": llm.stats() if llm is not None else None,
+    }
+
+
+@app.get("/api/traces")
+def recent_traces(limit: int = Query(200, ge=1, le=2000), trace_id: Optional[str] = None):
+    """Most recent finished spans, empty unless tracing is enabled"""
+    spans = get_tracer().spans(trace_id)
+    return [s.to_dict() for s in spans[-limit:]]
+
+
+@app.get("/api/memory")
+def recent_memory_profiles(limit: int = Query(100, ge=1, le=500), trace_id: Optional[str] = None):
+    """Most recent per-stage memory profiles, empty unless MEMORY_PROFILE is set"""
+    records = get_memory_profiler().records(trace_id)
+    return records[-limit:]
+
+
+@app.get("/api/pipeline/shared")
+def pipeline_shared_results():
+    """Hits, waits and misses of the market selection shared between runs"""
+    shared = get_shared_results()
+    if shared is None:
+        return {"enabled": False}
+    return {"enabled": True, "max_age": shared.max_age, **shared.stats()}
+
+
+@app.get("/api/llm/rate-limits")
+def llm_rate_limits():
+    """Queue depth and wait times of the per-provider rate limiters"""
+    return rate_limiter_metrics()
+
+
 # ========================================
 # RAG ENDPOINTS
 # ========================================
@@ -600,6 +742,50 @@ def query_rag_database(request: RAGQueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/rag/query-batch", response_model=RAGBatchQueryResponse)
+def batch_query_rag_database(request: RAGBatchQueryRequest):
+    """Run many semantic searches against the markets or events index"""
+    try:
+        default_directories = {
+            "markets": "./local_db",
+            "events": "./local_db_events/chroma",
+        }
+        if request.filter_type not in default_directories:
+            raise HTTPException(
+                status_code=400, detail="Only markets and events queries are supported"
+            )
+        batch_results = polymarket_rag.batch_query_local_markets_rag(
+            local_directory=request.local_directory
+            or default_directories[request.filter_type],
+            queries=request.queries,
+            k=request.k,
+        )
+
+        responses = []
+        for query, results in zip(request.queries, batch_results):
+            serialized_results = [
+                {
+                    "content": doc.page_content,
+                    "metadata": doc.metadata,
+                    "score": float(score)
+                }
+                for doc, score in results
+            ]
+            responses.append(
+                RAGQueryResponse(
+                    results=serialized_results,
+                    query=query,
+                    count=len(serialized_results)
+                )
+            )
+
+        return RAGBatchQueryResponse(results=responses, count=len(responses))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/rag/filter-events", response_model=list[dict])
 def rag_filter_events(query: str):
     """Filter events using RAG"""
@@ -631,32 +817,42 @@ def get_trade_recommendation():
         # Clear local DBs first
         trader.pre_trade_logic()
 
-        events = polymarket.get_all_tradeable_events()
-        filtered_events = executor.filter_events_with_rag(events)
-        markets = executor.map_filtered_events_to_markets(filtered_events)
-        filtered_markets = executor.filter_markets(markets)
+        # the same selection as the Trader and Creator pipelines, reused from
+        # a recent run of either when PIPELINE_SHARE_SECONDS is set
+        stats, filtered_markets = executor.select_markets()
+        events_found = stats["events"].emitted
+        events_filtered = stats["filtered_events"].emitted
+        markets_found = stats["markets"].emitted
 
         if not filtered_markets:
             return AutonomousTraderResponse(
                 steps_completed=["Fetch events", "Filter events", "Map to markets", "Filter markets"],
-                events_found=len(events),
-                events_filtered=len(filtered_events),
-                markets_found=len(markets),
+                events_found=events_found,
+                events_filtered=events_filtered,
+                markets_found=markets_found,
                 markets_filtered=0,
                 trade_executed=False,
                 error="No suitable markets found"
             )
 
-        # Get trade recommendation
-        best_trade = executor.source_best_trade(filtered_markets[0])
+        # Forecast the top candidates concurrently and recommend the best edge
+        forecasts = executor.source_best_trades(filtered_markets)
+        best = forecasts[0]
+        if best.error:
+            raise Exception(best.error)
 
         return AutonomousTraderResponse(
             steps_completed=["Fetch events", "Filter events", "Map to markets", "Filter markets", "Generate recommendation"],
-            events_found=len(events),
-            events_filtered=len(filtered_events),
-            markets_found=len(markets),
+            events_found=events_found,
+            events_filtered=events_filtered,
+            markets_found=markets_found,
             markets_filtered=len(filtered_markets),
-            trade_recommendation={"trade": best_trade},
+            trade_recommendation={
+                "trade": best.trade,
+                "question": best.question,
+                "edge": best.edge,
+                "candidates": [forecast.dict() for forecast in forecasts],
+            },
             trade_executed=False
         )
     except Exception as e:
@@ -0,0 +1,70 @@
+r"""
+Serve synthetic or recorded Gamma, CLOB and Polygon RPC data locally so the
+CLI, the FastAPI server and the pipelines can be load-tested offline.
+
+    python scripts/python/standin_server.py --markets 20000 --latency 0.05 \
+        --error-rate 0.01
+    python scripts/python/standin_server.py --fixtures tests/fixtures --scale 50
+
+then run the stack against it:
+
+    GAMMA_API_URL=http://localhost:8090/gamma \
+    CLOB_API_URL=http://localhost:8090/clob \
+    POLYGON_RPC_URL=http://localhost:8090/rpc \
+    python scripts/python/cli.py get-all-markets --limit 5
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import typer
+import uvicorn
+from rich.console import Console
+
+from agents.polymarket.standin import StandInConfig, create_app, synthetic_fixtures
+from agents.utils.benchmark import Fixtures
+
+app = typer.Typer()
+console = Console()
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on"),
+    port: int = typer.Option(8090, help="Port to listen on"),
+    fixtures: Optional[Path] = typer.Option(
+        None, help="Serve recorded fixtures from here"
+    ),
+    scale: int = typer.Option(1, help="Copies of the recorded markets and events"),
+    markets: int = typer.Option(1000, help="Synthetic markets, without --fixtures"),
+    markets_per_event: int = typer.Option(4, help="Synthetic markets per event"),
+    latency: float = typer.Option(0.0, help="Seconds added to every response"),
+    jitter: float = typer.Option(0.0, help="Up to this many more seconds per response"),
+    error_rate: float = typer.Option(0.0, help="Share of requests that fail"),
+    error_status: int = typer.Option(503, help="Status of the failed requests"),
+    seed: Optional[int] = typer.Option(None, help="Seed for the data and the faults"),
+) -> None:
+    if fixtures:
+        data = Fixtures.load(str(fixtures)).scaled(scale)
+    else:
+        data = synthetic_fixtures(markets, markets_per_event, seed=seed or 0)
+    config = StandInConfig(
+        latency=latency, jitter=jitter, error_rate=error_rate, error_status=error_status
+    )
+    console.print(
+        f"serving {len(data.markets)} markets, {len(data.events)} events and "
+        f"{len(data.orderbooks)} order books on http://{host}:{port} "
+        f"(gamma /gamma, clob /clob, rpc /rpc, stats /_standin/stats)"
+    )
+    uvicorn.run(
+        create_app(data, config, seed=seed), host=host, port=port, log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,152 @@
+"""
+Summarize a trace file written with TRACE_FILE (JSON lines or OTLP/JSON).
+
+Prints the critical path of a run, the chain of spans that determined its
+end-to-end duration, followed by totals per span name:
+
+    TRACE_FILE=trace.jsonl python -m agents.application.trade
+    python scripts/python/trace_summary.py trace.jsonl
+    python scripts/python/trace_summary.py trace.jsonl --list
+    python scripts/python/trace_summary.py trace.jsonl --trace-id <id>
+"""
+
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from agents.utils.tracing import children_by_parent, critical_path, read_spans
+
+app = typer.Typer()
+console = Console()
+
+# attributes shown next to each span
+COUNTERS = (
+    "items",
+    "bytes",
+    "documents",
+    "input_tokens",
+    "cached_tokens",
+    "output_tokens",
+    "retries",
+    "memory_peak_bytes",
+    "memory_delta_bytes",
+)
+
+
+def _counters(span: Dict[str, Any]) -> str:
+    attributes = span.get("attributes") or {}
+    return " ".join(
+        f"{key}={attributes[key]}"
+        for key in COUNTERS
+        if attributes.get(key) not in (None, 0)
+    )
+
+
+@app.command()
+def main(
+    trace_file: Path = typer.Argument(..., help="JSONL or OTLP/JSON trace file"),
+    trace_id: Optional[str] = typer.Option(
+        None, help="Trace to summarize (default: latest)"
+    ),
+    list_traces: bool = typer.Option(
+        False, "--list", help="List the traces in the file"
+    ),
+    top: int = typer.Option(15, help="Span names shown in the totals table"),
+) -> None:
+    spans = read_spans(str(trace_file))
+    roots = sorted(
+        (span for span in spans if not span["parent_id"]), key=lambda s: s["start"]
+    )
+    if not roots:
+        console.print("no finished root spans in the trace file")
+        raise typer.Exit(1)
+
+    if list_traces:
+        table = Table(title=f"{len(roots)} traces")
+        for column in ("trace id", "root", "duration ms", "spans"):
+            table.add_column(column)
+        counts = defaultdict(int)
+        for span in spans:
+            counts[span["trace_id"]] += 1
+        for root in roots:
+            table.add_row(
+                root["trace_id"],
+                root["name"],
+                f"{root['duration_ms']:.1f}",
+                str(counts[root["trace_id"]]),
+            )
+        console.print(table)
+        return
+
+    if trace_id is None:
+        trace_id = roots[-1]["trace_id"]
+    trace = [span for span in spans if span["trace_id"] == trace_id]
+    root = next((span for span in roots if span["trace_id"] == trace_id), None)
+    if root is None:
+        console.print(f"trace {trace_id} has no finished root span")
+        raise typer.Exit(1)
+    children = children_by_parent(trace)
+
+    table = Table(
+        title=f"critical path of {root['name']} ({root['duration_ms']:.1f} ms)"
+    )
+    table.add_column("span")
+    table.add_column("ms", justify="right")
+    table.add_column("self ms", justify="right")
+    table.add_column("% of run", justify="right")
+    table.add_column("counters")
+    path = critical_path(root, children)
+    for index, (span, depth) in enumerate(path):
+        # time not covered by the next spans on the path one level deeper
+        nested = 0.0
+        for next_span, next_depth in path[index + 1 :]:
+            if next_depth <= depth:
+                break
+            if next_depth == depth + 1:
+                nested += next_span["duration_ms"]
+        name = "  " * depth + span["name"] + (" [error]" if span.get("error") else "")
+        table.add_row(
+            name,
+            f"{span['duration_ms']:.1f}",
+            f"{max(span['duration_ms'] - nested, 0.0):.1f}",
+            (
+                f"{100 * span['duration_ms'] / root['duration_ms']:.1f}"
+                if root["duration_ms"]
+                else "-"
+            ),
+            _counters(span),
+        )
+    console.print(table)
+
+    totals: Dict[str, Dict[str, float]] = defaultdict(
+        lambda: {"count": 0, "total": 0.0, "max": 0.0}
+    )
+    for span in trace:
+        total = totals[span["name"]]
+        total["count"] += 1
+        total["total"] += span["duration_ms"]
+        total["max"] = max(total["max"], span["duration_ms"])
+    table = Table(title=f"{len(trace)} spans by name")
+    for column in ("span", "count", "total ms", "max ms"):
+        table.add_column(column, justify="left" if column == "span" else "right")
+    for name, total in sorted(totals.items(), key=lambda item: -item[1]["total"])[:top]:
+        table.add_row(
+            name,
+            str(int(total["count"])),
+            f"{total['total']:.1f}",
+            f"{total['max']:.1f}",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    app()
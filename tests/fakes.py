@@ -0,0 +1,149 @@
+"""
+Stand-ins for the Gamma and Polymarket clients, the RAG results and the
+agents built on them, for tests that run the Executor, Trader and Creator
+pipelines offline.
+
+``fake_executor`` skips ``Executor.__init__`` (providers, vector store,
+clients) and sets the attributes the pipelines read; keyword arguments
+override them.
+"""
+
+import json
+import time
+
+from langchain_core.documents import Document
+
+from agents.application.creator import Creator
+from agents.application.executor import Executor
+from agents.application.prompts import Prompter
+from agents.application.trade import Trader
+from agents.connectors.retrieval import MetadataFilter
+from agents.llm.local import ScriptedChatModel
+
+
+def gamma_market(market_id, price, liquidity, spread=0.02, closed=False):
+    """A Gamma API market with a Yes/No book at ``price``."""
+    return {
+        "id": market_id,
+        "question": f"Will {market_id} happen?",
+        "description": f"Resolves YES if {market_id} happens.",
+        "outcomes": json.dumps(["Yes", "No"]),
+        "outcomePrices": json.dumps([str(price), str(round(1 - price, 4))]),
+        "clobTokenIds": json.dumps([f"{market_id}-yes", f"{market_id}-no"]),
+        "liquidityNum": liquidity,
+        "volumeNum": liquidity * 3,
+        "spread": spread,
+        "active": True,
+        "closed": closed,
+        "endDate": "2026-12-31T00:00:00Z",
+    }
+
+
+def event_result(market_ids):
+    """An event search result listing ``market_ids`` (comma separated)."""
+    return (Document(page_content="", metadata={"markets": market_ids}), 0.0)
+
+
+def market_result(question, prices="['0.4', '0.6']", **metadata):
+    """A market search result as filter_markets returns it."""
+    document = Document(
+        page_content=f"{question} description",
+        metadata={
+            "question": question,
+            "outcomes": "['Yes', 'No']",
+            "outcome_prices": prices,
+            "clob_token_ids": "['111', '222']",
+            **metadata,
+        },
+    )
+    return (document, 0.0)
+
+
+class FakeGamma:
+    """
+    Serves ``markets`` by id; without any, ``get_market`` returns the id it
+    was asked for. Each read sleeps ``latency`` seconds.
+    """
+
+    def __init__(self, markets=(), latency=0.0):
+        self.markets = {market["id"]: market for market in markets}
+        self.latency = latency
+        self.calls = 0
+
+    def get_all_current_markets(self):
+        self.calls += 1
+        return list(self.markets.values())
+
+    def get_market(self, market_id):
+        time.sleep(self.latency)
+        if not self.markets:
+            return market_id
+        return self.markets[market_id]
+
+
+class FakePolymarket:
+    """
+    Serves ``events`` and a wallet of 200 USDC with a 1000 USDC allowance.
+    Order books come from ``orderbook(token_id)`` when given. Each wallet
+    or book read sleeps ``latency`` seconds.
+    """
+
+    def __init__(self, events=("event-1",), orderbook=None, latency=0.0):
+        self.events = list(events)
+        self.orderbook = orderbook
+        self.latency = latency
+
+    def get_all_tradeable_events(self):
+        return list(self.events)
+
+    def map_api_to_market(self, market_data):
+        return market_data
+
+    def get_usdc_balance(self):
+        time.sleep(self.latency)
+        return 200.0
+
+    def get_usdc_allowance(self):
+        time.sleep(self.latency)
+        return 1000.0
+
+    def get_orderbook(self, token_id):
+        time.sleep(self.latency)
+        if self.orderbook is None:
+            return {"asset_id": token_id}
+        return self.orderbook(token_id)
+
+
+def fake_executor(llm=None, gamma=None, polymarket=None, **attributes) -> Executor:
+    executor = object.__new__(Executor)
+    executor.llm = llm or ScriptedChatModel()
+    executor.prompter = Prompter()
+    executor.gamma = gamma or FakeGamma()
+    executor.polymarket = polymarket or FakePolymarket()
+    executor.rag_top_k = 4
+    executor.event_filter = MetadataFilter()
+    executor.market_filter = MetadataFilter()
+    executor.trade_candidates = 1
+    executor.forecast_concurrency = 1
+    executor.market_fetch_concurrency = 1
+    executor.stage_retries = 0
+    executor.stage_backoff = 0.0
+    for name, value in attributes.items():
+        setattr(executor, name, value)
+    return executor
+
+
+def fake_trader(executor) -> Trader:
+    """A Trader on ``executor`` that keeps no run state."""
+    trader = object.__new__(Trader)
+    trader.agent = executor
+    trader.run_state = None
+    return trader
+
+
+def fake_creator(executor) -> Creator:
+    """A Creator on ``executor`` that keeps no run state."""
+    creator = object.__new__(Creator)
+    creator.agent = executor
+    creator.run_state = None
+    return creator
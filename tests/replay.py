@@ -0,0 +1,125 @@
+"""
+Offline replay of Gamma, CLOB and wallet reads for tests and benchmarks.
+
+``replay`` patches ``httpx.get`` to answer Gamma market and event requests
+from ``Fixtures`` and the CLOB client to answer order book requests, so the
+real client code (parsing, paging, mapping) runs unchanged without the
+network. The patches are process-wide, so one replay runs at a time; the
+stand-in server (``agents.polymarket.standin``) serves the same fixtures
+over HTTP where that does not fit.
+"""
+
+import contextlib
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+from unittest import mock
+from urllib.parse import urlparse
+
+import httpx
+
+from agents.utils.benchmark import Fixtures
+
+_lock = threading.Lock()
+
+
+def _page(items: List, params: Dict[str, Any]) -> List:
+    offset = int(params.get("offset") or 0)
+    limit = params.get("limit")
+    return items[offset : offset + int(limit)] if limit else items[offset:]
+
+
+class _Replay:
+    def __init__(self, fixtures: Fixtures) -> None:
+        self.fixtures = fixtures
+        self.markets_by_id = {str(m["id"]): m for m in fixtures.markets}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _count(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def get(self, url, params=None, **kwargs) -> httpx.Response:
+        self._count()
+        params = dict(params or {})
+        path = urlparse(str(url)).path.rstrip("/")
+        request = httpx.Request("GET", url, params=params)
+        if path.endswith("/markets"):
+            markets = self.fixtures.markets
+            token_id = params.get("clob_token_ids")
+            if token_id:
+                markets = [
+                    m for m in markets if str(token_id) in (m.get("clobTokenIds") or "")
+                ]
+            return httpx.Response(200, json=_page(markets, params), request=request)
+        if "/markets/" in path:
+            market = self.markets_by_id.get(path.rsplit("/", 1)[-1])
+            if market is None:
+                return httpx.Response(404, json={"error": "not found"}, request=request)
+            return httpx.Response(200, json=market, request=request)
+        if path.endswith("/events"):
+            return httpx.Response(
+                200, json=_page(self.fixtures.events, params), request=request
+            )
+        return httpx.Response(404, json={"error": "not recorded"}, request=request)
+
+    def get_order_book(self, client, token_id):
+        self._count()
+        book = self.fixtures.orderbooks.get(str(token_id))
+        if book is None:
+            raise KeyError(f"no recorded order book for {token_id}")
+        return book
+
+
+@contextmanager
+def replay(fixtures: Fixtures, env: Dict[str, str] = None) -> Iterator[_Replay]:
+    """
+    Serve Gamma, CLOB and wallet reads from ``fixtures`` and run the LLM and
+    embeddings offline (LLM_PROVIDER / EMBEDDING_PROVIDER ``local``) unless
+    ``env`` says otherwise. Blocks while another replay is active.
+    """
+    from py_clob_client.client import ClobClient
+    from py_clob_client.clob_types import ApiCreds
+
+    from agents.polymarket.polymarket import Polymarket
+
+    replayed = _Replay(fixtures)
+    environment = {
+        "LLM_PROVIDER": "local",
+        "EMBEDDING_PROVIDER": "local",
+        **(env or {}),
+    }
+    with _lock, contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.dict(os.environ, environment))
+        stack.enter_context(mock.patch.object(httpx, "get", replayed.get))
+        stack.enter_context(
+            mock.patch.object(
+                ClobClient,
+                "create_or_derive_api_creds",
+                lambda client, nonce=None: ApiCreds("replay", "replay", "replay"),
+            )
+        )
+        stack.enter_context(
+            mock.patch.object(
+                ClobClient,
+                "get_order_book",
+                lambda client, token_id: replayed.get_order_book(client, token_id),
+            )
+        )
+        stack.enter_context(
+            mock.patch.object(
+                Polymarket,
+                "get_usdc_balance",
+                lambda polymarket: fixtures.wallet["usdc_balance"],
+            )
+        )
+        stack.enter_context(
+            mock.patch.object(
+                Polymarket,
+                "get_usdc_allowance",
+                lambda polymarket, spender=None: fixtures.wallet["usdc_allowance"],
+            )
+        )
+        yield replayed
@@ -0,0 +1,157 @@
+import tempfile
+import time
+import unittest
+
+from agents.application.backtest import (
+    Backtester,
+    HistoricalSnapshot,
+    SnapshotArchive,
+    fill_order,
+)
+from agents.connectors.retrieval import MetadataFilter
+from agents.llm.local import ScriptedChatModel
+from fakes import FakeGamma, FakePolymarket, fake_executor, gamma_market
+
+
+def book(*asks):
+    return {
+        "bids": [],
+        "asks": [{"price": price, "size": size} for price, size in asks],
+    }
+
+
+def orderbook(token_id):
+    if token_id.endswith("-no"):
+        raise RuntimeError("book unavailable")
+    return book((0.5, 10))
+
+
+class TestFillOrder(unittest.TestCase):
+    def test_walks_the_asks_up_to_the_limit(self):
+        asks = [(0.5, 1000), (0.46, 100)]
+        shares, cost = fill_order(asks, 100, limit=0.62)
+        self.assertAlmostEqual(shares, 100 + 54 / 0.5)
+        self.assertAlmostEqual(cost, 100)
+        # the limit stops the fill before the amount is spent
+        self.assertEqual(fill_order(asks, 100, limit=0.48), (100, 46))
+        self.assertEqual(fill_order(asks, 100, limit=0.4), (0.0, 0.0))
+
+
+class TestSnapshotArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = SnapshotArchive(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record_and_resolve(self):
+        gamma = FakeGamma([gamma_market("a", 0.4, 100), gamma_market("b", 0.6, 100)])
+        name = self.archive.record(gamma, FakePolymarket(orderbook=orderbook))
+        self.assertEqual(self.archive.names(), [name])
+        snapshot = self.archive.load(name)
+        self.assertEqual(len(snapshot.markets), 2)
+        self.assertEqual(set(snapshot.orderbooks), {"a-yes", "b-yes"})
+        self.assertEqual(
+            snapshot.orderbooks["a-yes"]["asks"], [{"price": 0.5, "size": 10.0}]
+        )
+
+        gamma.markets["a"] = dict(
+            gamma_market("a", 0.0, 100, closed=True), outcomePrices='["0", "1"]'
+        )
+        self.assertEqual(self.archive.resolve(gamma), {"a": "No"})
+        self.assertEqual(self.archive.resolutions(), {"a": "No"})
+        # resolved markets are not looked up again
+        self.assertEqual(self.archive.resolve(gamma), {})
+
+
+class TestBacktester(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.archive = SnapshotArchive(self.tmp.name)
+        markets = [
+            gamma_market("a", 0.45, 5000),
+            gamma_market("b", 0.5, 4000),
+            # overpriced: the backtester buys No
+            gamma_market("c", 0.7, 3000),
+            # spread too wide for the market filter
+            gamma_market("d", 0.2, 9000, spread=0.3),
+        ]
+        start = time.time() - 2 * 86400
+        for day in range(2):
+            self.archive.save(
+                HistoricalSnapshot(
+                    taken_at=start + day * 86400,
+                    markets=markets,
+                    orderbooks={"a-yes": book((0.46, 100), (0.5, 1000))},
+                )
+            )
+        self.archive.save_resolutions({"a": "Yes", "b": "No"})
+        self.backtester = Backtester(
+            self.archive,
+            agent=fake_executor(
+                # every forecast: likelihood 0.62 for Yes, size 0.1
+                trade_candidates=3,
+                forecast_concurrency=2,
+                market_filter=MetadataFilter(max_spread=0.1),
+            ),
+            bankroll=1000.0,
+            min_edge=0.05,
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay(self):
+        report = self.backtester.run()
+        fills = self.backtester.fills
+
+        self.assertEqual(report.snapshots, 2)
+        self.assertEqual(report.forecasts, 6)
+        self.assertEqual(report.failed_forecasts, 0)
+        self.assertEqual(
+            [(f.snapshot, f.market_id, f.outcome) for f in fills],
+            [
+                (0, "a", 0),
+                (0, "b", 0),
+                (0, "c", 1),
+                (1, "a", 0),
+                (1, "b", 0),
+                (1, "c", 1),
+            ],
+        )
+        # 100 USDC against the recorded asks: 100 @ 0.46, then 108 @ 0.5
+        self.assertAlmostEqual(fills[0].shares, 208)
+        self.assertAlmostEqual(fills[0].cost, 100)
+        # no recorded book: the outcome price plus half the spread
+        self.assertAlmostEqual(fills[1].shares, 100 / 0.51)
+        self.assertAlmostEqual(fills[2].probability, 0.38)
+
+        # the same numbers computed one fill at a time
+        payout = {("a", 0): 1.0, ("b", 0): 0.0, ("c", 1): 0.3}
+        cash = 1000.0 - sum(f.cost for f in fills)
+        final = cash + sum(f.shares * payout[(f.market_id, f.outcome)] for f in fills)
+        self.assertAlmostEqual(report.final_equity, final)
+        self.assertAlmostEqual(report.pnl, final - 1000.0)
+        self.assertEqual(len(report.equity_curve), 3)
+        self.assertAlmostEqual(report.equity_curve[-1], final)
+        self.assertEqual(report.hit_rate, 0.5)
+
+        # a (0.62, yes) and b (0.62, no) in both snapshots; c is unresolved
+        self.assertEqual(report.resolved_forecasts, 4)
+        self.assertAlmostEqual(report.brier, (0.38**2 + 0.62**2) / 2)
+        self.assertAlmostEqual(report.market_brier, (0.55**2 + 0.5**2) / 2)
+        (calibration,) = report.calibration
+        self.assertEqual(calibration.count, 4)
+        self.assertAlmostEqual(calibration.observed, 0.5)
+
+    def test_failed_forecasts_are_counted(self):
+        self.backtester.agent.llm = ScriptedChatModel(script=[], default_response="")
+        report = self.backtester.run()
+        self.assertEqual(report.fills, 0)
+        self.assertEqual(report.final_equity, 1000.0)
+        self.assertIsNone(report.brier)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import json
+import os
+import tempfile
+import unittest
+
+import httpx
+
+from agents.utils.benchmark import (
+    BenchmarkResult,
+    Fixtures,
+    compare,
+    load_baseline,
+    measure,
+    save_baseline,
+)
+from replay import replay
+
+
+def result(name, p50_ms, items=10):
+    return BenchmarkResult(
+        name=name,
+        iterations=10,
+        items=items,
+        mean_ms=p50_ms,
+        p50_ms=p50_ms,
+        p90_ms=p50_ms,
+        p99_ms=p50_ms,
+        max_ms=p50_ms,
+        throughput=items * 1000 / p50_ms,
+    )
+
+
+class TestMeasure(unittest.TestCase):
+    def test_measure(self):
+        calls = []
+        benchmark = measure(
+            "append",
+            lambda value: calls.append(value) or print("quiet"),
+            iterations=5,
+            warmup=2,
+            items=3,
+            setup=lambda: (len(calls),),
+        )
+        self.assertEqual(calls, list(range(7)))
+        self.assertEqual(benchmark.iterations, 5)
+        self.assertLessEqual(benchmark.p50_ms, benchmark.p99_ms)
+        self.assertLessEqual(benchmark.p99_ms, benchmark.max_ms)
+        self.assertAlmostEqual(benchmark.throughput, 3000 / benchmark.mean_ms)
+
+    def test_compare_with_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "baseline.json")
+            save_baseline(
+                path, [result("parse", 1.0), result("rag", 10.0), result("scaled", 1.0)]
+            )
+            baseline = load_baseline(path)
+
+        regressions = compare(
+            [
+                result("parse", 1.1),
+                result("rag", 15.0),
+                # another fixture scale: not comparable
+                result("scaled", 5.0, items=30),
+                result("new", 100.0),
+            ],
+            baseline,
+            tolerance=0.2,
+        )
+        self.assertEqual(
+            [(r.name, r.metric) for r in regressions],
+            [("rag", "p50_ms"), ("rag", "throughput")],
+        )
+        self.assertAlmostEqual(regressions[0].change, 0.5)
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.fixtures = Fixtures.load()
+
+    def test_fixtures(self):
+        self.assertEqual(len(self.fixtures.markets), 120)
+        self.assertTrue(self.fixtures.llm_script)
+        scaled = self.fixtures.scaled(3)
+        self.assertEqual(len(scaled.markets), 360)
+        self.assertEqual(len({m["id"] for m in scaled.markets}), 360)
+        token_ids = json.loads(scaled.markets[-1]["clobTokenIds"])
+        self.assertIn(token_ids[0], scaled.orderbooks)
+
+    def test_gamma_requests_are_replayed(self):
+        from agents.polymarket.gamma import GammaMarketClient
+
+        with replay(self.fixtures) as replayed:
+            markets = GammaMarketClient().get_all_current_markets(limit=50)
+            market = GammaMarketClient().get_market(markets[5]["id"])
+            missing = httpx.get("https://gamma-api.polymarket.com/markets/0")
+        # three pages of 50, 50 and 20 markets, then one market and one miss
+        self.assertEqual(replayed.requests, 5)
+        self.assertEqual(len(markets), 120)
+        self.assertEqual(market["question"], markets[5]["question"])
+        self.assertEqual(missing.status_code, 404)
+
+    def test_one_best_trade_offline(self):
+        from agents.application.trade import Trader
+
+        with tempfile.TemporaryDirectory() as tmp, replay(
+            self.fixtures, env={"RUN_STATE_DIR": tmp}
+        ) as replayed:
+            trader = Trader()
+            trader.one_best_trade()
+            self.assertIsNone(trader.run_state.latest_unfinished("trade"))
+        # events, one read per market of the filtered events, two order books
+        self.assertGreater(replayed.requests, 3)
+
+    def test_one_best_trade_forecasts_again_after_a_late_failure(self):
+        from unittest import mock
+
+        from agents.application.executor import Executor
+        from agents.application.trade import Trader
+
+        with tempfile.TemporaryDirectory() as tmp, replay(
+            self.fixtures, env={"RUN_STATE_DIR": tmp}
+        ), mock.patch.object(
+            Executor,
+            "format_trade_prompt_for_execution",
+            side_effect=IndexError("list index out of range"),
+        ):
+            trader = Trader()
+            trader.one_best_trade()
+            run_id = trader.run_state.latest_unfinished("trade")
+            self.assertIsNotNone(run_id)
+            stages = trader.run_state.completed_stages(run_id)
+            trader.run_state.release(run_id)
+        self.assertIn("candidates", stages)
+        self.assertNotIn("forecasts", stages)
+
+
+if __name__ == "__main__":
+    unittest.main()
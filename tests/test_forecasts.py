@@ -0,0 +1,60 @@
+import time
+import unittest
+
+from langchain_core.documents import Document
+
+from agents.application.executor import forecast_edge, parse_forecast, parse_trade
+from agents.llm.local import ScriptedChatModel
+from fakes import fake_executor, market_result
+
+
+class TestParsing(unittest.TestCase):
+    def test_forecast_and_trade(self):
+        probability, outcome = parse_forecast(
+            "I believe X has a likelihood `0.7` for outcome of `No`."
+        )
+        self.assertEqual((probability, outcome), (0.7, "No"))
+        self.assertEqual(
+            parse_trade("price:0.5,\n size:0.1,\n side: sell,"),
+            {"price": 0.5, "size": 0.1, "side": "SELL"},
+        )
+        self.assertEqual(parse_trade("no trade")["side"], None)
+
+    def test_edge_uses_forecast_outcome_price(self):
+        self.assertAlmostEqual(forecast_edge(0.7, "No", ["Yes", "No"], [0.4, 0.6]), 0.1)
+        self.assertAlmostEqual(forecast_edge(0.7, None, ["Yes", "No"], [0.4, 0.6]), 0.3)
+        self.assertIsNone(forecast_edge(None, "Yes", ["Yes", "No"], [0.4, 0.6]))
+
+
+class TestSourceBestTrades(unittest.TestCase):
+    def test_markets_forecast_concurrently_and_ranked(self):
+        llm = ScriptedChatModel(latency=0.2)
+        executor = fake_executor(llm, trade_candidates=3, forecast_concurrency=3)
+        markets = [
+            market_result("Close market", "['0.6', '0.4']", id=1),
+            market_result("Mispriced market", "['0.1', '0.9']", id=2),
+            market_result("Other market", "['0.5', '0.5']", id=3),
+            market_result("Not a candidate", "['0.0', '1.0']", id=4),
+        ]
+        started = time.perf_counter()
+        forecasts = executor.source_best_trades(markets)
+        elapsed = time.perf_counter() - started
+
+        # two serial 0.2s calls per market, three markets side by side
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(len(forecasts), 3)
+        self.assertEqual(forecasts[0].question, "Mispriced market")
+        self.assertEqual(forecasts[0].index, 1)
+        self.assertAlmostEqual(forecasts[0].edge, 0.52)
+        self.assertEqual(forecasts[0].side, "BUY")
+
+    def test_failed_markets_rank_last(self):
+        executor = fake_executor(trade_candidates=3, forecast_concurrency=3)
+        broken = (Document(page_content="", metadata={"question": "Broken"}), 0.0)
+        forecasts = executor.source_best_trades([broken, market_result("Fine", id=1)])
+        self.assertEqual([f.question for f in forecasts], ["Fine", "Broken"])
+        self.assertIsNotNone(forecasts[1].error)
+
+
+if __name__ == "__main__":
+    unittest.main()
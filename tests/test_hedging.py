@@ -0,0 +1,135 @@
+import asyncio
+import time
+import unittest
+import uuid
+
+from agents.llm import LLMFactory
+from agents.llm.hedging import (
+    HedgedChatModel,
+    LatencyHistogram,
+    get_latency_histogram,
+)
+from agents.llm.local import ScriptedChatModel
+
+
+class FailingModel(ScriptedChatModel):
+    def respond(self, messages):
+        raise RuntimeError("provider down")
+
+
+def label(name):
+    # histograms are process-wide, keep each test's labels unique
+    return f"{name}-{uuid.uuid4().hex[:8]}"
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.quantile(0.95))
+        for _ in range(95):
+            histogram.record(0.1)
+        for _ in range(5):
+            histogram.record(5.0)
+        self.assertLess(histogram.quantile(0.5), 0.2)
+        self.assertLess(histogram.quantile(0.95), 0.2)
+        self.assertGreaterEqual(histogram.quantile(0.99), 5.0)
+        self.assertEqual(histogram.snapshot()["count"], 100)
+
+
+class TestHedgedChatModel(unittest.TestCase):
+    def test_slow_primary_is_hedged(self):
+        slow, fast = label("slow"), label("fast")
+        llm = HedgedChatModel(
+            [
+                (slow, ScriptedChatModel(default_response="slow", latency=1.0)),
+                (fast, ScriptedChatModel(default_response="fast")),
+            ],
+            default_deadline=0.05,
+        )
+        started = time.perf_counter()
+        self.assertEqual(llm.invoke("hi").content, "fast")
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(llm.stats()["hedges"], 1)
+        self.assertEqual(llm.stats()["wins"], {fast: 1})
+
+    def test_fast_primary_is_not_hedged(self):
+        primary = label("primary")
+        llm = HedgedChatModel(
+            [
+                (primary, ScriptedChatModel(default_response="primary")),
+                (label("backup"), ScriptedChatModel(default_response="backup")),
+            ],
+            default_deadline=1.0,
+        )
+        self.assertEqual(llm.invoke("hi").content, "primary")
+        self.assertEqual(llm.stats()["hedges"], 0)
+        self.assertEqual(get_latency_histogram(primary).count, 1)
+
+    def test_errors_fail_over(self):
+        down = label("down")
+        llm = HedgedChatModel(
+            [
+                (down, FailingModel()),
+                (label("backup"), ScriptedChatModel(default_response="backup")),
+            ]
+        )
+        self.assertEqual(llm.invoke("hi").content, "backup")
+        self.assertEqual(llm.stats()["failovers"], 1)
+        self.assertEqual(get_latency_histogram(down).errors, 1)
+        self.assertEqual("".join(c.content for c in llm.stream("hi")), "backup")
+
+    def test_error_while_hedging_fails_over_at_once(self):
+        fast = label("fast")
+        llm = HedgedChatModel(
+            [
+                (
+                    label("slow"),
+                    ScriptedChatModel(default_response="slow", latency=1.0),
+                ),
+                (label("down"), FailingModel()),
+                (fast, ScriptedChatModel(default_response="fast")),
+            ],
+            default_deadline=0.3,
+        )
+        started = time.perf_counter()
+        self.assertEqual(llm.invoke("hi").content, "fast")
+        # the third route starts when the second fails, not a deadline later
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(llm.stats()["hedges"], 1)
+        self.assertEqual(llm.stats()["failovers"], 1)
+
+    def test_all_routes_failing_raises(self):
+        llm = HedgedChatModel(
+            [(label("a"), FailingModel()), (label("b"), FailingModel())]
+        )
+        with self.assertRaises(RuntimeError):
+            llm.invoke("hi")
+        self.assertEqual(llm.stats()["failures"], 1)
+
+    def test_async_hedge(self):
+        llm = HedgedChatModel(
+            [
+                (
+                    label("slow"),
+                    ScriptedChatModel(default_response="slow", latency=1.0),
+                ),
+                (label("fast"), ScriptedChatModel(default_response="fast")),
+            ],
+            default_deadline=0.05,
+        )
+        result = asyncio.run(llm.ainvoke("hi"))
+        self.assertEqual(result.content, "fast")
+
+    def test_factory_builds_fallback_chain(self):
+        llm = LLMFactory.create_llm(
+            provider="local", cache=False, fallbacks=["local:backup"]
+        )
+        self.assertIsInstance(llm, HedgedChatModel)
+        self.assertEqual(
+            [name for name, _ in llm.routes], ["local:scripted", "local:backup"]
+        )
+        self.assertEqual(llm.model_name, "scripted")
+
+
+if __name__ == "__main__":
+    unittest.main()
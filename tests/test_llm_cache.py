@@ -0,0 +1,85 @@
+import time
+import unittest
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from agents.llm import LLMFactory
+from agents.llm.cache import CachedChatModel, ResponseCache, cache_key
+from agents.llm.local import ScriptedChatModel
+
+
+class CountingModel(ScriptedChatModel):
+    calls: int = 0
+
+    def respond(self, messages):
+        self.calls += 1
+        return super().respond(messages)
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_whitespace_is_normalised(self):
+        self.assertEqual(
+            cache_key("openai", "gpt", 0, "  hello\n   world "),
+            cache_key("openai", "gpt", 0, [HumanMessage(content="hello world")]),
+        )
+
+    def test_key_depends_on_model_and_roles(self):
+        base = cache_key("openai", "gpt", 0, "hi")
+        self.assertNotEqual(base, cache_key("openai", "gpt-4", 0, "hi"))
+        self.assertNotEqual(base, cache_key("openai", "gpt", 0.5, "hi"))
+        self.assertNotEqual(base, cache_key("openai", "gpt", 0, [SystemMessage("hi")]))
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_ttl_expiry(self):
+        cache = ResponseCache(ttl=0.01)
+        cache.set("k", "v")
+        self.assertEqual(cache.get("k"), "v")
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("k"))
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", "1")
+        time.sleep(0.001)
+        cache.set("b", "2")
+        time.sleep(0.001)
+        cache.get("a")
+        time.sleep(0.001)
+        cache.set("c", "3")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+
+
+class TestCachedChatModel(unittest.TestCase):
+    def test_hits_served_from_cache_with_call_site_metrics(self):
+        model = CountingModel(default_response="answer")
+        llm = CachedChatModel(model, ResponseCache(), "local", "scripted", 0)
+        config = {"run_name": "get_llm_response"}
+        first = llm.invoke("question", config=config)
+        second = llm.invoke("question ", config=config)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(model.calls, 1)
+        self.assertTrue(second.response_metadata["cached"])
+        stats = llm.stats()["get_llm_response"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(llm.model_name, "scripted")
+
+    def test_nonzero_temperature_bypasses_cache(self):
+        model = CountingModel()
+        llm = CachedChatModel(model, ResponseCache(), "local", "scripted", 0.7)
+        llm.invoke("q")
+        llm.invoke("q")
+        self.assertEqual(model.calls, 2)
+
+    def test_factory_wraps_client(self):
+        cache = ResponseCache()
+        llm = LLMFactory.create_llm(provider="local", cache=cache)
+        self.assertIsInstance(llm, CachedChatModel)
+        llm.batch(["a", "b", "a"], config={"max_concurrency": 1})
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import re
+import unittest
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from agents.application.prompts import Prompter
+from agents.llm import EmbeddingFactory, LLMFactory
+from agents.llm.local import HashingEmbeddings, ScriptedChatModel
+from fakes import fake_executor
+
+
+class TestHashingEmbeddings(unittest.TestCase):
+    def test_deterministic_and_normalised(self):
+        embeddings = HashingEmbeddings(dimensions=64)
+        first = embeddings.embed_query("Will bitcoin close above 100k?")
+        second = embeddings.embed_documents(["Will bitcoin close above 100k?"])[0]
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 64)
+        self.assertAlmostEqual(sum(x * x for x in first), 1.0, places=5)
+
+    def test_similar_texts_are_closer(self):
+        embeddings = HashingEmbeddings()
+        query = embeddings.embed_query("bitcoin price")
+        near = embeddings.embed_query("bitcoin price today")
+        far = embeddings.embed_query("football final winner")
+        dot = lambda a, b: sum(x * y for x, y in zip(a, b))
+        self.assertGreater(dot(query, near), dot(query, far))
+
+    def test_factory_builds_local_embeddings(self):
+        embeddings = EmbeddingFactory.create_embeddings(provider="local")
+        self.assertEqual(len(embeddings.embed_query("x")), 384)
+
+
+class TestScriptedChatModel(unittest.TestCase):
+    def test_factory_needs_no_api_key(self):
+        llm = LLMFactory.create_llm(provider="local")
+        self.assertIsInstance(llm, ScriptedChatModel)
+
+    def test_trade_response_is_parseable(self):
+        prompter = Prompter()
+        llm = ScriptedChatModel()
+        forecast = llm.invoke(
+            prompter.superforecaster("Will it rain?", "Rain in NYC", ["Yes", "No"])
+        ).content
+        self.assertIn("likelihood", forecast)
+        trade = llm.invoke(
+            prompter.one_best_trade(forecast, ["Yes", "No"], "[0.5, 0.5]")
+        ).content
+        size = re.findall(r"\d+\.\d+", trade.split(",")[1])[0]
+        self.assertEqual(float(size), 0.1)
+
+    def test_default_response_and_usage(self):
+        llm = ScriptedChatModel(default_response="hello")
+        result = llm.invoke([SystemMessage(content="sys"), HumanMessage(content="hi")])
+        self.assertEqual(result.content, "hello")
+        self.assertIn("total_tokens", result.usage_metadata)
+
+    def test_stream_yields_the_full_response(self):
+        llm = ScriptedChatModel(default_response="one two  three")
+        pieces = [chunk.content for chunk in llm.stream("hi")]
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual("".join(pieces), "one two  three")
+
+    def test_executor_streams_superforecast(self):
+        executor = fake_executor()
+        tokens = list(executor.stream_superforecast("Election", "Who wins?", "Yes"))
+        self.assertEqual(
+            "".join(tokens), executor.get_superforecast("Election", "Who wins?", "Yes")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
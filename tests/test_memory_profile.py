@@ -0,0 +1,81 @@
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+from unittest import mock
+
+from agents.application.pipeline import Pipeline, Stage
+from agents.utils import memory_profile, tracing
+from agents.utils.memory_profile import configure, default_path, profiled
+
+
+def allocate(item):
+    # about 8 MB held until the stage finishes with the item
+    return [bytearray(1024) for _ in range(8000)]
+
+
+class TestMemoryProfile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.was_tracing = tracemalloc.is_tracing()
+
+    def tearDown(self):
+        memory_profile._profiler = None
+        tracing._tracer = None
+        if not self.was_tracing:
+            tracemalloc.stop()
+        self.tmp.cleanup()
+
+    def test_path_next_to_the_trace(self):
+        with mock.patch.dict(os.environ, {"TRACE_FILE": "runs/trace.jsonl"}):
+            self.assertEqual(default_path(), "runs/trace.memory.jsonl")
+        with mock.patch.dict(
+            os.environ,
+            {"TRACE_FILE": "trace.jsonl", "MEMORY_PROFILE_FILE": "mem.jsonl"},
+        ):
+            self.assertEqual(default_path(), "mem.jsonl")
+
+    def test_disabled_by_default(self):
+        configure(enabled=False)
+        Pipeline([Stage("allocate", allocate)]).run_sync([1])
+        self.assertEqual(memory_profile.get_memory_profiler().records(), [])
+
+    def test_pipeline_stages_are_profiled(self):
+        path = os.path.join(self.tmp.name, "trace.memory.jsonl")
+        tracer = tracing.configure()
+        configure(path, top=5)
+
+        @profiled("run")
+        def run():
+            return Pipeline(
+                [Stage("allocate", allocate), Stage("keep", lambda blocks: blocks)]
+            ).run_sync([1, 2])
+
+        # the results are still held when the sections end
+        results = run()
+        self.assertEqual([len(blocks) for blocks in results], [8000, 8000])
+
+        with open(path) as f:
+            records = {record["name"]: record for record in map(json.loads, f)}
+        self.assertEqual(
+            set(records), {"run", "pipeline.run", "stage.allocate", "stage.keep"}
+        )
+        allocated = records["stage.allocate"]
+        self.assertGreater(
+            allocated["peak_bytes"] - allocated["start_bytes"], 8_000_000
+        )
+        self.assertGreaterEqual(records["run"]["peak_bytes"], allocated["peak_bytes"])
+        self.assertGreater(allocated["peak_rss_bytes"], 0)
+        (top,) = records["run"]["top"][:1]
+        self.assertIn(f"{__file__}:", top["site"])
+        self.assertGreater(top["size_diff"], 16_000_000)
+
+        spans = {s.name: s for s in tracer.spans()}
+        stage = spans["stage.allocate"]
+        self.assertEqual(allocated["span_id"], stage.span_id)
+        self.assertEqual(stage.attributes["memory_peak_bytes"], allocated["peak_bytes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
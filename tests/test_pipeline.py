@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from agents.application.pipeline import Pipeline, Stage
+from fakes import (
+    FakeGamma,
+    FakePolymarket,
+    event_result,
+    fake_executor,
+    fake_trader,
+    market_result,
+)
+
+
+class TestPipeline(unittest.TestCase):
+    def test_modes(self):
+        pipeline = Pipeline(
+            [
+                Stage("split", lambda text: text.split(), mode="flat_map"),
+                Stage("upper", str.upper, concurrency=3),
+                Stage("drop_b", lambda word: None if word == "B" else word),
+                Stage("sort", sorted, mode="batch"),
+            ]
+        )
+        self.assertEqual(pipeline.run_sync(["c a", "b d"]), ["A", "C", "D"])
+        self.assertEqual(pipeline.stats["split"].emitted, 4)
+        self.assertEqual(pipeline.stats["drop_b"].received, 4)
+        self.assertEqual(pipeline.stats["drop_b"].emitted, 3)
+
+    def test_coroutine_stage(self):
+        async def double(value):
+            await asyncio.sleep(0.01)
+            return value * 2
+
+        pipeline = Pipeline([Stage("double", double, concurrency=4)])
+        self.assertEqual(sorted(pipeline.run_sync(range(5))), [0, 2, 4, 6, 8])
+
+    def test_items_stream_between_stages(self):
+        def slow(value):
+            time.sleep(0.05)
+            return value
+
+        pipeline = Pipeline(
+            [Stage("slow", slow), Stage("next", lambda value: value)], queue_size=2
+        )
+        self.assertEqual(pipeline.run_sync(range(6)), list(range(6)))
+        # the second stage produced output long before the first one finished
+        self.assertLess(
+            pipeline.stats["next"].first_output, pipeline.stats["slow"].finished / 2
+        )
+
+    def test_concurrency_limit(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def work(value):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return value
+
+        started = time.perf_counter()
+        Pipeline([Stage("work", work, concurrency=3)]).run_sync(range(12))
+        self.assertEqual(peak[0], 3)
+        self.assertLess(time.perf_counter() - started, 12 * 0.02)
+
+    def test_retries_failing_calls(self):
+        calls = []
+
+        def flaky(value):
+            calls.append(value)
+            if calls.count(value) < 3:
+                raise ConnectionError("try again")
+            return value
+
+        pipeline = Pipeline([Stage("flaky", flaky)], retries=2, backoff=0.01)
+        self.assertEqual(pipeline.run_sync([1, 2]), [1, 2])
+        self.assertEqual(pipeline.stats["flaky"].retries, 4)
+
+        pipeline = Pipeline([Stage("flaky", flaky, retries=1)], retries=5, backoff=0)
+        with self.assertRaises(ConnectionError):
+            pipeline.run_sync([3])
+
+    def test_error_propagates(self):
+        def fail(value):
+            if value == 3:
+                raise ValueError("bad item")
+            return value
+
+        pipeline = Pipeline([Stage("fail", fail, concurrency=2), Stage("last", str)])
+        with self.assertRaises(ValueError):
+            pipeline.run_sync(range(10))
+
+    def test_invalid_stages(self):
+        with self.assertRaises(ValueError):
+            Stage("batch", sorted, concurrency=2, mode="batch")
+        with self.assertRaises(ValueError):
+            Pipeline([Stage("same", str), Stage("same", str)])
+
+
+class TestTraderPipeline(unittest.TestCase):
+    def setUp(self):
+        executor = fake_executor(
+            gamma=FakeGamma(latency=0.05),
+            polymarket=FakePolymarket(events=["event-1", "event-2"]),
+            trade_candidates=2,
+            forecast_concurrency=2,
+            market_fetch_concurrency=4,
+        )
+        executor.filter_events_with_rag = lambda events: [
+            event_result("1,2"),
+            event_result("3,4"),
+        ]
+        self.fetched = []
+        executor.filter_markets = lambda markets: self.fetched.extend(markets) or [
+            market_result(f"Market {market}") for market in sorted(markets)
+        ]
+        self.trader = fake_trader(executor)
+
+    def test_graph(self):
+        pipeline = self.trader.build_pipeline()
+        results = pipeline.run_sync()
+
+        self.assertEqual(sorted(self.fetched), ["1", "2", "3", "4"])
+        self.assertEqual(pipeline.stats["events"].emitted, 2)
+        self.assertEqual(pipeline.stats["markets"].emitted, 4)
+        self.assertEqual(pipeline.stats["filtered_markets"].emitted, 4)
+        self.assertEqual(pipeline.stats["candidates"].emitted, 2)
+        forecasts = sorted(forecast.index for forecast, _ in results)
+        self.assertEqual(forecasts, [0, 1])
+        for forecast, market in results:
+            self.assertIsNone(forecast.error)
+            self.assertEqual(forecast.question, market[0].metadata["question"])
+        self.assertEqual(self.trader.prefetch.balance(), 200.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
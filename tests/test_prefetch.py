@@ -0,0 +1,43 @@
+import time
+import unittest
+
+from agents.application.prefetch import market_token_ids
+from agents.llm.local import ScriptedChatModel
+from fakes import FakePolymarket, fake_executor, market_result
+
+READ_LATENCY = 0.3
+
+
+class TestTradePrefetch(unittest.TestCase):
+    def setUp(self):
+        self.executor = fake_executor(
+            ScriptedChatModel(latency=0.2),
+            polymarket=FakePolymarket(latency=READ_LATENCY),
+            trade_candidates=2,
+            forecast_concurrency=2,
+        )
+
+    def test_token_ids(self):
+        self.assertEqual(market_token_ids(market_result("Q")), ["111", "222"])
+
+    def test_reads_overlap_with_forecasts(self):
+        markets = [market_result("A"), market_result("B"), market_result("C")]
+        started = time.perf_counter()
+        prefetch = self.executor.start_trade_prefetch(markets)
+        forecasts = self.executor.source_best_trades(markets)
+        amount = self.executor.format_trade_prompt_for_execution(
+            forecasts[0].trade, usdc_balance=prefetch.balance()
+        )
+        books = prefetch.orderbooks(forecasts[0].index)
+        elapsed = time.perf_counter() - started
+
+        self.assertAlmostEqual(amount, 20.0)
+        self.assertEqual(set(books), {"111", "222"})
+        self.assertEqual(prefetch.allowance(), 1000.0)
+        self.assertEqual(len(prefetch.orderbook_futures), 2)
+        # 0.4s of LLM calls; serial reads afterwards would add at least 0.3s more
+        self.assertLess(elapsed, 0.65)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import unittest
+from unittest import mock
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+from agents.application.prompts import Prompter
+from agents.llm import LLMProvider
+from agents.llm.local import ScriptedChatModel
+from agents.llm.prompt_cache import (
+    PromptCacheMeter,
+    PromptCacheStats,
+    supports_cache_control,
+    usage_tokens,
+)
+
+
+class CachedUsageModel(ScriptedChatModel):
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        result = super()._generate(messages, stop, run_manager, **kwargs)
+        result.generations[0].message.usage_metadata = {
+            "input_tokens": 1000,
+            "output_tokens": 10,
+            "total_tokens": 1010,
+            "input_token_details": {"cache_read": 800},
+        }
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield from super()._stream(messages, stop, run_manager, **kwargs)
+        # providers report usage on the final chunk
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                usage_metadata={
+                    "input_tokens": 1000,
+                    "output_tokens": 10,
+                    "total_tokens": 1010,
+                    "input_token_details": {"cache_read": 800},
+                },
+            )
+        )
+
+
+class TestPromptLayout(unittest.TestCase):
+    def test_system_prefix_is_shared_across_markets(self):
+        prompter = Prompter()
+        first = prompter.superforecaster("Will A?", "About A", "Yes")
+        second = prompter.superforecaster("Will B?", "About B", "No")
+        self.assertEqual(first[0].content, second[0].content)
+        self.assertNotIn("Will A?", first[0].content)
+        self.assertIn("Will A?", first[1].content)
+
+        trade_a = prompter.one_best_trade("likely", ["Yes", "No"], "[0.1, 0.9]")
+        trade_b = prompter.one_best_trade("unlikely", ["Yes", "No"], "[0.5, 0.5]")
+        self.assertEqual(trade_a[0].content, trade_b[0].content)
+
+    def test_cache_control_breakpoint(self):
+        (system, _) = Prompter(cache_control=True).superforecaster("Q", "D", "Yes")
+        self.assertEqual(system.content[0]["cache_control"], {"type": "ephemeral"})
+        # the scripted model still matches on the text part
+        self.assertIn("0.62", ScriptedChatModel().invoke([system]).content)
+
+    def test_supported_providers(self):
+        with mock.patch.dict(os.environ, {"PROMPT_CACHE_CONTROL": ""}):
+            self.assertTrue(
+                supports_cache_control(
+                    LLMProvider.OPENROUTER, "anthropic/claude-3.5-sonnet"
+                )
+            )
+            self.assertFalse(supports_cache_control(LLMProvider.OPENAI, "gpt-4o"))
+        with mock.patch.dict(os.environ, {"PROMPT_CACHE_CONTROL": "false"}):
+            self.assertFalse(
+                supports_cache_control(
+                    LLMProvider.OPENROUTER, "anthropic/claude-3.5-sonnet"
+                )
+            )
+
+
+class TestPromptCacheMeter(unittest.TestCase):
+    def test_usage_tokens_from_raw_token_usage(self):
+        message = AIMessage(
+            content="x",
+            usage_metadata={"input_tokens": 50, "output_tokens": 1, "total_tokens": 51},
+            response_metadata={
+                "token_usage": {"prompt_tokens_details": {"cached_tokens": 20}}
+            },
+        )
+        self.assertEqual(usage_tokens(message), (50, 20, 0))
+
+    def test_cached_ratio_per_call_site(self):
+        stats = PromptCacheStats()
+        llm = PromptCacheMeter(CachedUsageModel(), stats)
+        llm.invoke("hi", config={"run_name": "get_superforecast"})
+        llm.invoke("hi", config={"run_name": "get_superforecast"})
+        report = stats.stats()["get_superforecast"]
+        self.assertEqual(report["calls"], 2)
+        self.assertEqual(report["cached_tokens"], 1600)
+        self.assertAlmostEqual(report["cached_ratio"], 0.8)
+
+    def test_streams_are_metered(self):
+        stats = PromptCacheStats()
+        llm = PromptCacheMeter(CachedUsageModel(), stats)
+        text = "".join(
+            chunk.content
+            for chunk in llm.stream("hi", config={"run_name": "get_llm_response"})
+        )
+
+        async def stream_async():
+            async for _ in llm.astream("hi", config={"run_name": "get_llm_response"}):
+                pass
+
+        asyncio.run(stream_async())
+        self.assertTrue(text)
+        report = stats.stats()["get_llm_response"]
+        self.assertEqual(report["calls"], 2)
+        self.assertEqual(report["input_tokens"], 2000)
+        self.assertEqual(report["cached_tokens"], 1600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import threading
+import time
+import unittest
+
+from agents.llm.local import HashingEmbeddings, ScriptedChatModel
+from agents.llm.ratelimit import (
+    Priority,
+    ProviderRateLimiter,
+    RateLimitedChatModel,
+    RateLimitedEmbeddings,
+    TokenBucket,
+    request_priority,
+)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_wait_after_capacity_is_spent(self):
+        bucket = TokenBucket(60)
+        now = bucket.updated
+        self.assertEqual(bucket.time_until(60, now), 0.0)
+        bucket.consume(60)
+        # refills one token per second
+        self.assertAlmostEqual(bucket.time_until(1, now), 1.0, places=3)
+        self.assertAlmostEqual(bucket.time_until(1, now + 0.5), 0.5, places=3)
+
+    def test_oversized_request_is_capped_at_capacity(self):
+        bucket = TokenBucket(60)
+        self.assertEqual(bucket.time_until(1000, bucket.updated), 0.0)
+
+
+class TestProviderRateLimiter(unittest.TestCase):
+    def test_requests_per_minute_throttle(self):
+        limiter = ProviderRateLimiter("test", rpm=600)
+        limiter.request_bucket.tokens = 1
+        limiter.acquire()
+        waited = limiter.acquire()
+        self.assertGreater(waited, 0.05)
+        self.assertEqual(limiter.metrics()["admitted"]["batch"], 2)
+
+    def test_interactive_requests_are_admitted_first(self):
+        limiter = ProviderRateLimiter("test", rpm=1200)
+        limiter.request_bucket.tokens = 0
+        order = []
+
+        def worker(label, priority):
+            limiter.acquire(priority=priority)
+            order.append(label)
+
+        threads = [
+            threading.Thread(target=worker, args=(f"batch-{i}", Priority.BATCH))
+            for i in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.01)
+        interactive = threading.Thread(
+            target=worker, args=("interactive", Priority.INTERACTIVE)
+        )
+        interactive.start()
+        for thread in threads + [interactive]:
+            thread.join(timeout=5)
+
+        # the first batch request may already hold the head of the queue
+        self.assertIn("interactive", order[:2])
+        self.assertEqual(limiter.metrics()["queue_depth"], 0)
+
+
+class TestRateLimitedClients(unittest.TestCase):
+    def test_chat_model_uses_context_priority(self):
+        limiter = ProviderRateLimiter("test", rpm=1000, tpm=100000)
+        llm = RateLimitedChatModel(ScriptedChatModel(), limiter, "gpt-4o")
+        with request_priority(Priority.INTERACTIVE):
+            llm.invoke("hello")
+        llm.invoke("hello")
+        admitted = limiter.metrics()["admitted"]
+        self.assertEqual(admitted, {"interactive": 1, "batch": 1})
+        self.assertEqual(llm.model_name, "scripted")
+
+    def test_embeddings_are_charged_tokens(self):
+        limiter = ProviderRateLimiter("test", tpm=100000)
+        embeddings = RateLimitedEmbeddings(HashingEmbeddings(dimensions=8), limiter)
+        vectors = embeddings.embed_documents(["one two three", "four five"])
+        self.assertEqual(len(vectors), 2)
+        self.assertLess(limiter.token_bucket.tokens, 100000)
+        self.assertEqual(embeddings.dimensions, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
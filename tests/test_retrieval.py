@@ -0,0 +1,244 @@
+import json
+import os
+import tempfile
+import unittest
+
+from langchain_core.documents import Document
+
+import numpy as np
+
+from agents.connectors import chroma
+from agents.connectors.chroma import PolymarketRAG
+from agents.connectors.retrieval import (
+    BM25Index,
+    HybridRetriever,
+    MetadataFilter,
+    VectorIndex,
+)
+
+
+class KeywordEmbeddings:
+    """Tiny deterministic embedding: one dimension per vocabulary word."""
+
+    vocabulary = ["election", "bitcoin", "football", "rates"]
+
+    def embed_documents(self, texts):
+        self.calls = getattr(self, "calls", 0) + 1
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        text = text.lower()
+        return [float(text.count(word)) + 0.01 for word in self.vocabulary]
+
+
+def make_documents():
+    return [
+        Document(
+            page_content="Who wins the election in November?",
+            metadata={"id": 1, "active": True, "spread": 0.02, "liquidity": 5000},
+        ),
+        Document(
+            page_content="Will bitcoin close above 100k?",
+            metadata={"id": 2, "active": True, "spread": 0.01, "liquidity": 20},
+        ),
+        Document(
+            page_content="Election turnout above 60%?",
+            metadata={"id": 3, "active": False, "spread": 0.02, "liquidity": 9000},
+        ),
+        Document(
+            page_content="Football final winner",
+            metadata={"id": 4, "active": True, "spread": 0.5},
+        ),
+    ]
+
+
+class TestBM25Index(unittest.TestCase):
+    def test_matching_documents_score_higher(self):
+        index = BM25Index(["bitcoin price", "election results", "bitcoin bitcoin"])
+        scores = index.scores("bitcoin")
+        self.assertEqual(scores[1], 0)
+        self.assertGreater(scores[2], scores[0])
+
+    def test_scores_restricted_to_candidates(self):
+        index = BM25Index(["bitcoin price", "bitcoin results"])
+        scores = index.scores("bitcoin", candidates=[1])
+        self.assertEqual(scores[0], 0)
+        self.assertGreater(scores[1], 0)
+
+
+class TestMetadataFilter(unittest.TestCase):
+    def test_predicates(self):
+        metadata_filter = MetadataFilter(min_liquidity=100, max_spread=0.1)
+        self.assertTrue(metadata_filter.matches({"active": True, "liquidity": 500}))
+        self.assertFalse(metadata_filter.matches({"active": False}))
+        self.assertFalse(metadata_filter.matches({"liquidity": "50"}))
+        self.assertFalse(metadata_filter.matches({"spread": 0.3}))
+        # missing fields do not exclude a document
+        self.assertTrue(metadata_filter.matches({}))
+
+    def test_end_date_window(self):
+        metadata_filter = MetadataFilter(max_days_to_end=30)
+        self.assertFalse(metadata_filter.matches({"end": "2999-01-01T00:00:00Z"}))
+        self.assertTrue(metadata_filter.matches({"end": "not a date"}))
+
+
+class TestHybridRetriever(unittest.TestCase):
+    def test_filters_before_ranking(self):
+        embeddings = KeywordEmbeddings()
+        retriever = HybridRetriever(make_documents(), embeddings)
+        results = retriever.search(
+            "election", k=2, metadata_filter=MetadataFilter(max_spread=0.1)
+        )
+        ids = [document.metadata["id"] for document, _ in results]
+        self.assertEqual(ids, [1, 2])
+        self.assertGreaterEqual(results[0][1], results[1][1])
+
+    def test_embeddings_cached_between_queries(self):
+        embeddings = KeywordEmbeddings()
+        retriever = HybridRetriever(make_documents(), embeddings)
+        retriever.search("election", k=1)
+        retriever.search("bitcoin", k=1)
+        self.assertEqual(embeddings.calls, 1)
+
+    def test_no_results_for_k_zero(self):
+        retriever = HybridRetriever(make_documents(), KeywordEmbeddings())
+        self.assertEqual(retriever.search("election", k=0), [])
+        self.assertEqual(retriever.search("election", k=-1), [])
+
+    def test_quantized_vectors_rank_like_float32(self):
+        metadata_filter = MetadataFilter(max_spread=0.1)
+        expected = HybridRetriever(make_documents(), KeywordEmbeddings())
+        retriever = HybridRetriever(
+            make_documents(), KeywordEmbeddings(), precision="int8"
+        )
+        for query in ["election", "bitcoin"]:
+            # the second query embeds the documents the filter kept out
+            for candidates in [metadata_filter, None]:
+                self.assertEqual(
+                    retriever.search(query, k=2, metadata_filter=candidates),
+                    expected.search(query, k=2, metadata_filter=candidates),
+                )
+        self.assertEqual(retriever.index.vectors.dtype, np.int8)
+        self.assertEqual(len(retriever.index), 4)
+        self.assertEqual(retriever.index.full_precision.shape, (4, 4))
+
+
+def make_events(titles):
+    return [
+        {"id": i, "title": title, "description": title, "markets": str(i)}
+        for i, title in enumerate(titles)
+    ]
+
+
+class TestPolymarketRAGHybrid(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        chroma._retrievers.clear()
+
+    def tearDown(self):
+        chroma._retrievers.clear()
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_hybrid_search_writes_the_snapshot(self):
+        rag = PolymarketRAG(
+            embedding_function=KeywordEmbeddings(), write_snapshots=True
+        )
+        events = make_events(["Election winner", "Bitcoin above 100k"])
+        results = rag.events(events, "election", k=1, hybrid=True)
+        self.assertEqual(results[0][0].metadata["title"], "Election winner")
+        # wait for the background writer
+        chroma.shared_pool("rag-snapshot", 1).submit(lambda: None).result()
+        with open("local_db_events/events.json") as f:
+            self.assertEqual(json.load(f), events)
+
+    def test_retriever_reused_for_unchanged_documents(self):
+        embeddings = KeywordEmbeddings()
+        events = make_events(["Election winner", "Bitcoin above 100k"])
+        PolymarketRAG(embedding_function=embeddings).events(
+            events, "election", hybrid=True
+        )
+        # a new instance, as each Executor builds, reuses the embedded vectors
+        PolymarketRAG(embedding_function=embeddings).events(
+            events, "bitcoin", hybrid=True
+        )
+        self.assertEqual(embeddings.calls, 1)
+        self.assertFalse(os.path.exists("local_db_events"))
+
+        changed = make_events(["Election winner", "Football final"])
+        PolymarketRAG(embedding_function=embeddings).events(
+            changed, "election", hybrid=True
+        )
+        self.assertEqual(embeddings.calls, 2)
+
+
+class QueryPrefixEmbeddings(KeywordEmbeddings):
+    """Embeds queries in a different space, like instruction-tuned models."""
+
+    def embed_documents(self, texts):
+        return [KeywordEmbeddings.embed_query(self, text) for text in texts]
+
+    def embed_query(self, text):
+        return super().embed_query(f"bitcoin bitcoin bitcoin {text}")
+
+
+class TestBatchQuery(unittest.TestCase):
+    def test_queries_use_the_query_embedding(self):
+        with tempfile.TemporaryDirectory() as directory:
+            rag = PolymarketRAG(embedding_function=QueryPrefixEmbeddings())
+            rag.build_vector_db(make_documents(), persist_directory=directory)
+            results = rag.batch_query_local_markets_rag(
+                directory, ["football", "election"], k=1
+            )
+        # the query transform pulls both towards bitcoin
+        self.assertEqual([row[0][0].metadata["id"] for row in results], [2, 2])
+
+
+class TestVectorIndex(unittest.TestCase):
+    def test_search_batch_matches_single_queries(self):
+        rng = np.random.default_rng(0)
+        index = VectorIndex(rng.normal(size=(50, 8)))
+        queries = rng.normal(size=(5, 8))
+        indices, scores = index.search_batch(queries, k=3)
+        self.assertEqual(indices.shape, (5, 3))
+        for query, row, row_scores in zip(queries, indices, scores):
+            single_indices, single_scores = index.search_batch([query], k=3)
+            np.testing.assert_array_equal(row, single_indices[0])
+            self.assertTrue(np.all(np.diff(row_scores) <= 0))
+
+    def test_add_appends_rows(self):
+        rng = np.random.default_rng(2)
+        vectors = rng.normal(size=(30, 8))
+        index = VectorIndex(vectors[:20], precision="int8")
+        self.assertEqual(index.add(vectors[20:]), range(20, 30))
+        expected, _ = VectorIndex(vectors, precision="int8").search_batch(
+            vectors[25:], k=1
+        )
+        actual, _ = index.search_batch(vectors[25:], k=1)
+        np.testing.assert_array_equal(actual, expected)
+        np.testing.assert_array_equal(actual[:, 0], np.arange(25, 30))
+
+    def test_quantized_precisions_keep_ranking(self):
+        rng = np.random.default_rng(1)
+        vectors = rng.normal(size=(200, 32))
+        queries = vectors[:10] + rng.normal(scale=0.05, size=(10, 32))
+        for precision in ("float16", "int8"):
+            index = VectorIndex(vectors, precision=precision)
+            indices, scores = index.search_batch(queries, k=1)
+            self.assertEqual(indices[:, 0].tolist(), list(range(10)))
+            self.assertLess(index.nbytes, VectorIndex(vectors).nbytes)
+
+    def test_unknown_precision(self):
+        with self.assertRaises(ValueError):
+            VectorIndex([[1.0]], precision="int4")
+
+    def test_k_larger_than_index(self):
+        index = VectorIndex([[1.0, 0.0], [0.0, 1.0]])
+        indices, _ = index.search_batch([[1.0, 0.0]], k=10)
+        self.assertEqual(indices.tolist(), [[0, 1]])
+
+
+if __name__ == "__main__":
+    unittest.main()
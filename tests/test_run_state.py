@@ -0,0 +1,139 @@
+import tempfile
+import time
+import unittest
+
+from agents.application.pipeline import Pipeline, Stage
+from agents.application.run_state import RunStateStore
+
+
+class TestRunStateStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = RunStateStore(root=self.tmp.name, max_age=60)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_save_load(self):
+        run_id = self.store.new_run_id("trade")
+        self.assertIsNone(self.store.load(run_id, "events"))
+        self.store.save(run_id, "events", [{"id": 1}, ("doc", 0.5)])
+        self.assertEqual(self.store.load(run_id, "events"), [{"id": 1}, ("doc", 0.5)])
+        self.assertEqual(self.store.completed_stages(run_id), {"events": 2})
+        self.store.discard(run_id, "events")
+        self.assertIsNone(self.store.load(run_id, "events"))
+
+    def test_latest_unfinished(self):
+        self.assertIsNone(self.store.latest_unfinished("trade"))
+        first = self.store.new_run_id("trade")
+        time.sleep(0.01)
+        second = self.store.new_run_id("trade")
+        self.store.new_run_id("create")
+        # runs left behind, as by calls that stopped
+        for run_id in (first, second):
+            self.store.release(run_id)
+        self.assertEqual(self.store.latest_unfinished("trade"), second)
+        self.store.finish(second)
+        self.store.release(second)
+        self.assertEqual(self.store.latest_unfinished("trade"), first)
+
+        self.store.max_age = 0
+        self.store.release(first)
+        self.assertIsNone(self.store.latest_unfinished("trade"))
+        self.store.prune()
+        self.assertIsNone(self.store.manifest(first))
+
+    def test_runs_in_progress_are_not_resumed_elsewhere(self):
+        # a second store stands in for another process on the same directory
+        other = RunStateStore(root=self.tmp.name, max_age=60)
+        run_id = self.store.new_run_id("trade")
+        self.assertIsNone(other.latest_unfinished("trade"))
+        with self.assertRaises(RuntimeError):
+            other.start("trade", run_id)
+        self.assertNotEqual(other.start("trade"), run_id)
+        other.max_age = 0
+        other.prune()
+        self.assertIsNotNone(self.store.manifest(run_id))
+
+        # once the first process lets go, its run can be resumed
+        self.store.release(run_id)
+        third = RunStateStore(root=self.tmp.name, max_age=60)
+        self.assertEqual(third.latest_unfinished("trade"), run_id)
+
+    def test_concurrent_calls_in_one_process_get_different_runs(self):
+        run_id = self.store.new_run_id("trade")
+        self.store.release(run_id)
+        # two requests on the server's one Trader
+        self.assertEqual(self.store.start("trade"), run_id)
+        self.assertNotEqual(self.store.start("trade"), run_id)
+        with self.assertRaises(RuntimeError):
+            self.store.start("trade", run_id)
+        self.store.release(run_id)
+        self.assertEqual(self.store.start("trade", run_id), run_id)
+
+
+class TestResume(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = RunStateStore(root=self.tmp.name, max_age=60)
+        self.calls = {"fetch": 0, "filter": 0, "score": 0}
+        self.fail_score = True
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def pipeline(self):
+        def fetch(_):
+            self.calls["fetch"] += 1
+            return [3, 1, 2]
+
+        def keep_top(values):
+            self.calls["filter"] += 1
+            return sorted(values)[-2:]
+
+        def score(value):
+            self.calls["score"] += 1
+            if self.fail_score:
+                raise TimeoutError("LLM timed out")
+            return value * 10
+
+        return Pipeline(
+            [
+                Stage("fetch", fetch, mode="flat_map"),
+                Stage("keep_top", keep_top, mode="batch"),
+                Stage("score", score),
+            ],
+            retries=1,
+            backoff=0,
+            store=self.store,
+        )
+
+    def test_resumes_from_last_good_stage(self):
+        run_id = self.store.new_run_id("test")
+        with self.assertRaises(TimeoutError):
+            self.pipeline().run_sync(run_id=run_id)
+        # the first item was tried twice, the stages before were checkpointed
+        self.assertEqual(self.calls, {"fetch": 1, "filter": 1, "score": 2})
+        self.assertEqual(
+            self.store.completed_stages(run_id), {"fetch": 3, "keep_top": 2}
+        )
+
+        self.fail_score = False
+        pipeline = self.pipeline()
+        self.assertEqual(sorted(pipeline.run_sync(run_id=run_id)), [20, 30])
+        self.assertEqual(self.calls, {"fetch": 1, "filter": 1, "score": 4})
+        self.assertTrue(pipeline.stats["keep_top"].resumed)
+        self.assertEqual(pipeline.stats["fetch"].emitted, 3)
+
+        # a finished run returns its checkpointed outputs without running
+        self.assertEqual(sorted(self.pipeline().run_sync(run_id=run_id)), [20, 30])
+        self.assertEqual(self.calls["score"], 4)
+
+    def test_without_run_id_nothing_is_saved(self):
+        self.fail_score = False
+        self.assertEqual(sorted(self.pipeline().run_sync()), [20, 30])
+        self.assertIsNone(self.store.latest_unfinished("test"))
+
+
+if __name__ == "__main__":
+    unittest.main()
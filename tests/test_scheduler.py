@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from datetime import datetime
+
+from agents.application.cron import Scheduler, seconds_until_weekday
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = Scheduler(max_workers=2)
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_runs_periodically(self):
+        runs = []
+        job = self.scheduler.every(0.05, lambda: runs.append(time.monotonic()))
+        self.scheduler.start_background()
+        time.sleep(0.28)
+        self.assertGreaterEqual(len(runs), 4)
+        self.assertLessEqual(len(runs), 7)
+        self.assertEqual(job.failures, 0)
+        # the loop sleeps until the next due job instead of polling
+        self.assertLess(self.scheduler.wakeups, 3 * len(runs))
+
+    def test_new_job_wakes_idle_scheduler(self):
+        self.scheduler.start_background()
+        time.sleep(0.05)
+        ran = threading.Event()
+        self.scheduler.every(60, ran.set)
+        self.assertTrue(ran.wait(1))
+
+    def test_no_overlap_with_previous_run(self):
+        release = threading.Event()
+        active = []
+        overlaps = []
+
+        def slow():
+            overlaps.append(len(active))
+            active.append(1)
+            release.wait(1)
+            active.pop()
+
+        job = self.scheduler.every(0.02, slow, name="slow")
+        self.scheduler.start_background()
+        time.sleep(0.15)
+        release.set()
+        time.sleep(0.05)
+        self.assertEqual(set(overlaps), {0})
+        self.assertGreater(job.skipped_overlap, 0)
+
+    def test_missed_runs_are_counted_not_caught_up(self):
+        runs = []
+        job = self.scheduler.every(0.1, lambda: runs.append(1), delay=-0.35)
+        self.scheduler.run_pending()
+        dispatched = time.monotonic()
+        # the next run is back on the original schedule
+        self.assertGreater(job.scheduled, dispatched)
+        self.assertLess(job.scheduled - dispatched, 0.1)
+        time.sleep(0.02)
+        self.assertEqual(job.missed, 3)
+        self.assertEqual(len(runs), 1)
+
+    def test_failures_are_recorded(self):
+        def fail():
+            raise RuntimeError("gamma unavailable")
+
+        job = self.scheduler.every(60, fail, name="fail")
+        self.scheduler.run_pending()
+        time.sleep(0.05)
+        self.assertEqual(job.failures, 1)
+        self.assertFalse(job.running)
+        self.assertEqual(job.last_error, "RuntimeError: gamma unavailable")
+        self.assertEqual(self.scheduler.stats()["fail"]["runs"], 1)
+
+    def test_jitter_delays_within_bound(self):
+        job = self.scheduler.every(10, lambda: None, jitter=0.5, delay=1)
+        ((due, _, _),) = self.scheduler._heap
+        self.assertGreaterEqual(due, job.scheduled)
+        self.assertLessEqual(due, job.scheduled + 0.5)
+
+    def test_duplicate_names_rejected(self):
+        self.scheduler.every(1, lambda: None, name="sync")
+        with self.assertRaises(ValueError):
+            self.scheduler.every(1, lambda: None, name="sync")
+
+    def test_seconds_until_weekday(self):
+        # a Wednesday
+        now = datetime(2026, 10, 14, 12, 0)
+        self.assertEqual(seconds_until_weekday(0, now=now), (4 * 24 + 12) * 3600)
+        self.assertEqual(seconds_until_weekday(2, hour=13, now=now), 3600)
+        self.assertEqual(seconds_until_weekday(2, hour=12, now=now), 7 * 24 * 3600)
+
+
+if __name__ == "__main__":
+    unittest.main()
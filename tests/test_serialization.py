@@ -0,0 +1,97 @@
+import json
+import os
+import unittest
+from unittest import mock
+
+from langchain_core.documents import Document
+
+from agents.application.prompts import Prompter
+from agents.utils.serialization import (
+    project_documents,
+    project_events,
+    project_markets,
+    render,
+    to_table,
+)
+
+MARKET = {
+    "id": "12",
+    "question": "Will it rain?",
+    "outcomes": '["Yes", "No"]',
+    "outcomePrices": '["0.25", "0.75"]',
+    "image": "https://example.com/rain.png",
+    "icon": "https://example.com/icon.png",
+    "createdAt": "2024-01-01T00:00:00Z",
+    "spread": 0.02,
+}
+EVENT = {
+    "id": "3",
+    "title": "Weather",
+    "image": "https://example.com/weather.png",
+    "markets": [MARKET],
+}
+
+
+class TestProjection(unittest.TestCase):
+    def test_markets_drop_unlisted_fields_and_decode_lists(self):
+        (market,) = project_markets([MARKET])
+        self.assertNotIn("image", market)
+        self.assertNotIn("createdAt", market)
+        self.assertEqual(market["outcomes"], ["Yes", "No"])
+
+    def test_nested_event_markets_are_projected(self):
+        (event,) = project_events([EVENT])
+        self.assertEqual(
+            event["markets"],
+            [
+                {
+                    "question": "Will it rain?",
+                    "outcomes": ["Yes", "No"],
+                    "outcomePrices": ["0.25", "0.75"],
+                }
+            ],
+        )
+
+    def test_field_set_from_env(self):
+        with mock.patch.dict(os.environ, {"PROMPT_MARKET_FIELDS": "question"}):
+            self.assertEqual(project_markets([MARKET]), [{"question": "Will it rain?"}])
+
+    def test_documents(self):
+        document = Document(
+            page_content="Rules", metadata={"question": "Q?", "seq_num": 1}
+        )
+        self.assertEqual(
+            project_documents([(document, 0.1)]),
+            [{"question": "Q?", "description": "Rules"}],
+        )
+
+
+class TestRender(unittest.TestCase):
+    def test_table(self):
+        table = to_table(project_markets([MARKET]))
+        self.assertEqual(
+            table.splitlines(),
+            [
+                "id|question|outcomes|outcomePrices|spread",
+                "12|Will it rain?|Yes/No|0.25/0.75|0.02",
+            ],
+        )
+
+    def test_formats(self):
+        records = project_markets([MARKET])
+        self.assertEqual(json.loads(render(records, "json")), records)
+        self.assertEqual(render(records, "repr"), str(records))
+        self.assertEqual(render("already text", "table"), "already text")
+
+    def test_compact_prompt_is_smaller(self):
+        prompter = Prompter()
+        raw = prompter.prompts_polymarket(data1=str([EVENT]), data2=str([MARKET]))
+        compact = prompter.prompts_polymarket(
+            data1=project_events([EVENT]), data2=project_markets([MARKET])
+        )
+        self.assertLess(len(compact), len(raw) * 0.6)
+        self.assertIn("Will it rain?", compact)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+import threading
+import time
+import unittest
+
+from agents.application import shared_results
+from agents.application.pipeline import Pipeline, Stage
+from agents.application.shared_results import SharedResults, configure
+from fakes import event_result, fake_creator, fake_executor, fake_trader, market_result
+
+
+class Counter:
+    def __init__(self, delay=0.0, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def __call__(self, _):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return ["a", "b", "c"]
+
+
+def shared_pipeline(shared, fetch, key="selection"):
+    return Pipeline(
+        [
+            Stage("fetch", fetch, mode="flat_map"),
+            Stage("filter", lambda items: items[:2], mode="batch", shared=True),
+            Stage("use", str.upper),
+        ],
+        shared=shared,
+        share_key=key,
+    )
+
+
+class TestSharedResults(unittest.TestCase):
+    def test_second_run_starts_after_the_shared_stage(self):
+        shared = SharedResults(max_age=60)
+        fetch = Counter()
+        self.assertEqual(shared_pipeline(shared, fetch).run_sync(), ["A", "B"])
+
+        pipeline = shared_pipeline(shared, fetch)
+        self.assertEqual(pipeline.run_sync(), ["A", "B"])
+        self.assertEqual(fetch.calls, 1)
+        self.assertTrue(pipeline.stats["fetch"].shared)
+        self.assertEqual(pipeline.stats["fetch"].emitted, 3)
+        self.assertEqual(pipeline.stats["filter"].emitted, 2)
+        self.assertFalse(pipeline.stats["use"].shared)
+
+        # another key, or a result past its age, is computed again
+        shared_pipeline(shared, fetch, key="other").run_sync()
+        self.assertEqual(fetch.calls, 2)
+        shared.max_age = 0
+        shared_pipeline(shared, fetch).run_sync()
+        self.assertEqual(fetch.calls, 3)
+
+    def test_concurrent_runs_compute_once(self):
+        shared = SharedResults(max_age=60)
+        fetch = Counter(delay=0.2)
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(shared_pipeline(shared, fetch).run_sync())
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [["A", "B"]] * 4)
+        self.assertEqual(fetch.calls, 1)
+        self.assertEqual(shared.stats()["misses"], 1)
+        self.assertEqual(shared.stats()["waits"], 3)
+
+    def test_failed_run_hands_over(self):
+        shared = SharedResults(max_age=60)
+        failing = Counter(delay=0.1, fail=True)
+        working = Counter()
+        errors = []
+
+        def first():
+            try:
+                shared_pipeline(shared, failing).run_sync()
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=first)
+        thread.start()
+        time.sleep(0.05)
+        # waits for the failing run, then computes itself
+        self.assertEqual(shared_pipeline(shared, working).run_sync(), ["A", "B"])
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(working.calls, 1)
+
+    def test_stuck_run_is_taken_over(self):
+        shared = SharedResults(max_age=60, wait_timeout=0.1)
+        # a run that claimed the selection and then hung
+        self.assertIsNone(shared.claim("selection"))
+        fetch = Counter()
+        started = time.perf_counter()
+        self.assertEqual(shared_pipeline(shared, fetch).run_sync(), ["A", "B"])
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(fetch.calls, 1)
+        self.assertEqual(shared.stats()["takeovers"], 1)
+        # the taker's result is shared from then on
+        self.assertEqual(shared.claim("selection").counts["filter"], 2)
+
+
+class TestTraderAndCreatorShare(unittest.TestCase):
+    def setUp(self):
+        configure(60)
+        executor = fake_executor(market_fetch_concurrency=2)
+        self.filtered = 0
+
+        def filter_markets(markets):
+            self.filtered += 1
+            return [market_result(f"Market {market}") for market in sorted(markets)]
+
+        executor.filter_events_with_rag = lambda events: [event_result("1,2")]
+        executor.filter_markets = filter_markets
+        self.executor = executor
+
+    def tearDown(self):
+        shared_results._shared = None
+        shared_results._configured = False
+
+    def test_recommendation_and_creator_reuse_the_trade_selection(self):
+        trader = fake_trader(self.executor)
+        ((forecast, market),) = trader.build_pipeline().run_sync()
+        self.assertEqual(market[0].metadata["question"], "Market 1")
+
+        stats, filtered_markets = self.executor.select_markets()
+        self.assertEqual(len(filtered_markets), 2)
+        self.assertEqual(stats["markets"].emitted, 2)
+        self.assertTrue(stats["filtered_markets"].shared)
+
+        creator = fake_creator(self.executor)
+        self.executor.source_best_market_to_create = lambda markets: len(markets)
+        self.assertEqual(creator.build_pipeline().run_sync(), [2])
+        self.assertEqual(self.filtered, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import json
+import os
+import socket
+import threading
+import time
+import unittest
+from unittest import mock
+
+import uvicorn
+from fastapi.testclient import TestClient
+
+from agents.polymarket.standin import StandInConfig, create_app, synthetic_fixtures
+
+
+class TestStandInServer(unittest.TestCase):
+    def setUp(self):
+        self.fixtures = synthetic_fixtures(markets=50, markets_per_event=5, seed=1)
+        self.client = TestClient(create_app(self.fixtures, seed=1))
+        self.token_id = json.loads(self.fixtures.markets[0]["clobTokenIds"])[0]
+
+    def test_gamma_paging_and_filters(self):
+        page = self.client.get("/gamma/markets", params={"limit": 20, "offset": 40})
+        self.assertEqual(
+            [m["id"] for m in page.json()], [str(1000040 + i) for i in range(10)]
+        )
+        self.assertEqual(
+            self.client.get("/gamma/markets", params={"closed": "true"}).json(), []
+        )
+        by_token = self.client.get(
+            "/gamma/markets", params={"clob_token_ids": self.token_id}
+        )
+        self.assertEqual([m["id"] for m in by_token.json()], ["1000000"])
+        self.assertEqual(len(self.client.get("/gamma/events").json()), 10)
+        self.assertEqual(self.client.get("/gamma/markets/0").status_code, 404)
+
+    def test_clob_book_and_prices(self):
+        book = self.client.get("/clob/book", params={"token_id": self.token_id}).json()
+        best_ask = min(float(level["price"]) for level in book["asks"])
+        best_bid = max(float(level["price"]) for level in book["bids"])
+        self.assertLess(best_bid, best_ask)
+        price = self.client.get(
+            "/clob/price", params={"token_id": self.token_id, "side": "BUY"}
+        )
+        self.assertEqual(float(price.json()["price"]), best_ask)
+        history = self.client.get(
+            "/clob/prices-history", params={"market": self.token_id}
+        )
+        self.assertEqual(len(history.json()["history"]), 100)
+        self.assertEqual(
+            self.client.get("/clob/book", params={"token_id": "0"}).status_code, 404
+        )
+
+    def test_rpc_usdc_balance(self):
+        call = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "eth_call",
+            "params": [{"to": "0x0", "data": "0x70a08231" + "0" * 64}, "latest"],
+        }
+        result = self.client.post("/rpc", json=call).json()["result"]
+        self.assertEqual(int(result, 16), 1000 * 10**6)
+
+    def test_injected_errors_and_stats(self):
+        self.client.post("/_standin/config", json={"error_rate": 1.0})
+        self.assertEqual(self.client.get("/gamma/markets").status_code, 503)
+        self.client.post("/_standin/config", json={"latency": 0.05})
+        started = time.perf_counter()
+        self.assertEqual(self.client.get("/gamma/events").status_code, 200)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+        stats = self.client.get("/_standin/stats").json()
+        self.assertEqual(stats["routes"]["gamma/markets"], {"requests": 1, "errors": 1})
+        self.assertEqual(stats["routes"]["gamma/events"], {"requests": 1, "errors": 0})
+
+
+class TestClientsAgainstStandIn(unittest.TestCase):
+    def test_constructors_take_base_urls(self):
+        from agents.polymarket.gamma import GammaMarketClient
+
+        self.assertEqual(
+            GammaMarketClient("http://localhost:8090/gamma/").gamma_markets_endpoint,
+            "http://localhost:8090/gamma/markets",
+        )
+        with mock.patch.dict(os.environ, {"GAMMA_API_URL": "http://standin/gamma"}):
+            self.assertEqual(
+                GammaMarketClient().gamma_events_endpoint, "http://standin/gamma/events"
+            )
+
+    def test_polymarket_end_to_end(self):
+        from agents.polymarket.gamma import GammaMarketClient
+        from agents.polymarket.polymarket import Polymarket
+
+        fixtures = synthetic_fixtures(markets=120, seed=2)
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        server = uvicorn.Server(
+            uvicorn.Config(create_app(fixtures), port=port, log_level="warning")
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        root = f"http://127.0.0.1:{port}"
+        try:
+            with mock.patch.dict(
+                os.environ,
+                {
+                    "GAMMA_API_URL": f"{root}/gamma",
+                    "CLOB_API_URL": f"{root}/clob",
+                    "POLYGON_RPC_URL": f"{root}/rpc",
+                    "POLYGON_WALLET_PRIVATE_KEY": "0x" + "11" * 32,
+                },
+            ):
+                markets = GammaMarketClient().get_all_current_markets(limit=50)
+                polymarket = Polymarket()
+                balance = polymarket.get_usdc_balance()
+                token_id = json.loads(markets[0]["clobTokenIds"])[0]
+                book = polymarket.get_orderbook(token_id)
+        finally:
+            server.should_exit = True
+            thread.join()
+        self.assertEqual(len(markets), 120)
+        self.assertEqual(balance, 1000.0)
+        self.assertEqual(
+            [level.price for level in book.asks],
+            [level["price"] for level in fixtures.orderbooks[token_id]["asks"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,216 @@
+import math
+import unittest
+
+import numpy as np
+from langchain_core.documents import Document
+
+from agents.application.snapshot import (
+    MarketSnapshot,
+    SharedSnapshot,
+    attach,
+    build_snapshot,
+)
+from agents.application.strategies import (
+    LiquidityScreen,
+    SimilarityScreen,
+    Strategy,
+    StrategyRunner,
+)
+from agents.utils.objects import SimpleEvent
+from fakes import FakeGamma, FakePolymarket, fake_creator, fake_executor, gamma_market
+
+
+def simple_event(event_id, market_ids):
+    return SimpleEvent(
+        id=event_id,
+        ticker=f"event-{event_id}",
+        slug=f"event-{event_id}",
+        title=f"Event {event_id}",
+        description="",
+        end="2026-12-31T00:00:00Z",
+        active=True,
+        closed=False,
+        archived=False,
+        restricted=False,
+        new=False,
+        featured=False,
+        markets=",".join(market_ids),
+    )
+
+
+def orderbook(token_id):
+    if token_id.startswith("b"):
+        raise RuntimeError("book unavailable")
+    return {
+        "bids": [{"price": "0.41"}, {"price": "0.44"}],
+        "asks": [{"price": "0.46"}],
+    }
+
+
+def fake_polymarket():
+    return FakePolymarket(
+        events=[simple_event(1, ["a", "b"]), simple_event(2, ["z"])],
+        orderbook=orderbook,
+    )
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[1.0, 0.0] if "a happen" in text else [0.0, 1.0] for text in texts]
+
+
+class Failing(Strategy):
+    name = "failing"
+
+    def run(self, snapshot):
+        raise RuntimeError("bad strategy")
+
+
+MARKETS = [
+    gamma_market("a", 0.45, 5000),
+    gamma_market("b", 0.5, 9000),
+    gamma_market("c", 0.98, 20000),
+    gamma_market("d", 0.3, 100, spread=0.2),
+]
+
+
+class TestSnapshot(unittest.TestCase):
+    def test_build_snapshot(self):
+        snapshot = build_snapshot(
+            FakeGamma(MARKETS),
+            polymarket=fake_polymarket(),
+            embeddings=FakeEmbeddings(),
+            books=True,
+        )
+        self.assertEqual(len(snapshot), 4)
+        np.testing.assert_allclose(snapshot["price_yes"], [0.45, 0.5, 0.98, 0.3])
+        self.assertEqual(snapshot["best_bid"][0], 0.44)
+        self.assertEqual(snapshot["best_ask"][0], 0.46)
+        # a failing book read leaves the market in with no book prices
+        self.assertTrue(math.isnan(snapshot["best_bid"][1]))
+        self.assertEqual(snapshot.records[0]["clob_token_ids"], ["a-yes", "a-no"])
+        self.assertEqual(snapshot.embeddings.shape, (4, 2))
+        self.assertEqual(snapshot.embeddings.dtype, np.float32)
+        self.assertEqual([event["id"] for event in snapshot.events], [1, 2])
+        self.assertEqual(snapshot.market("b")["liquidityNum"], 9000)
+        self.assertIsNone(snapshot.market("z"))
+
+    def test_shared_round_trip(self):
+        snapshot = build_snapshot(
+            FakeGamma(MARKETS),
+            polymarket=fake_polymarket(),
+            embeddings=FakeEmbeddings(),
+        )
+        shared = SharedSnapshot(snapshot)
+        try:
+            with attach(shared.handle) as view:
+                self.assertEqual(view.records, snapshot.records)
+                self.assertEqual(view.events, snapshot.events)
+                for column in snapshot.columns:
+                    np.testing.assert_array_equal(view[column], snapshot[column])
+                np.testing.assert_array_equal(view.embeddings, snapshot.embeddings)
+                with self.assertRaises(ValueError):
+                    view["liquidity"][0] = 0
+        finally:
+            shared.close()
+
+    def test_empty_snapshot(self):
+        shared = SharedSnapshot(MarketSnapshot.from_markets([]))
+        try:
+            with attach(shared.handle) as view:
+                self.assertEqual(len(view), 0)
+                self.assertEqual(LiquidityScreen().run(view), [])
+        finally:
+            shared.close()
+
+
+class TestStrategyRunner(unittest.TestCase):
+    def setUp(self):
+        self.gamma = FakeGamma(MARKETS)
+        self.runner = StrategyRunner(
+            [LiquidityScreen(k=2), SimilarityScreen([1.0, 0.0], k=1), Failing()],
+            gamma=self.gamma,
+            embeddings=FakeEmbeddings(),
+            max_workers=2,
+        )
+
+    def tearDown(self):
+        self.runner.close()
+
+    def test_one_snapshot_many_strategies(self):
+        results = self.runner.tick()
+        self.assertEqual(self.gamma.calls, 1)
+        # c is priced out of range and d's spread is too wide
+        self.assertEqual(
+            [market["id"] for market in results["liquidity_screen"].result], ["b", "a"]
+        )
+        self.assertEqual(results["similarity_screen"].result[0]["id"], "a")
+        self.assertIsNone(results["similarity_screen"].error)
+        self.assertEqual(results["failing"].error, "RuntimeError: bad strategy")
+
+        # the shared block is released after the tick
+        results = self.runner.tick()
+        self.assertEqual(self.gamma.calls, 2)
+        self.assertIsNone(results["liquidity_screen"].error)
+
+    def test_duplicate_names_rejected(self):
+        with self.assertRaises(ValueError):
+            StrategyRunner([LiquidityScreen(), LiquidityScreen()], gamma=self.gamma)
+
+    def test_strategies_are_abstract(self):
+        with self.assertRaises(TypeError):
+            Strategy()
+
+
+class LiveOnly:
+    """Gamma and Polymarket reads a snapshot should have made unnecessary."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_all_tradeable_events(self):
+        self.calls.append("events")
+        return []
+
+    def get_market(self, market_id):
+        self.calls.append(market_id)
+        return gamma_market(market_id, 0.5, 10)
+
+    def map_api_to_market(self, market_data):
+        return market_data
+
+
+class TestCreatorReadsSnapshot(unittest.TestCase):
+    def test_events_and_markets_come_from_the_snapshot(self):
+        snapshot = build_snapshot(FakeGamma(MARKETS), polymarket=fake_polymarket())
+        live = LiveOnly()
+        executor = fake_executor(gamma=live, polymarket=live)
+        seen = {}
+
+        def filter_events(events):
+            seen["events"] = events
+            return [
+                (Document(page_content="", metadata={"markets": event.markets}), 0.0)
+                for event in events
+            ]
+
+        def filter_markets(markets):
+            seen["markets"] = sorted(market["id"] for market in markets)
+            return markets
+
+        executor.filter_events_with_rag = filter_events
+        executor.filter_markets = filter_markets
+        executor.source_best_market_to_create = lambda markets: len(markets)
+
+        creator = fake_creator(executor)
+        self.assertEqual(creator.build_pipeline(snapshot).run_sync(), [3])
+        self.assertEqual(
+            seen["events"], [simple_event(1, ["a", "b"]), simple_event(2, ["z"])]
+        )
+        self.assertEqual(seen["markets"], ["a", "b", "z"])
+        # only the market missing from the snapshot was read live
+        self.assertEqual(live.calls, ["z"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from agents.llm.tokens import count_tokens, get_encoding, pack_items
+
+
+class TestCountTokens(unittest.TestCase):
+    def test_counts_are_positive_and_monotonic(self):
+        short = count_tokens("Will bitcoin close above 100k?", "gpt-3.5-turbo-16k")
+        longer = count_tokens(
+            "Will bitcoin close above 100k? " * 10, "gpt-3.5-turbo-16k"
+        )
+        self.assertGreater(short, 0)
+        self.assertGreater(longer, short)
+
+    def test_unknown_model_uses_fallback(self):
+        self.assertGreater(count_tokens("hello world", "Qwen/Qwen2.5-72B-Instruct"), 0)
+        self.assertIs(get_encoding("some-model"), get_encoding("some-model"))
+
+
+class TestPackItems(unittest.TestCase):
+    def test_greedy_packing_respects_budget(self):
+        chunks = pack_items([3, 3, 3, 5, 1], budget=8, count=lambda x: x)
+        self.assertEqual(chunks, [[3, 3], [3], [5, 1]])
+
+    def test_oversized_item_gets_own_chunk(self):
+        chunks = pack_items([1, 20, 1], budget=5, count=lambda x: x)
+        self.assertEqual(chunks, [[1], [20], [1]])
+
+    def test_empty(self):
+        self.assertEqual(pack_items([], budget=5, count=len), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
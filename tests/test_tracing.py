@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from agents.application.pipeline import Pipeline, Stage
+from agents.llm.local import ScriptedChatModel
+from agents.llm.traced import TracedChatModel
+from agents.utils import tracing
+from agents.utils.tracing import (
+    NOOP_SPAN,
+    children_by_parent,
+    configure,
+    critical_path,
+    read_spans,
+    span,
+    traced,
+)
+
+
+class TracingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "trace.jsonl")
+
+    def tearDown(self):
+        # back to the environment's (disabled) configuration
+        tracing._tracer = None
+        self.tmp.cleanup()
+
+
+class TestSpans(TracingTestCase):
+    def test_disabled_spans_are_noops(self):
+        configure(enabled=False)
+        with span("work") as current:
+            current.add("items", 3)
+        self.assertIs(current, NOOP_SPAN)
+
+    def test_nesting_and_export(self):
+        tracer = configure(self.path)
+
+        @traced("fetch", count_result=True)
+        def fetch():
+            time.sleep(0.01)
+            return [1, 2, 3]
+
+        with span("run", run_id="r1"):
+            fetch()
+            with self.assertRaises(ValueError):
+                with span("parse"):
+                    raise ValueError("bad json")
+
+        (run,) = [s for s in tracer.spans() if s.name == "run"]
+        by_name = {s["name"]: s for s in read_spans(self.path)}
+        self.assertEqual(set(by_name), {"run", "fetch", "parse"})
+        self.assertEqual(by_name["fetch"]["parent_id"], run.span_id)
+        self.assertEqual(by_name["fetch"]["attributes"], {"items": 3})
+        self.assertGreaterEqual(by_name["fetch"]["duration_ms"], 10)
+        self.assertEqual(by_name["parse"]["error"], "ValueError: bad json")
+        self.assertIsNone(by_name["run"]["parent_id"])
+
+    def test_otlp_round_trip(self):
+        configure(self.path, fmt="otlp")
+        with span("run", model="local:scripted", retried=False):
+            with span("child") as child:
+                child.add("bytes", 512)
+                child.set("ratio", 0.5)
+
+        with open(self.path) as f:
+            request = json.loads(f.readline())
+        otlp_span = request["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        self.assertEqual(otlp_span["name"], "child")
+        self.assertEqual(len(otlp_span["traceId"]), 32)
+        self.assertEqual(len(otlp_span["spanId"]), 16)
+        self.assertIn(
+            {"key": "bytes", "value": {"intValue": "512"}}, otlp_span["attributes"]
+        )
+
+        by_name = {s["name"]: s for s in read_spans(self.path)}
+        self.assertEqual(by_name["child"]["parent_id"], by_name["run"]["span_id"])
+        self.assertEqual(by_name["child"]["attributes"], {"bytes": "512", "ratio": 0.5})
+        self.assertEqual(by_name["run"]["attributes"]["retried"], False)
+
+    def test_pipeline_stage_spans(self):
+        tracer = configure()
+
+        @traced("lookup")
+        def lookup(value):
+            return value
+
+        with span("trader"):
+            Pipeline([Stage("lookup", lookup, concurrency=2)]).run_sync([1, 2, 3])
+
+        spans = {s.span_id: s for s in tracer.spans()}
+        lookups = [s for s in spans.values() if s.name == "lookup"]
+        self.assertEqual(len(lookups), 3)
+        for lookup_span in lookups:
+            stage = spans[lookup_span.parent_id]
+            self.assertEqual(stage.name, "stage.lookup")
+            self.assertEqual(spans[stage.parent_id].name, "pipeline.run")
+        (stage,) = [s for s in spans.values() if s.name == "stage.lookup"]
+        self.assertEqual(stage.attributes["emitted"], 3)
+        self.assertEqual(len({s.trace_id for s in spans.values()}), 1)
+
+    def test_llm_spans(self):
+        tracer = configure()
+        llm = TracedChatModel(
+            ScriptedChatModel(default_response="one two"), "local:test"
+        )
+        llm.invoke("hi", config={"run_name": "chat"})
+        chunks = list(llm.stream("hi"))
+
+        invoke, stream = tracer.spans()
+        self.assertEqual(invoke.name, "llm.invoke")
+        self.assertEqual(invoke.attributes["run_name"], "chat")
+        self.assertEqual(invoke.attributes["model"], "local:test")
+        self.assertEqual(stream.name, "llm.stream")
+        self.assertEqual(stream.attributes["chunks"], len(chunks))
+
+    def test_async_stream_span(self):
+        tracer = configure()
+        llm = TracedChatModel(
+            ScriptedChatModel(default_response="one two"), "local:test"
+        )
+
+        async def collect():
+            return [chunk async for chunk in llm.astream("hi")]
+
+        chunks = asyncio.run(collect())
+        (stream,) = tracer.spans()
+        self.assertEqual(stream.name, "llm.stream")
+        self.assertEqual(stream.attributes["chunks"], len(chunks))
+
+
+class TestCriticalPath(unittest.TestCase):
+    def test_follows_the_spans_that_set_the_end_time(self):
+        def record(span_id, parent_id, start, end):
+            return {
+                "span_id": span_id,
+                "parent_id": parent_id,
+                "name": span_id,
+                "start": start,
+                "end": end,
+            }
+
+        spans = [
+            record("run", None, 0, 10),
+            record("fetch", "run", 0, 3),
+            # overlaps fetch and finishes first, so it is not on the path
+            record("prefetch", "run", 1, 2),
+            record("filter", "run", 3, 6),
+            record("embed", "filter", 3, 5),
+            record("forecast_a", "run", 6, 8),
+            record("forecast_b", "run", 6, 10),
+        ]
+        path = critical_path(spans[0], children_by_parent(spans))
+        self.assertEqual(
+            [(s["name"], depth) for s, depth in path],
+            [
+                ("run", 0),
+                ("fetch", 1),
+                ("filter", 1),
+                ("embed", 2),
+                ("forecast_b", 1),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()